@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmarks the startup of nott-your-timetable-cli.
+
+The entry point is imported and the cli arguments are parsed in a new
+interpreter for every run. It fails if the startup is slower than the limit
+or if a module that is only needed to fetch or export the timetable is
+imported.
+"""
+import sys
+import json
+import argparse
+import subprocess
+from statistics import median
+
+# Modules that must not be imported before they are needed
+LAZY_MODULES = ["requests", "icalendar", "pyarrow", "lxml", "gi",
+                "xml.etree.ElementTree", "nott_your_timetable.gui",
+                "nott_your_timetable.utils.parsers",
+                "nott_your_timetable.utils.html_parsers",
+                "nott_your_timetable.utils.requester",
+                "nott_your_timetable.utils.caldav"]
+STARTUP = """
+import sys
+import json
+import time
+start = time.perf_counter()
+from nott_your_timetable.nott_your_timetable import main_cli
+from nott_your_timetable.cli import parse_arguments
+sys.argv = ["nott-your-timetable-cli", "-c", "School", "Program"]
+parse_arguments()
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure(runs: int) -> tuple[list[float], set[str]]:
+    """Measures the startup time.
+
+    Parameters
+    ----------
+    runs: int
+        The number of times to start the cli
+
+    Returns
+    -------
+    tuple[list[float], set[str]]
+        The startup time of every run in seconds and the imported modules
+    """
+    times = []
+    modules = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", STARTUP],
+                                capture_output=True, text=True, check=True)
+        output = json.loads(result.stdout)
+        times.append(output["elapsed"])
+        modules.update(output["modules"])
+
+    return times, modules
+
+
+def main() -> int:
+    """Import time benchmark main function."""
+    parser = argparse.ArgumentParser(description="""Benchmarks the startup of
+    nott-your-timetable-cli.""")
+    parser.add_argument("-n", "--runs", type=int, default=10,
+                        help="Sets the number of runs.")
+    parser.add_argument("--max-ms", type=float, default=100,
+                        help="""Fails if the median startup time is longer
+                        than this many milliseconds.""")
+    args = parser.parse_args()
+
+    times, modules = measure(args.runs)
+    elapsed = median(times) * 1000
+    print(f"Startup: median {elapsed:.1f} ms, min {min(times) * 1000:.1f} ms"
+          f" over {args.runs} runs")
+
+    failed = False
+    imported = [module for module in LAZY_MODULES if module in modules]
+    if imported:
+        print(f"Imported at startup: {', '.join(imported)}", file=sys.stderr)
+        failed = True
+    if elapsed > args.max_ms:
+        print(f"Startup is slower than {args.max_ms:.0f} ms", file=sys.stderr)
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
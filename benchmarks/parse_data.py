@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Benchmarks parse_data on a large synthetic timetable.
+
+Every day has the same number of rows with the week ranges, times and
+rooms repeated across the rows like the real timetable. parse_data is
+compared with a reference that expands the weeks and times of every row
+again. It fails if the outputs differ or if parse_data is not faster than
+the reference.
+"""
+import sys
+import time
+import datetime
+import argparse
+from statistics import median
+from collections.abc import Callable, Iterable
+from nott_your_timetable.utils.enums import DayOfWeek
+from nott_your_timetable.utils.parsers import parse_data
+from nott_your_timetable.utils.range_handlers import handle_ranges
+from nott_your_timetable.utils.weeks import get_academic_calendar
+
+ACADEMIC_YEAR = 2023
+WEEK_RANGES = ["1-11", "4-15", "1-6, 8-12", "2, 4, 6, 8, 10", "20-30",
+               "1-52", "13", "4-9, 11-15, 20-30"]
+TIMES = ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00",
+         "16:00", "17:00"]
+
+
+def make_tables(rows: int) -> dict:
+    """Creates the tables of all the days.
+
+    Parameters
+    ----------
+    rows: int
+        The number of rows of every day
+
+    Returns
+    -------
+    dict
+        The data of the table of each day, see ScheduleParser.get_tables
+    """
+    tables = {}
+    for day in DayOfWeek:
+        tables[day.name] = {
+            "Module": [f"EEEE{2000 + row % 50} Module {row % 50}"
+                       for row in range(rows)],
+            "Weeks": [WEEK_RANGES[row % len(WEEK_RANGES)]
+                      for row in range(rows)],
+            "Start": [TIMES[row % (len(TIMES) - 1)] for row in range(rows)],
+            "End": [TIMES[row % (len(TIMES) - 1) + 1]
+                    for row in range(rows)],
+            "Room": [f"BB{row % 20:02}" for row in range(rows)],
+        }
+    return tables
+
+
+def parse_data_reference(data: dict, weeks: Iterable[int],
+                         academic_year: int = None) -> dict:
+    """Parses the tables without reusing the work of the previous rows.
+
+    Parameters
+    ----------
+    data: dict
+        The data of the table of each day
+    weeks: Iterable[int]
+        The weeks to parse
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024
+
+    Returns
+    -------
+    dict
+        The parsed data
+    """
+    calendar = get_academic_calendar(academic_year)
+    weeks = list(weeks)
+    output_data = {"Module": [], "Start": [], "End": [], "Date": [],
+                   "Room": []}
+
+    for day, day_data in data.items():
+        if day_data is None:
+            continue
+        weekday = DayOfWeek[day].value
+
+        for i in range(len(day_data["Module"])):
+            start = day_data["Start"][i].split(":")
+            start = datetime.time(hour=int(start[0]), minute=int(start[1]))
+            end = day_data["End"][i].split(":")
+            end = datetime.time(hour=int(end[0]), minute=int(end[1]))
+
+            for week in handle_ranges(day_data["Weeks"][i]):
+                if week not in weeks:
+                    continue
+                output_data["Module"].append(day_data["Module"][i])
+                output_data["Date"].append(calendar.get_date(week, weekday))
+                output_data["Start"].append(start)
+                output_data["End"].append(end)
+                output_data["Room"].append(day_data["Room"][i])
+
+    return output_data
+
+
+def measure(function: Callable, data: dict, weeks: list[int],
+            runs: int) -> tuple[list[float], dict]:
+    """Measures the time taken to parse the tables.
+
+    Parameters
+    ----------
+    function: Callable
+        parse_data or parse_data_reference
+    data: dict
+        The data of the table of each day
+    weeks: list[int]
+        The weeks to parse
+    runs: int
+        The number of times to parse the tables
+
+    Returns
+    -------
+    tuple[list[float], dict]
+        The time of every run in seconds and the parsed data
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = function(data, weeks, ACADEMIC_YEAR)
+        times.append(time.perf_counter() - start)
+
+    return times, output
+
+
+def main() -> int:
+    """parse_data benchmark main function."""
+    parser = argparse.ArgumentParser(description="""Benchmarks parse_data
+    on a large synthetic timetable.""")
+    parser.add_argument("-n", "--runs", type=int, default=10,
+                        help="Sets the number of runs.")
+    parser.add_argument("-r", "--rows", type=int, default=600,
+                        help="Sets the number of rows of every day.")
+    parser.add_argument("-w", "--weeks", type=handle_ranges,
+                        default=list(range(1, 53)),
+                        help="""Sets the weeks to parse e.g. 1-52 or 4.""")
+    parser.add_argument("--min-speedup", type=float, default=1,
+                        help="""Fails if parse_data is not this many times
+                        faster than the reference.""")
+    args = parser.parse_args()
+
+    data = make_tables(args.rows)
+    # Warming up the caches of the academic calendar
+    parse_data_reference(data, args.weeks, ACADEMIC_YEAR)
+
+    times, output = measure(parse_data, data, args.weeks, args.runs)
+    reference_times, expected = measure(parse_data_reference, data,
+                                        args.weeks, args.runs)
+    elapsed = median(times) * 1000
+    reference = median(reference_times) * 1000
+    speedup = reference / elapsed
+    print(f"parse_data: median {elapsed:.1f} ms, reference: median "
+          f"{reference:.1f} ms, {speedup:.1f}x faster over {args.runs} runs"
+          f" of {len(output['Module'])} events")
+
+    failed = False
+    if output != expected:
+        print("parse_data does not match the reference", file=sys.stderr)
+        failed = True
+    if speedup < args.min_speedup:
+        print(f"parse_data is less than {args.min_speedup:.1f}x faster",
+              file=sys.stderr)
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
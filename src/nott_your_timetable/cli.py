@@ -1,10 +1,43 @@
 #!/usr/bin/env python3
 """CLI related functions."""
+import sys
 import argparse
-from .utils.weeks import find_current_week_nott
-from .utils.data import get_data
+from .utils.data import get_catalog
+from .utils.exporters import EXPORT_WRITERS
 from .__init__ import __version__
 
+# The value of --weeks for --this-week, it is resolved when it is used
+THIS_WEEK = "this-week"
+
+
+def parse_formats(value: str) -> list[str]:
+    """Parses the comma separated list of export formats.
+
+    Parameters
+    ----------
+    value: str
+        The comma separated list e.g. csv,ics
+
+    Returns
+    -------
+    list[str]
+        The export formats without duplicates
+    """
+    # Using dict to remove duplicates while keeping the order
+    formats = list(dict.fromkeys(
+        export_format.strip() for export_format in value.split(",")
+        if export_format.strip()
+    ))
+    invalid = [export_format for export_format in formats
+               if export_format not in EXPORT_WRITERS]
+    if not formats or invalid:
+        raise argparse.ArgumentTypeError(
+            f"invalid format: {', '.join(invalid) or value!r} (choose from "
+            f"{', '.join(EXPORT_WRITERS)})"
+        )
+
+    return formats
+
 
 def parse_arguments():
     """Parses the cli arguments for nott-your-timetable-cli."""
@@ -42,7 +75,14 @@ def parse_arguments():
                             const="4-15,22-33", dest="weeks")
     range_week.add_argument("-tw", "--this-week", action="store_const",
                             help="""Exports Timetable for this week.""",
-                            const=str(find_current_week_nott()), dest="weeks")
+                            const=THIS_WEEK, dest="weeks")
+    week_range_group.add_argument("-yr", "--academic-year", type=int,
+                                  default=None, metavar="YEAR",
+                                  help="""Sets the academic year the weeks
+                                  are in by the year it starts in e.g. 2023
+                                  for 2023/2024. Defaults to the current
+                                  academic year, --this-week and --today
+                                  need the current academic year.""")
 
     # Range Options for days
     day_range_group = parser.add_argument_group(title="Day Range Options")
@@ -51,7 +91,8 @@ def parse_arguments():
                            help="""Sets the range of days to export. You can
                            set multiple days to export by seperating them by
                            ','  or '-' to export all days in between.
-                           1 is Monday and up to 7 is Sunday.""")
+                           1 is Monday and up to 7 is Sunday, days can also
+                           be named e.g. Monday, Mon,Wed or 1-Fri.""")
     range_day.add_argument("-wd", "--weekdays", action="store_const",
                            help="Exports Timetable for the weekdays.",
                            const="1-5", dest="days")
@@ -67,10 +108,78 @@ def parse_arguments():
     # Output Options
     output_group = parser.add_argument_group(title="Output Options")
     output_group.add_argument('-o', '--output', type=str, default=None,
-                              help="Sets the output file name.")
-    output_group.add_argument('-f', '--format', type=str, default="ics",
-                              choices=["csv", "ics"],
-                              help="Sets the output format.")
+                              help="""Sets the output file name. Use - to
+                              write to stdout.""")
+    output_group.add_argument('-f', '--format', type=parse_formats,
+                              default="ics",
+                              help="""Sets the output format. It can be
+                              csv, ics, jsonl or parquet, parquet requires
+                              pyarrow. Multiple formats can be separated by
+                              commas e.g. csv,ics""")
+    output_group.add_argument('-od', '--output-dir', type=str, default=".",
+                              help="""Sets the output directory when
+                              exporting multiple programs.""")
+    output_group.add_argument('--ics-writer', type=str, default="native",
+                              choices=["native", "icalendar"],
+                              help="""Sets the iCalendar serializer. native
+                              is faster, icalendar uses the icalendar
+                              package.""")
+    output_group.add_argument('-r', '--recurring', action="store_true",
+                              help="""Combines the weekly classes into
+                              recurring events when exporting to ics.
+                              Requires the native ics writer.""")
+    output_group.add_argument('--diff-against', type=str, default=None,
+                              metavar="PREVIOUS",
+                              help="""Only exports the events that were
+                              added, changed or cancelled since a previous
+                              ics or csv export.""")
+    output_group.add_argument('--diff-summary', type=str, default=None,
+                              metavar="FILE",
+                              help="""Writes a JSON summary of the changes
+                              when using --diff-against.""")
+
+    # CalDAV Options
+    caldav_group = parser.add_argument_group(title="CalDAV Options")
+    caldav_group.add_argument('--caldav', type=str, default=None,
+                              metavar="URL",
+                              help="""Syncs the timetable into a CalDAV
+                              calendar instead of exporting it. Only the
+                              changed events are uploaded.""")
+    caldav_group.add_argument('--caldav-user', type=str, default=None,
+                              help="""Sets the CalDAV username. The
+                              password is read from the
+                              NOTT_CALDAV_PASSWORD environment variable or
+                              asked for.""")
+
+    # Cache Options
+    cache_group = parser.add_argument_group(title="Cache Options")
+    cache_group.add_argument('--no-cache', action="store_true",
+                             help="""Fetch the timetable without reading
+                             or writing to the cache.""")
+    cache_group.add_argument('--refresh', action="store_true",
+                             help="""Ignores the cached timetable and fetch
+                             it again.""")
+    cache_group.add_argument('--cache-dir', type=str, default=None,
+                             help="Sets the cache directory.")
+    cache_group.add_argument('--cache-ttl', type=float, default=24,
+                             help="""Sets the number of hours a cached
+                             timetable is valid for.""")
+    cache_group.add_argument('--cache-size', type=int, default=256,
+                             help="""Sets the maximum size of the cache in
+                             MB.""")
+
+    # Parser Options
+    parser.add_argument('--parser', type=str, default=None,
+                        choices=["auto", "python", "lxml"],
+                        help="""Sets the HTML parser used. auto uses lxml
+                        if it is installed. Defaults to the
+                        NOTT_PARSER_BACKEND environment variable or auto.""")
+
+    # Bulk Options
+    bulk_group = parser.add_argument_group(title="Bulk Export Options")
+    bulk_group.add_argument('-j', '--jobs', type=int, default=8,
+                            help="""Sets the maximum number of programs
+                            fetched at the same time.""")
 
     # Course Selection
     course_group = parser.add_mutually_exclusive_group(required=True)
@@ -81,6 +190,24 @@ def parse_arguments():
     course_group.add_argument("-i", "--interactive", action="store_true",
                               help="Specify which School/Division and"
                               " Program to export using standard input")
+    course_group.add_argument("-b", "--bulk", type=str, nargs="+",
+                              help="Specify the program values of the"
+                              " programs to export e.g."
+                              " UG/M1225/M6UBSECFF/F/01",
+                              metavar="Program Value")
+    course_group.add_argument("-ap", "--all-programs", action="store_true",
+                              help="Exports the timetable of every"
+                              " program")
+    course_group.add_argument("-m", "--manifest", type=str,
+                              help="Exports every job listed in a csv,"
+                              " json or toml manifest. Jobs of the same"
+                              " program share a single request.",
+                              metavar="FILE")
+    course_group.add_argument("-s", "--search", type=str,
+                              help="Searches for programs matching a"
+                              " partial or misspelled name and prints"
+                              " them",
+                              metavar="Query")
 
     # Version
     parser.add_argument('-v', '--version', action="version",
@@ -94,31 +221,90 @@ def get_school_interactive() -> tuple[str, list[str]]:
     school = None
     program = None
 
-    dept_data, program_data = get_data()
+    catalog = get_catalog()
 
     while school is None or school == "?" or school == "":
         school = input("Enter School/Division Name (? for list): ")
 
         if school == "?":
-            for data in dept_data.keys():
+            for data in catalog.school_programs:
                 print(data)
         elif school == "":
             pass
-        elif school not in dept_data:
+        elif school not in catalog.school_programs:
             school = None
             print("Invalid School/Division Name.")
 
-    school_value = dept_data[school]
+    programs = catalog.school_programs[school]
+    suggestions = []
     while program is None or program == "?" or program == "":
         program = input("Enter Program Name (? for list): ")
 
         if program == "?":
-            for data in program_data[school_value].keys():
+            for data in programs:
                 print(data)
         elif program == "":
             pass
-        elif program not in program_data[school_value]:
-            program = None
+        elif program.isdigit() and 0 < int(program) <= len(suggestions):
+            # Choosing one of the suggestions
+            program = suggestions[int(program) - 1]
+        elif program not in programs:
             print("Invalid Program.")
+            suggestions = print_suggestions(program, school)
+            program = None
 
     return (school, program)
+
+
+def print_suggestions(query: str, school: str = None,
+                      limit: int = 5) -> list[str]:
+    """Prints the programs that best match a query as a numbered list.
+
+    Parameters
+    ----------
+    query: str
+        The partial or misspelled program name
+    school: str | None
+        Only suggests the programs of this school/division
+    limit: int
+        The maximum number of suggestions
+
+    Returns
+    -------
+    list[str]
+        The suggested program names
+    """
+    results = get_catalog().search_index.search(query, limit, school)
+    if not results:
+        return []
+
+    print("Did you mean (enter the number to choose):")
+    for number, result in enumerate(results, 1):
+        print(f"  {number}. {result.program}")
+
+    return [result.program for result in results]
+
+
+def print_search(query: str) -> int:
+    """Prints the programs matching a query in the format of the --course
+    argument.
+
+    Parameters
+    ----------
+    query: str
+        The partial or misspelled program name
+
+    Returns
+    -------
+    int
+        0 if any program is found, 1 otherwise
+    """
+    results = get_catalog().search_index.search(query)
+    if not results:
+        print("No programs found", file=sys.stderr)
+        return 1
+
+    for result in results:
+        print(f'-c "{result.school}" "{result.program}"')
+
+    return 0
@@ -6,11 +6,14 @@ import gi
 gi.require_version("Gtk", "4.0")
 # pylint: disable=wrong-import-position
 from gi.repository import Gtk, Gio, GLib, GObject  # noqa: E402
-from .utils.data import get_data, get_convinience_weeks,\
+from .utils.data import get_catalog, get_convinience_weeks,\
     get_convinience_days  # noqa: E402
-from .utils.range_handlers import handle_ranges_days   # noqa: E402
-from .utils.parsers import get_program_value, ScheduleData,\
-    make_request   # noqa: E402
+from .utils.enums import DayOfWeekISO   # noqa: E402
+from .utils.range_handlers import RangeSet   # noqa: E402
+from .utils.parsers import get_program_value, ScheduleData   # noqa: E402
+from .utils.requester import make_request   # noqa: E402
+from .utils.cache import ResponseCache   # noqa: E402
+from .utils.exporters import get_export_formats   # noqa: E402
 # pylint: enable=wrong-import-position
 
 
@@ -24,21 +27,26 @@ class MakeRequestWrapper(GObject.Object):
     ----------
     program_value: str
         The Program Value of the program to fetch
-    days: list[int]
-        The list days to fetch
-    weeks: list[int]
-        The list of weeks to fetch
+    days: RangeSet
+        The days to fetch
+    weeks: RangeSet
+        The weeks to fetch
+    cache: ResponseCache
+        The cache to get the response from and store the response in
     """
-    def __init__(self, program_value: str, days: list[int], weeks: list[int]):
+    def __init__(self, program_value: str, days: RangeSet, weeks: RangeSet,
+                 cache: ResponseCache = None):
         super().__init__()
         self.program_value = program_value
         self.days = days
         self.weeks = weeks
+        self.cache = cache
         self.pool = {}
 
     def make_request_sync(self) -> ScheduleData:
         """Fetch data in a syncronous way."""
-        data = make_request(self.program_value, self.days, self.weeks)
+        data = make_request(self.program_value, self.days, self.weeks,
+                            cache=self.cache)
         return data
 
     def make_request_async(self, cancellable: Gio.Cancellable,
@@ -77,7 +85,7 @@ class MakeRequestWrapper(GObject.Object):
         data = self.pool.get(data_id)
 
         try:
-            outcome = make_request(*data)
+            outcome = make_request(*data, cache=self.cache)
         except requests.RequestException as error:
             task.return_error(GLib.Error(" ".join(error.args),
                                          "requests-error"))
@@ -116,6 +124,7 @@ class NottWindow(Gtk.ApplicationWindow):
 
         # Setting up Needed variables
         self.dialog = None
+        self.cache = ResponseCache()
 
         # Setting up options variables
         self.export_options = {}
@@ -149,7 +158,7 @@ class NottWindow(Gtk.ApplicationWindow):
             A dictionary containing all the widgets for program selection
         """
         school = box.get_active_id()
-        _, programs = get_data()
+        programs = get_catalog().program_data
 
         # Deleting all keys
         for _ in range(listbox["count"]):
@@ -164,11 +173,67 @@ class NottWindow(Gtk.ApplicationWindow):
         if program is None:
             return
 
+        # Storing the original order for sorting
+        listbox["order"] = {key: index for index, key in enumerate(program)}
         # Appending new keys
         for key in program:
             listbox["box"].append(Gtk.Label(label=key))
             listbox["count"] += 1
 
+    def search_changed(self, entry: Gtk.SearchEntry, listbox: dict) -> None:
+        """Callback function when the program search is changed.
+
+        Parameters
+        ----------
+        entry: Gtk.SearchEntry
+            The program search entry
+        listbox: dict
+            A dictionary containing all the widgets for program selection
+        """
+        query = entry.get_text()
+        if query.strip() == "":
+            listbox["ranks"] = None
+        else:
+            results = get_catalog().search_index.search(query, None)
+            listbox["ranks"] = {}
+            for rank, result in enumerate(results):
+                listbox["ranks"].setdefault(result.program, rank)
+
+        listbox["box"].invalidate_filter()
+        listbox["box"].invalidate_sort()
+
+    def filter_program(self, row: Gtk.ListBoxRow, listbox: dict) -> bool:
+        """Filter function to only show the programs matching the search.
+
+        Parameters
+        ----------
+        row: Gtk.ListBoxRow
+            The row of the program
+        listbox: dict
+            A dictionary containing all the widgets for program selection
+        """
+        ranks = listbox["ranks"]
+        return ranks is None or row.get_child().get_text() in ranks
+
+    def sort_programs(self, row1: Gtk.ListBoxRow, row2: Gtk.ListBoxRow,
+                      listbox: dict) -> int:
+        """Sort function to show the best matching programs first.
+
+        Parameters
+        ----------
+        row1: Gtk.ListBoxRow
+            The row of the first program
+        row2: Gtk.ListBoxRow
+            The row of the second program
+        listbox: dict
+            A dictionary containing all the widgets for program selection
+        """
+        order = listbox["ranks"]
+        if order is None:
+            order = listbox["order"]
+        return order.get(row1.get_child().get_text(), len(order)) - \
+            order.get(row2.get_child().get_text(), len(order))
+
     def __setup_export_options(self):
         """Setup export options."""
         self.options_layout = Gtk.Grid()
@@ -273,7 +338,7 @@ class NottWindow(Gtk.ApplicationWindow):
         Gtk.ComboBoxText
             The resultant combobox widget
         """
-        courses, _ = get_data()
+        courses = get_catalog().dept_data
 
         schools = Gtk.ComboBoxText()
         for key, value in courses.items():
@@ -293,9 +358,26 @@ class NottWindow(Gtk.ApplicationWindow):
         programs = {}
         programs["box"] = Gtk.ListBox()
         programs["count"] = 0
+        programs["order"] = {}
+        # The rank of every program matching the search, None if there
+        # is no search
+        programs["ranks"] = None
+        programs["box"].set_filter_func(self.filter_program, programs)
+        programs["box"].set_sort_func(self.sort_programs, programs)
         programs["scroller"] = Gtk.ScrolledWindow(vexpand=True)
         programs["scroller"].set_child(programs["box"])
-        self.__insert_row(2, "Select Program: ", programs["scroller"])
+
+        # Search Entry
+        programs["search"] = Gtk.SearchEntry(
+            placeholder_text="Search Programs"
+        )
+        programs["search"].connect("search-changed", self.search_changed,
+                                   programs)
+
+        layout = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        layout.append(programs["search"])
+        layout.append(programs["scroller"])
+        self.__insert_row(2, "Select Program: ", layout)
 
         return programs
 
@@ -312,7 +394,7 @@ class NottWindow(Gtk.ApplicationWindow):
             combo = Gtk.ComboBoxText.new_with_entry()
             # Adding convinience values
             for key, value in con.items():
-                combo.append(value, key)
+                combo.append(str(value), key)
             # Inserting rows and adding to output tuple
             self.__insert_row(i, label, combo)
             output.append(combo)
@@ -329,7 +411,7 @@ class NottWindow(Gtk.ApplicationWindow):
             The comboboxtext widget for the file format option
         """
         file_format = Gtk.ComboBoxText()
-        for i in ["csv", "ics"]:
+        for i in get_export_formats():
             file_format.append(i, i)
         # Setting Default Value
         file_format.set_active_id("ics")
@@ -353,7 +435,7 @@ options
         """
         # pylint: disable=unused-argument
         # Getting convinience datas
-        convinience: dict[dict[str, str]] = {
+        convinience: dict[str, dict[str, RangeSet]] = {
             "days": get_convinience_days(),
             "weeks": get_convinience_weeks()
         }
@@ -370,20 +452,20 @@ options
             return
 
         # Checking Validity of week and day ranges
+        names = {"weeks": None, "days": DayOfWeekISO}
         for i in ["weeks", "days"]:
             data: str = self.export_options.get(i)
             try:
                 # Checking if it is a convinience day range
                 if data not in convinience.get(i):
                     # If it is a range
-                    self.export_options[i]: list[int] = handle_ranges_days(
-                        data
+                    self.export_options[i]: RangeSet = RangeSet.parse(
+                        data, names[i]
                     )
                 else:
                     # If it is a convinience range
-                    self.export_options[i]: list[int] = handle_ranges_days(
+                    self.export_options[i]: RangeSet = \
                         convinience.get(i).get(data)
-                    )
             except ValueError:
                 # Invalid Ranges
                 self.show_error()
@@ -432,7 +514,8 @@ options
         response = MakeRequestWrapper(
             self.export_options.get('program'),
             self.export_options.get("days"),
-            self.export_options.get("weeks")
+            self.export_options.get("weeks"),
+            self.cache
         )
         response.make_request_async(None, self.handle_response, None)
 
@@ -1,19 +1,27 @@
 #!/usr/bin/env python3
 """Main Functions to run."""
+import os
 import sys
+import getpass
 import datetime
-import requests
-from .utils.range_handlers import handle_ranges_days, handle_ranges
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+from .utils.enums import DayOfWeekISO
+from .utils.range_handlers import ALL_DAYS, ALL_WEEKS, RangeSet
 from .utils.weeks import find_current_week_nott
-from .utils.parsers import get_program_value, make_request
-from .cli import get_school_interactive, parse_arguments
+from .utils.cache import ResponseCache
+from .utils.exporters import get_export_formats, get_outputs
+from .cli import THIS_WEEK, get_school_interactive, parse_arguments,\
+    print_search
 
-GUI_FLAG = False
-try:
-    from .gui import NottApp
-    GUI_FLAG = True
-except ModuleNotFoundError:
-    pass
+if TYPE_CHECKING:
+    from .utils.parsers import ScheduleData
+
+CALDAV_PASSWORD_ENV = "NOTT_CALDAV_PASSWORD"
+
+# requests, the parsers and GTK are slow to import, so they are only
+# imported by the functions that use them
+GUI_FLAG = find_spec("gi") is not None
 
 
 def main():
@@ -36,28 +44,100 @@ def main_cli():
     args = parse_arguments()
     today = datetime.date.today()
 
+    # Search mode
+    if args.search is not None:
+        return print_search(args.search)
+
     # Getting all the day and week ranges
+    if args.today:
+        args.weeks = THIS_WEEK
+    if args.weeks == THIS_WEEK:
+        # The week of today in the academic year
+        try:
+            args.weeks = str(find_current_week_nott(today,
+                                                    args.academic_year))
+        except ValueError as err:
+            print(f"Can't export this week: {err}", file=sys.stderr)
+            return 1
     try:
-        days = handle_ranges_days(args.days)
-        weeks = handle_ranges(args.weeks)
+        days = RangeSet.parse(args.days, DayOfWeekISO)
+        weeks = RangeSet.parse(args.weeks)
     except ValueError:
         print("Invalid Range, Please Check Inserted Value", file=sys.stderr)
         return 1
 
-    # Using default output filename
-    if args.output is not None:
-        args.output += f".{args.format}"
+    # Getting the output filename of every format
+    try:
+        outputs = get_outputs(args.output, args.format)
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 1
 
     # If today is specified
     if args.today:
-        days = [today.isoweekday()]
-        weeks = [find_current_week_nott()]
+        days = RangeSet.from_values([today.isoweekday()])
 
     # Checking if ranges are valid
-    if (days[0] < 1 or days[-1] > 7) or (weeks[0] < 1 or weeks[-1] > 52):
+    if not days.issubset(ALL_DAYS) or not weeks.issubset(ALL_WEEKS):
         print("Invalid Range, Please Check Inserted Value", file=sys.stderr)
         return 1
 
+    if args.academic_year is not None and \
+            not datetime.MINYEAR <= args.academic_year < datetime.MAXYEAR:
+        print("Invalid Academic Year", file=sys.stderr)
+        return 1
+
+    for export_format in args.format:
+        if export_format not in get_export_formats():
+            print(f"{export_format} is not available, please install "
+                  "pyarrow or the parquet extras", file=sys.stderr)
+            return 1
+
+    # Only the native writer supports recurring events
+    if args.recurring and args.ics_writer != "native":
+        print("Recurring events requires the native ics writer",
+              file=sys.stderr)
+        return 1
+
+    # Diff exports are always a single ics file
+    if args.diff_against is not None and (
+            args.format != ["ics"] or args.recurring or
+            args.bulk is not None or args.all_programs or
+            args.manifest is not None):
+        print("--diff-against only supports exporting a single program to"
+              " ics without --recurring", file=sys.stderr)
+        return 1
+
+    if args.caldav is not None and (args.bulk is not None or
+                                    args.all_programs or
+                                    args.manifest is not None):
+        print("--caldav only supports syncing a single program",
+              file=sys.stderr)
+        return 1
+
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from .utils.html_parsers import get_parser_backend
+    from .utils.parsers import get_program_value
+    from .utils.requester import make_request
+
+    cache = get_cache(args)
+
+    # Checking if the parser is available
+    try:
+        get_parser_backend(args.parser)
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    # Manifest mode
+    if args.manifest is not None:
+        return main_manifest(args, cache)
+
+    # Bulk mode
+    if args.bulk is not None or args.all_programs:
+        return main_bulk(args, days, weeks, cache)
+
     # Interactive mode
     if args.interactive:
         school, program = get_school_interactive()
@@ -72,16 +152,197 @@ def main_cli():
         return 1
 
     try:
-        schedule_data = make_request(program_value, days, weeks)
+        schedule_data = make_request(program_value, days, weeks,
+                                     cache=cache, refresh=args.refresh,
+                                     backend=args.parser,
+                                     academic_year=args.academic_year)
     except requests.ConnectTimeout:
         print("HTTP request taking too long, please check your internet"
               "connection", file=sys.stderr)
         return 1
 
-    return schedule_data.export(args.format, args.output)
+    if args.caldav is not None:
+        return main_caldav(args, schedule_data)
+
+    if args.diff_against is not None:
+        return main_diff(args, schedule_data, outputs["ics"])
+
+    return schedule_data.export_all(outputs, args.ics_writer, args.recurring)
+
+
+def get_cache(args) -> ResponseCache | None:
+    """Gets the response cache from the cli arguments.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        The parsed cli arguments
+
+    Returns
+    -------
+    ResponseCache
+        The response cache
+    None
+        If caching is disabled
+    """
+    if args.no_cache:
+        return None
+
+    return ResponseCache(args.cache_dir, args.cache_ttl * 60 * 60,
+                         args.cache_size * 1024 * 1024)
+
+
+def main_bulk(args, days: RangeSet, weeks: RangeSet,
+              cache: ResponseCache = None) -> int:
+    """Bulk export main function.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        The parsed cli arguments
+    days: RangeSet
+        The days of week to export
+    weeks: RangeSet
+        The weeks to export
+    cache: ResponseCache
+        The cache shared by all the requests
+
+    Returns
+    -------
+    int
+        0 if every program is exported successfully, 1 otherwise
+    """
+    # pylint: disable=import-outside-toplevel
+    from .utils.bulk import export_bulk, get_all_program_values,\
+        print_summary
+
+    if args.all_programs:
+        program_values = get_all_program_values()
+    else:
+        program_values = args.bulk
+
+    try:
+        results = export_bulk(program_values, days, weeks, args.format,
+                              args.output_dir, args.jobs, cache=cache,
+                              refresh=args.refresh, backend=args.parser,
+                              ics_writer=args.ics_writer,
+                              recurring=args.recurring,
+                              academic_year=args.academic_year)
+    except (ValueError, OSError) as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    print_summary(results)
+    return 0 if all(result.successful for result in results) else 1
+
+
+def main_manifest(args, cache: ResponseCache = None) -> int:
+    """Manifest export main function.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        The parsed cli arguments
+    cache: ResponseCache
+        The cache shared by all the requests
+
+    Returns
+    -------
+    int
+        0 if every job is exported successfully, 1 otherwise
+    """
+    # pylint: disable=import-outside-toplevel
+    from .utils.manifest import export_manifest, print_manifest_summary,\
+        read_manifest
+
+    try:
+        entries = read_manifest(args.manifest)
+        results = export_manifest(entries, args.jobs, cache=cache,
+                                  refresh=args.refresh, backend=args.parser,
+                                  ics_writer=args.ics_writer,
+                                  recurring=args.recurring,
+                                  academic_year=args.academic_year)
+    except (ValueError, OSError) as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    print_manifest_summary(results)
+    return 0 if all(result.successful for result in results) else 1
+
+
+def main_diff(args, schedule_data: "ScheduleData", output: str) -> int:
+    """Diff export main function.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        The parsed cli arguments
+    schedule_data: ScheduleData
+        The current timetable
+    output: str
+        The output filename
+
+    Returns
+    -------
+    int
+        0 if successful, 1 if the previous export can't be read
+    """
+    try:
+        changes = schedule_data.export_diff(args.diff_against, output,
+                                            args.diff_summary)
+    except (OSError, ValueError) as err:
+        print(f"Unable to diff against {args.diff_against}: {err}",
+              file=sys.stderr)
+        return 1
+
+    print(f"{len(changes['added'])} added, {len(changes['changed'])} "
+          f"changed, {len(changes['cancelled'])} cancelled", file=sys.stderr)
+    return 0
+
+
+def main_caldav(args, schedule_data: "ScheduleData") -> int:
+    """CalDAV sync main function.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        The parsed cli arguments
+    schedule_data: ScheduleData
+        The timetable to sync
+
+    Returns
+    -------
+    int
+        0 if every event is synced, 1 otherwise
+    """
+    # pylint: disable=import-outside-toplevel
+    from xml.etree import ElementTree as ET
+    import requests
+    from .utils.caldav import sync_caldav
+
+    auth = None
+    if args.caldav_user is not None:
+        password = os.environ.get(CALDAV_PASSWORD_ENV)
+        if password is None:
+            password = getpass.getpass("CalDAV Password: ")
+        auth = (args.caldav_user, password)
+
+    try:
+        changes = sync_caldav(schedule_data, args.caldav, auth=auth)
+    except (requests.RequestException, ET.ParseError) as err:
+        print(f"Unable to sync to {args.caldav}: {err}", file=sys.stderr)
+        return 1
+
+    for failure in changes["failed"]:
+        print(failure, file=sys.stderr)
+    print(f"{len(changes['added'])} added, {len(changes['changed'])} "
+          f"changed, {len(changes['deleted'])} deleted, "
+          f"{len(changes['unchanged'])} unchanged", file=sys.stderr)
+    return 0 if not changes["failed"] else 1
 
 
 def main_gui():
     """GUI main function."""
+    from .gui import NottApp  # pylint: disable=import-outside-toplevel
     app = NottApp()
     return app.run()
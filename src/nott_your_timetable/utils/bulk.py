@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Functions to export the timetable of many programs at once."""
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import Any, NamedTuple, TextIO
+from xml.etree import ElementTree as ET
+import requests
+from requests.adapters import HTTPAdapter
+from .data import get_catalog
+from .requester import make_request
+from .cache import ResponseCache
+
+DEFAULT_WORKERS = 8
+
+
+class BulkResult(NamedTuple):
+    """The outcome of exporting a single program in a batch.
+
+    Parameters
+    ----------
+    program_value: str
+        The program value of the exported program
+    output: str
+        The output filenames separated by commas
+    error: str | None
+        The error message, None if the export is successful
+    """
+    program_value: str
+    output: str
+    error: str | None = None
+
+    @property
+    def successful(self) -> bool:
+        """Whether the program is exported successfully."""
+        return self.error is None
+
+
+def get_all_program_values() -> list[str]:
+    """Gets the program value of every program in the program data.
+
+    Returns
+    -------
+    list[str]
+        All the program values without duplicates
+    """
+    return get_catalog().program_values
+
+
+def program_filename(program_value: str, export_format: str) -> str:
+    """Gets the output filename of a program.
+
+    Parameters
+    ----------
+    program_value: str
+        The program value of the program e.g. UG/M1225/M6UBSECFF/F/01
+    export_format: str
+        The format to export in
+
+    Returns
+    -------
+    str
+        The filename e.g. UG_M1225_M6UBSECFF_F_01.ics
+    """
+    name = re.sub(r"[^\w.-]+", "_", program_value).strip("_")
+    return f"{name}.{export_format}"
+
+
+def create_session(max_workers: int = DEFAULT_WORKERS) -> requests.Session:
+    """Creates a session with a connection pool big enough for the workers.
+
+    Parameters
+    ----------
+    max_workers: int
+        The number of workers sharing the session
+
+    Returns
+    -------
+    requests.Session
+        The pooled session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def map_programs(function: Callable[[Callable, str], Any],
+                 program_values: Iterable[str],
+                 max_workers: int = DEFAULT_WORKERS,
+                 session: requests.Session = None,
+                 **options: Any) -> list[Any]:
+    """Calls a function for every program in worker threads sharing a
+    single session.
+
+    Parameters
+    ----------
+    function: Callable[[Callable, str], Any]
+        The function called with a request function and a program value.
+        The request function is make_request using the shared session and
+        the options e.g. request(program_value, days, weeks).
+    program_values: Iterable[str]
+        The program values of the programs
+    max_workers: int
+        The maximum number of concurrent calls
+    session: requests.Session
+        The session used to make the requests.
+        If None is provided, a pooled session will be created and closed
+        after all the calls.
+    **options: Any
+        The keyword arguments of make_request e.g. cache and backend
+
+    Returns
+    -------
+    list[Any]
+        The result of every call in the given order
+    """
+    owned_session = session is None
+    if owned_session:
+        session = create_session(max_workers)
+
+    request = partial(make_request, session=session, **options)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(partial(function, request),
+                                     program_values))
+    finally:
+        if owned_session:
+            session.close()
+
+
+def export_bulk(program_values: Iterable[str], days: Iterable[int],
+                weeks: Iterable[int], export_format: str | list[str] = "ics",
+                output_dir: str = ".", max_workers: int = DEFAULT_WORKERS,
+                session: requests.Session = None,
+                cache: ResponseCache = None,
+                refresh: bool = False,
+                backend: str = None,
+                ics_writer: str = "native",
+                recurring: bool = False,
+                academic_year: int = None) -> list[BulkResult]:
+    """Exports the timetable of all the given programs.
+
+    Each program is fetched and exported in a worker thread. An error in one
+    program doesn't stop the others from being exported.
+
+    Parameters
+    ----------
+    program_values: Iterable[str]
+        The program values of the programs to export
+    days: Iterable[int]
+        A list of day of week to export
+    weeks: Iterable[int]
+        A list of weeks to export
+    export_format: str | list[str]
+        The format or formats to export in
+    output_dir: str
+        The directory to write the output files into
+    max_workers: int
+        The maximum number of concurrent requests
+    session: requests.Session
+        The session used to make the requests.
+        If None is provided, a pooled session will be created.
+    cache: ResponseCache
+        The cache shared by all the requests.
+        If None is provided, the responses will not be cached.
+    refresh: bool
+        Ignores the cached responses and fetch them again
+    backend: str
+        The parser backend to use, see get_parser_backend
+    ics_writer: str
+        The iCalendar serializer to use, it can be [native, icalendar]
+    recurring: bool
+        Combines weekly classes into recurring events (ics only)
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    list[BulkResult]
+        The result of every program in the given order
+    """
+    if max_workers < 1:
+        raise ValueError("There must be at least 1 worker")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    export_formats = [export_format] if isinstance(export_format, str) \
+        else export_format
+
+    def export_program(request: Callable, program_value: str) -> BulkResult:
+        outputs = {
+            export_format: os.path.join(
+                output_dir, program_filename(program_value, export_format)
+            )
+            for export_format in export_formats
+        }
+        output = ", ".join(outputs.values())
+        try:
+            schedule_data = request(program_value, days, weeks)
+            if schedule_data.export_all(outputs, ics_writer,
+                                        recurring) != 0:
+                return BulkResult(program_value, output, "Invalid Format")
+        except (requests.RequestException, ET.ParseError, ValueError,
+                KeyError, OSError) as err:
+            # Errors that only affects a single program in a batch
+            return BulkResult(program_value, output,
+                              f"{type(err).__name__}: {err}")
+        return BulkResult(program_value, output)
+
+    return map_programs(export_program, program_values, max_workers,
+                        session, cache=cache, refresh=refresh,
+                        backend=backend, academic_year=academic_year)
+
+
+def print_summary(results: list[BulkResult], file: TextIO = None) -> None:
+    """Prints the summary of a bulk export.
+
+    Parameters
+    ----------
+    results: list[BulkResult]
+        The results of the bulk export
+    file: TextIO
+        The file to print to, defaults to stderr
+    """
+    print_results(results, (
+        f"Failed to export {result.program_value}: {result.error}"
+        for result in results if not result.successful
+    ), "programs", file)
+
+
+def print_results(results: list[Any], messages: Iterable[str], name: str,
+                  file: TextIO = None) -> None:
+    """Prints some messages followed by the number of successful exports.
+
+    Parameters
+    ----------
+    results: list[Any]
+        The results with a successful property e.g. BulkResult
+    messages: Iterable[str]
+        The lines to print before the total
+    name: str
+        The name of the exported items e.g. programs
+    file: TextIO
+        The file to print to, defaults to stderr
+    """
+    if file is None:
+        file = sys.stderr
+
+    for message in messages:
+        print(message, file=file)
+
+    failed = sum(not result.successful for result in results)
+    print(f"Exported {len(results) - failed}/{len(results)} {name}"
+          f" ({failed} failed)", file=file)
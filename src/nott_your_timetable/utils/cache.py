@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Persistent on-disk cache for the raw timetable responses."""
+import os
+import sys
+import time
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from collections.abc import Iterator
+from typing import TextIO
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+CACHE_SUFFIX = ".html"
+
+
+def default_cache_dir() -> str:
+    """Gets the default cache directory of the platform.
+
+    Returns
+    -------
+    str
+        The path of the cache directory
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        return os.path.join(base, "nott-your-timetable", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/nott-your-timetable")
+
+    base = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(base, "nott-your-timetable")
+
+
+class ResponseCache:
+    """A directory of raw responses keyed by program value and query.
+
+    Entries expire after the TTL and the least recently used entries are
+    evicted when the cache is bigger than the maximum size. The cache can be
+    shared between processes as every access is done while holding a lock.
+
+    Parameters
+    ----------
+    directory: str
+        The cache directory, defaults to the platform cache directory
+    ttl: float
+        The number of seconds an entry is valid for
+    max_size: int
+        The maximum size of the cache in bytes
+    """
+    def __init__(self, directory: str = None, ttl: float = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        if directory is None:
+            directory = default_cache_dir()
+
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(program_value: str, query: str) -> str:
+        """Gets the key of a request.
+
+        Parameters
+        ----------
+        program_value: str
+            The program value of the request
+        query: str
+            The query string of the request
+
+        Returns
+        -------
+        str
+            The key of the request
+        """
+        data = f"{program_value}\n{query}".encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, program_value: str, query: str) -> str | None:
+        """Gets the cached response of a request.
+
+        Parameters
+        ----------
+        program_value: str
+            The program value of the request
+        query: str
+            The query string of the request
+
+        Returns
+        -------
+        str
+            The cached response
+        None
+            If the response is not cached or has expired
+        """
+        path = self._get_path(self.make_key(program_value, query))
+        if not os.path.isdir(self.directory):
+            return None
+
+        # The lock can't be opened in a read-only directory
+        try:
+            with self._lock(exclusive=False):
+                modified = os.path.getmtime(path)
+                if time.time() - modified > self.ttl:
+                    return None
+                with open(path, "r", encoding="utf-8") as file:
+                    data = file.read()
+                # Marking entry as recently used
+                os.utime(path, (time.time(), modified))
+        except OSError:
+            return None
+
+        return data
+
+    def set(self, program_value: str, query: str, data: str) -> None:
+        """Stores the response of a request.
+
+        Parameters
+        ----------
+        program_value: str
+            The program value of the request
+        query: str
+            The query string of the request
+        data: str
+            The response to store
+        """
+        with self.writer(program_value, query) as file:
+            file.write(data)
+
+    @contextmanager
+    def writer(self, program_value: str, query: str) -> Iterator[TextIO]:
+        """Stores the response of a request as it is written.
+
+        The response is written to a temporary file first so readers never
+        see a partially written entry. The entry is only stored if no error
+        is raised inside the context.
+
+        Parameters
+        ----------
+        program_value: str
+            The program value of the request
+        query: str
+            The query string of the request
+
+        Returns
+        -------
+        Iterator[TextIO]
+            The file to write the response into
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._get_path(self.make_key(program_value, query))
+
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                yield file
+            with self._lock(exclusive=True):
+                os.replace(temp_path, path)
+                self._evict()
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def clear(self) -> None:
+        """Removes every entry in the cache."""
+        if not os.path.isdir(self.directory):
+            return
+
+        with self._lock(exclusive=True):
+            for path, *_ in self._get_entries():
+                os.unlink(path)
+
+    def _evict(self) -> None:
+        """Removes expired entries and the least recently used entries until
+        the cache fits the maximum size. The lock must be held."""
+        now = time.time()
+        entries = []
+        size = 0
+        for path, used, modified, entry_size in self._get_entries():
+            if now - modified > self.ttl:
+                os.unlink(path)
+                continue
+            entries.append((used, path, entry_size))
+            size += entry_size
+
+        entries.sort()
+        for _, path, entry_size in entries:
+            if size <= self.max_size:
+                break
+            os.unlink(path)
+            size -= entry_size
+
+    def _get_entries(self) -> Iterator[tuple[str, float, float, int]]:
+        """Gets all the entries in the cache.
+
+        Returns
+        -------
+        Iterator[tuple[str, float, float, int]]
+            The path, last used time, modified time and size of the entries
+        """
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(CACHE_SUFFIX):
+                    continue
+                stat = entry.stat()
+                yield (entry.path, stat.st_atime, stat.st_mtime,
+                       stat.st_size)
+
+    def _get_path(self, key: str) -> str:
+        """Gets the path of an entry."""
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    @contextmanager
+    def _lock(self, exclusive: bool) -> Iterator[None]:
+        """Locks the cache directory.
+
+        Parameters
+        ----------
+        exclusive: bool
+            Whether to get an exclusive lock or a shared lock.
+            Windows only supports exclusive locks.
+        """
+        with open(os.path.join(self.directory, ".lock"), "a+b") as file:
+            if sys.platform == "win32":
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(file.fileno(),
+                            fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Syncs the timetable into a CalDAV calendar collection."""
+import hashlib
+from typing import Any, NamedTuple
+from urllib.parse import urljoin
+from xml.etree import ElementTree as ET
+import requests
+from icalendar import Calendar as iCalendar
+from .exporters import ICAL_HEADER, ICAL_FOOTER, PRODID, EventUIDs,\
+    get_dtstamp, serialize_ical_event
+from .diff import event_to_row, get_signature
+
+DAV_NS = "DAV:"
+CALDAV_NS = "urn:ietf:params:xml:ns:caldav"
+CALENDAR_QUERY = f"""<?xml version="1.0" encoding="utf-8"?>
+<c:calendar-query xmlns:d="{DAV_NS}" xmlns:c="{CALDAV_NS}">
+  <d:prop>
+    <d:getetag/>
+    <c:calendar-data/>
+  </d:prop>
+  <c:filter>
+    <c:comp-filter name="VCALENDAR">
+      <c:comp-filter name="VEVENT"/>
+    </c:comp-filter>
+  </c:filter>
+</c:calendar-query>
+"""
+TIMEOUT = 30
+
+
+def get_resource_name(uid: str) -> str:
+    """Gets the resource name of an event.
+    UIDs contain characters that many servers don't allow in paths, so the
+    name is a hash of the UID.
+
+    Parameters
+    ----------
+    uid: str
+        The UID of the event
+
+    Returns
+    -------
+    str
+        The resource name e.g. 3f786850e387550fdab836ed7e6dc881de23001b.ics
+    """
+    return hashlib.sha1(uid.encode("utf-8")).hexdigest() + ".ics"
+
+
+class RemoteEvent(NamedTuple):
+    """An event resource in the CalDAV collection.
+
+    Parameters
+    ----------
+    url: str
+        The url of the resource
+    etag: str
+        The ETag of the resource
+    row: tuple | None
+        The values of the event in the order of SCHEDULE_KEYS.
+        None if the resource can't be read.
+    owned: bool
+        Whether the resource was created by nott-your-timetable
+    """
+    url: str
+    etag: str
+    row: tuple | None
+    owned: bool
+
+
+class CalDAVWriter:
+    """Writes the events into a CalDAV calendar collection.
+
+    Every event is a resource named by its unique UID, see EventUIDs and
+    get_resource_name. The collection is read once in write_header using a
+    single REPORT request, after that only the events that are new or
+    changed are uploaded and the events that are no longer in the schedule
+    are deleted. Only resources created by nott-your-timetable are ever
+    deleted. All the requests use conditional headers so changes made by
+    someone else in between are never overwritten.
+
+    Parameters
+    ----------
+    url: str
+        The url of the calendar collection
+    session: requests.Session
+        The session used to make the requests.
+        If None is provided, a new session will be created.
+    auth: Any
+        The authentication used by requests e.g. (username, password)
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, url: str, session: requests.Session = None,
+                 auth: Any = None):
+        # Resources are relative to the collection
+        self.url = url if url.endswith("/") else url + "/"
+        self.session = requests.Session() if session is None else session
+        self.auth = auth
+        self.dtstamp = get_dtstamp()
+        self.uids = EventUIDs()
+        self.remote: dict[str, RemoteEvent] = {}
+        self.seen: set[str] = set()
+        self.changes: dict[str, list[str]] = {
+            "added": [],
+            "changed": [],
+            "deleted": [],
+            "unchanged": [],
+            "failed": []
+        }
+
+    def write_header(self) -> None:
+        """Reads all the events in the collection."""
+        self.remote = self.get_remote_events()
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Uploads a single event if it is new or changed.
+        Parallel events are uploaded once all of them are added, see
+        EventUIDs.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        for uid, event in self.uids.add(row):
+            self.sync_event(uid, event)
+
+    def sync_event(self, uid: str, row: tuple[Any, ...]) -> None:
+        """Uploads a single event with its unique UID if it is new or
+        changed.
+
+        Parameters
+        ----------
+        uid: str
+            The UID of the event
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        self.seen.add(uid)
+
+        remote = self.remote.get(uid)
+        if remote is None:
+            url = urljoin(self.url, get_resource_name(uid))
+            self.put_event(uid, row, url, {"If-None-Match": "*"}, "added")
+        elif remote.row is None or \
+                get_signature(row) != get_signature(remote.row):
+            self.put_event(uid, row, remote.url, {"If-Match": remote.etag},
+                           "changed")
+        else:
+            self.changes["unchanged"].append(uid)
+
+    def write_footer(self) -> None:
+        """Uploads the remaining events and deletes the events that are no
+        longer in the schedule."""
+        for uid, event in self.uids.flush():
+            self.sync_event(uid, event)
+
+        for uid, remote in self.remote.items():
+            if uid in self.seen or not remote.owned:
+                continue
+            response = self.session.delete(
+                remote.url, headers={"If-Match": remote.etag},
+                auth=self.auth, timeout=TIMEOUT
+            )
+            self.record(uid, response, "deleted")
+
+    def put_event(self, uid: str, row: tuple[Any, ...], url: str,
+                  headers: dict[str, str], change: str) -> None:
+        """Uploads a single event.
+
+        Parameters
+        ----------
+        uid: str
+            The UID of the event
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        url: str
+            The url of the resource
+        headers: dict[str, str]
+            The conditional headers of the request
+        change: str
+            The kind of change, it can be [added, changed]
+        """
+        data = ICAL_HEADER + serialize_ical_event(row, self.dtstamp,
+                                                  uid=uid) + ICAL_FOOTER
+        response = self.session.put(
+            url, data=data.encode("utf-8"),
+            headers={"Content-Type": "text/calendar; charset=utf-8",
+                     **headers},
+            auth=self.auth, timeout=TIMEOUT
+        )
+        self.record(uid, response, change)
+
+    def record(self, uid: str, response: requests.Response,
+               change: str) -> None:
+        """Records the outcome of a request.
+
+        Parameters
+        ----------
+        uid: str
+            The UID of the event
+        response: requests.Response
+            The response of the request
+        change: str
+            The kind of change, it can be [added, changed, deleted]
+        """
+        if response.ok:
+            self.changes[change].append(uid)
+        else:
+            self.changes["failed"].append(
+                f"{uid}: {change} failed with {response.status_code}"
+            )
+
+    def get_remote_events(self) -> dict[str, RemoteEvent]:
+        """Gets all the events in the collection.
+
+        Returns
+        -------
+        dict[str, RemoteEvent]
+            The events by UID
+
+        Raises
+        ------
+        requests.HTTPError
+            If the collection can't be read
+        """
+        response = self.session.request(
+            "REPORT", self.url, data=CALENDAR_QUERY.encode("utf-8"),
+            headers={"Depth": "1",
+                     "Content-Type": "application/xml; charset=utf-8"},
+            auth=self.auth, timeout=TIMEOUT
+        )
+        response.raise_for_status()
+
+        events = {}
+        root = ET.fromstring(response.content)
+        for resource in root.iter(f"{{{DAV_NS}}}response"):
+            href = resource.findtext(f"{{{DAV_NS}}}href")
+            etag = resource.findtext(f".//{{{DAV_NS}}}getetag")
+            data = resource.findtext(f".//{{{CALDAV_NS}}}calendar-data")
+            if href is None or etag is None or not data:
+                continue
+
+            url = urljoin(self.url, href)
+            try:
+                calendar = iCalendar.from_ical(data)
+                event = calendar.walk("VEVENT")[0]
+                uid = str(event["UID"])
+                row = None if "RRULE" in event else event_to_row(event)
+            except (ValueError, KeyError, IndexError):
+                continue
+            events[uid] = RemoteEvent(
+                url, etag, row, str(calendar.get("PRODID", "")) == PRODID
+            )
+
+        return events
+
+
+def sync_caldav(schedule_data: Any, url: str,
+                session: requests.Session = None,
+                auth: Any = None) -> dict[str, list[str]]:
+    """Syncs the timetable into a CalDAV calendar collection.
+    See CalDAVWriter for more information.
+
+    Parameters
+    ----------
+    schedule_data: ScheduleData
+        The timetable to sync
+    url: str
+        The url of the calendar collection
+    session: requests.Session
+        The session used to make the requests.
+        If None is provided, a new session will be created.
+    auth: Any
+        The authentication used by requests e.g. (username, password)
+
+    Returns
+    -------
+    dict[str, list[str]]
+        The UIDs of the added, changed, deleted and unchanged events and the
+        failed requests
+    """
+    owned_session = session is None
+    if owned_session:
+        session = requests.Session()
+
+    try:
+        writer = CalDAVWriter(url, session, auth)
+        schedule_data.write(writer)
+    finally:
+        if owned_session:
+            session.close()
+
+    return writer.changes
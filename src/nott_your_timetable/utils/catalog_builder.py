@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""Builds the department and program data from the timetable source.
+
+The reporting page defines the departments and programs as JavaScript
+arrays e.g. ``deptarray[0] [0] = "Central";``. The same statements are in
+the scrapers/*.js scripts. The arrays are sorted and turned into objects
+the same way as the scripts so the output is identical to running them
+with node.
+"""
+import os
+import re
+import sys
+import json
+import zlib
+import hashlib
+import marshal
+import argparse
+from typing import Any
+
+DEPT_ARRAY = "deptarray"
+PROGRAM_ARRAY = "programmearray"
+DEPT_FILE = "dept.json"
+PROGRAM_FILE = "program.json"
+CATALOG_FILE = "catalog.bin"
+CATALOG_VERSION = 1
+CATALOG_KEYS = frozenset({"dept_data", "program_data", "program_index",
+                          "value_index", "program_values"})
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+ASSIGNMENT_PATTERN = r"""\b{name}\s*\[\s*(\d+)\s*\]\s*\[\s*(\d+)\s*\]\s*=\s*
+    ("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')\s*;"""
+LENGTH_PATTERN = r"\b{name}\s*=\s*new\s+Array\s*\(\s*(\d+)\s*\)"
+ESCAPE_PATTERN = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|"
+                            r"x[0-9a-fA-F]{2}|.)", re.DOTALL)
+ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f",
+           "v": "\v", "0": "\0"}
+
+
+def unescape_js_string(literal: str) -> str:
+    """Gets the value of a JavaScript string literal.
+
+    Parameters
+    ----------
+    literal: str
+        The string literal including the quotes
+
+    Returns
+    -------
+    str
+        The value of the string
+    """
+    def replace(match: re.Match) -> str:
+        escape = match.group(1)
+        if escape.startswith("u{"):
+            return chr(int(escape[2:-1], 16))
+        if escape[0] in "ux" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return ESCAPES.get(escape, escape)
+
+    return ESCAPE_PATTERN.sub(replace, literal[1:-1])
+
+
+def parse_js_array(source: str, name: str) -> list[list[str | None]]:
+    """Parses the element assignments of a two dimensional JavaScript array.
+
+    Parameters
+    ----------
+    source: str
+        The JavaScript or HTML source containing the array
+    name: str
+        The name of the array e.g. deptarray
+
+    Returns
+    -------
+    list[list[str | None]]
+        The rows of the array, unassigned elements are None
+
+    Raises
+    ------
+    ValueError
+        If the array is not found
+    """
+    rows: list[list[str | None]] = []
+
+    # Creating the rows of the declared length
+    length = re.search(LENGTH_PATTERN.format(name=re.escape(name)), source)
+    if length is not None:
+        rows.extend([] for _ in range(int(length.group(1))))
+
+    pattern = re.compile(ASSIGNMENT_PATTERN.format(name=re.escape(name)),
+                         re.VERBOSE)
+    found = False
+    for match in pattern.finditer(source):
+        found = True
+        row, column = int(match.group(1)), int(match.group(2))
+        while len(rows) <= row:
+            rows.append([])
+        while len(rows[row]) <= column:
+            rows[row].append(None)
+        rows[row][column] = unescape_js_string(match.group(3))
+
+    if not found:
+        raise ValueError(f"{name} not found in source")
+
+    return rows
+
+
+def js_sort_key(row: list[str | None]) -> bytes:
+    """Gets the key to sort a row like Array.prototype.sort without a
+    compare function.
+
+    The rows are converted to strings by joining the elements with commas
+    where missing elements are empty. The strings are compared by their
+    UTF-16 code units.
+
+    Parameters
+    ----------
+    row: list[str | None]
+        The row of the array
+
+    Returns
+    -------
+    bytes
+        The sort key
+    """
+    text = ",".join("" if value is None else value for value in row)
+    return text.encode("utf-16-be")
+
+
+def js_object(items: list[tuple[str, Any]]) -> dict[str, Any]:
+    """Creates a dict with the same key order as a JavaScript object.
+    Array index keys are ordered first in ascending order followed by the
+    other keys in insertion order.
+
+    Parameters
+    ----------
+    items: list[tuple[str, Any]]
+        The keys and values in the order they are set
+
+    Returns
+    -------
+    dict[str, Any]
+        The object
+    """
+    def is_index(key: str) -> bool:
+        return key.isdigit() and str(int(key)) == key and \
+            int(key) < 2 ** 32 - 1
+
+    values = dict(items)
+    indexes = sorted((key for key in values if is_index(key)), key=int)
+    others = [key for key in values if not is_index(key)]
+
+    return {key: values[key] for key in indexes + others}
+
+
+def build_dept_data(rows: list[list[str | None]]) -> dict[str, str]:
+    """Builds the department data like scrapers/deptarray.js.
+
+    Parameters
+    ----------
+    rows: list[list[str | None]]
+        The rows of deptarray
+
+    Returns
+    -------
+    dict[str, str]
+        The value of every school/division by name
+    """
+    items = []
+    for index, row in enumerate(sorted(rows, key=js_sort_key)):
+        if len(row) < 2 or None in row[:2]:
+            raise ValueError(f"Incomplete department at sorted index {index}")
+        items.append((row[0], row[1]))
+
+    return js_object(items)
+
+
+def build_program_data(
+        rows: list[list[str | None]]
+) -> dict[str, dict[str, str]]:
+    """Builds the program data like scrapers/programmearray.js.
+
+    Parameters
+    ----------
+    rows: list[list[str | None]]
+        The rows of programmearray
+
+    Returns
+    -------
+    dict[str, dict[str, str]]
+        The value of every program by name for every school/division value
+    """
+    departments: dict[str, list[tuple[str, str]]] = {}
+    for index, row in enumerate(sorted(rows, key=js_sort_key)):
+        if len(row) < 3 or None in row[:3]:
+            raise ValueError(f"Incomplete program at sorted index {index}")
+        option, dept, value = row[:3]
+        departments.setdefault(dept, []).append((option, value))
+
+    return js_object([(dept, js_object(programs))
+                      for dept, programs in departments.items()])
+
+
+def dump_json(data: dict) -> str:
+    """Serializes the data like JSON.stringify(data, null, 2).
+
+    Parameters
+    ----------
+    data: dict
+        The data to serialize
+
+    Returns
+    -------
+    str
+        The JSON
+    """
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def get_checksum(data: str) -> str:
+    """Gets the checksum of a file content.
+
+    Parameters
+    ----------
+    data: str
+        The content of the file
+
+    Returns
+    -------
+    str
+        The SHA-256 checksum
+    """
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def build_catalog(dept_data: dict[str, str],
+                  program_data: dict[str, dict[str, str]],
+                  checksums: dict[str, str]) -> bytes:
+    """Builds the precomputed catalog.
+
+    The first line of the catalog is a json header containing the versions
+    and the checksums of the json files and of the data. The rest is the
+    data with the lookup indexes of Catalog serialized using marshal. It
+    loads about twice as fast as the json files because the names are only
+    stored once and the indexes don't need to be built.
+
+    Parameters
+    ----------
+    dept_data: dict[str, str]
+        The department data
+    program_data: dict[str, dict[str, str]]
+        The program data
+    checksums: dict[str, str]
+        The checksums of dept.json and program.json
+
+    Returns
+    -------
+    bytes
+        The content of catalog.bin
+    """
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from .data import Catalog
+    catalog = Catalog(dept_data, program_data)
+
+    payload = marshal.dumps({
+        "dept_data": dept_data,
+        "program_data": program_data,
+        # Sorted by program name
+        "program_index": dict(sorted(catalog.program_index.items())),
+        "value_index": catalog.value_index,
+        "program_values": catalog.program_values
+    })
+    header = json.dumps({
+        "version": CATALOG_VERSION,
+        "marshal": marshal.version,
+        "checksums": {**checksums, "payload": zlib.crc32(payload)}
+    }, separators=(",", ":"))
+
+    return header.encode("utf-8") + b"\n" + payload
+
+
+def read_catalog_file(path: Any) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Reads the header and the data of a precomputed catalog.
+
+    Parameters
+    ----------
+    path: Any
+        The catalog file
+
+    Returns
+    -------
+    tuple[dict[str, Any], dict[str, Any]]
+        The header and the data
+
+    Raises
+    ------
+    ValueError
+        If the catalog is invalid or corrupted
+    """
+    with open(path, "rb") as file:
+        header_line = file.readline()
+        payload = file.read()
+
+    header = json.loads(header_line)
+    if not isinstance(header, dict) or \
+            header.get("version") != CATALOG_VERSION:
+        raise ValueError("Unsupported catalog version")
+    # Newer marshal formats can't be read by older versions of Python
+    if header.get("marshal", marshal.version + 1) > marshal.version:
+        raise ValueError("Catalog was built by a newer version of Python")
+    if zlib.crc32(payload) != header.get("checksums", {}).get("payload"):
+        raise ValueError("Catalog checksum mismatch")
+
+    try:
+        catalog = marshal.loads(payload)
+    except (EOFError, TypeError) as err:
+        raise ValueError("Invalid catalog") from err
+    if not isinstance(catalog, dict):
+        raise ValueError("Invalid catalog")
+
+    return header, catalog
+
+
+def find_stale_files(checksums: dict[str, str],
+                     sources: dict[str, str]) -> list[str]:
+    """Finds the json files that changed since the catalog was built.
+
+    Parameters
+    ----------
+    checksums: dict[str, str]
+        The checksums stored in the catalog header
+    sources: dict[str, str]
+        The content of the json files by filename
+
+    Returns
+    -------
+    list[str]
+        The filenames with a different checksum
+    """
+    return [filename for filename, source in sources.items()
+            if checksums.get(filename) != get_checksum(source)]
+
+
+def read_catalog(path: Any,
+                 sources: dict[str, str] | None = None) -> dict[str, Any]:
+    """Reads the data and indexes from a precomputed catalog.
+
+    Parameters
+    ----------
+    path: Any
+        The catalog file
+    sources: dict[str, str] | None
+        The content of dept.json and program.json by filename. If provided,
+        the catalog must have been built from them.
+
+    Returns
+    -------
+    dict[str, Any]
+        The data and indexes, see build_catalog
+
+    Raises
+    ------
+    ValueError
+        If the catalog is invalid, corrupted or out of date
+    """
+    header, catalog = read_catalog_file(path)
+    missing = CATALOG_KEYS.difference(catalog)
+    if missing:
+        raise ValueError(f"Catalog is missing {', '.join(sorted(missing))}")
+
+    if sources is not None:
+        stale = find_stale_files(header.get("checksums", {}), sources)
+        if stale:
+            raise ValueError(f"Catalog is out of date with "
+                             f"{', '.join(stale)}")
+
+    return catalog
+
+
+def check_catalog(data_dir: str) -> list[str]:
+    """Checks that the catalog matches the json files.
+
+    Parameters
+    ----------
+    data_dir: str
+        The directory containing dept.json, program.json and catalog.bin
+
+    Returns
+    -------
+    list[str]
+        The problems found, empty if the catalog is consistent
+    """
+    problems = []
+    sources = {}
+    for filename in (DEPT_FILE, PROGRAM_FILE):
+        with open(os.path.join(data_dir, filename), "r",
+                  encoding="utf-8") as file:
+            sources[filename] = file.read()
+
+    path = os.path.join(data_dir, CATALOG_FILE)
+    try:
+        checksums = read_catalog_file(path)[0]["checksums"]
+        catalog = read_catalog(path)
+    except (OSError, ValueError) as err:
+        return [f"{CATALOG_FILE}: {err}"]
+
+    for filename in find_stale_files(checksums, sources):
+        problems.append(f"{filename}: checksum does not match "
+                        f"{CATALOG_FILE}")
+
+    expected = {DEPT_FILE: catalog["dept_data"],
+                PROGRAM_FILE: catalog["program_data"]}
+    for filename, data in expected.items():
+        current = json.loads(sources[filename])
+        # Comparing the order as well as the content
+        if json.dumps(current) != json.dumps(data):
+            problems.append(f"{filename}: content does not match "
+                            f"{CATALOG_FILE}")
+
+    return problems
+
+
+def build(dept_source: str, program_source: str,
+          output_dir: str) -> list[str]:
+    """Builds dept.json, program.json and catalog.bin.
+
+    Parameters
+    ----------
+    dept_source: str
+        The source containing deptarray
+    program_source: str
+        The source containing programmearray
+    output_dir: str
+        The directory to write the files into
+
+    Returns
+    -------
+    list[str]
+        The written files
+    """
+    dept_data = build_dept_data(parse_js_array(dept_source, DEPT_ARRAY))
+    program_data = build_program_data(
+        parse_js_array(program_source, PROGRAM_ARRAY)
+    )
+
+    outputs: dict[str, str | bytes] = {
+        DEPT_FILE: dump_json(dept_data),
+        PROGRAM_FILE: dump_json(program_data)
+    }
+    checksums = {filename: get_checksum(data)
+                 for filename, data in outputs.items()}
+    outputs[CATALOG_FILE] = build_catalog(dept_data, program_data,
+                                          checksums)
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for filename, data in outputs.items():
+        path = os.path.join(output_dir, filename)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with open(path, "wb") as file:
+            file.write(data)
+        written.append(path)
+
+    return written
+
+
+def main() -> int:
+    """Catalog builder main function."""
+    parser = argparse.ArgumentParser(description="""Builds the department
+    and program data from the scraper scripts or a saved reporting
+    page.""")
+    parser.add_argument("--dept", type=str, default=None,
+                        help="""The file containing deptarray e.g.
+                        scrapers/deptarray.js""")
+    parser.add_argument("--programs", type=str, default=None,
+                        help="""The file containing programmearray e.g.
+                        scrapers/programmearray.js""")
+    parser.add_argument("--source", type=str, default=None,
+                        help="""A file containing both arrays e.g. a saved
+                        reporting page.""")
+    parser.add_argument("-od", "--output-dir", type=str, default=None,
+                        help="""Sets the output directory, defaults to the
+                        installed data directory.""")
+    parser.add_argument("--check", action="store_true",
+                        help="""Checks that catalog.bin matches the json
+                        files instead of building.""")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir
+    if output_dir is None:
+        output_dir = DATA_DIR
+
+    if args.check:
+        problems = check_catalog(output_dir)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        return 1 if problems else 0
+
+    dept_path = args.dept or args.source
+    program_path = args.programs or args.source
+    if dept_path is None or program_path is None:
+        parser.error("--source or both --dept and --programs are required")
+
+    try:
+        with open(dept_path, "r", encoding="utf-8") as file:
+            dept_source = file.read()
+        with open(program_path, "r", encoding="utf-8") as file:
+            program_source = file.read()
+        written = build(dept_source, program_source, output_dir)
+    except (OSError, ValueError) as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    for path in written:
+        print(f"Data Exported to {path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,198 @@
 #!/usr/bin/env python3
 """Alias functions to fetch all the data needed."""
 import json
+import threading
+from typing import Any
+from functools import cached_property
 from importlib.resources import files
 from .weeks import find_current_week_nott
+from .range_handlers import ALL_DAYS, ALL_WEEKS, RangeSet
+from .search import SearchIndex
+from .catalog_builder import CATALOG_FILE, DEPT_FILE, PROGRAM_FILE,\
+    read_catalog
+
+
+class Catalog:
+    """The department and program data with indexes for fast lookups.
+
+    Parameters
+    ----------
+    dept_data: dict[str, str]
+        The value of every school/division by name
+    program_data: dict[str, dict[str, str]]
+        The value of every program by name for every school/division value
+    indexes: dict[str, Any] | None
+        The precomputed program_index, value_index and program_values e.g.
+        from catalog.bin. If None is provided, they will be built.
+    """
+    def __init__(self, dept_data: dict[str, str],
+                 program_data: dict[str, dict[str, str]],
+                 indexes: dict[str, Any] | None = None):
+        self.dept_data = dept_data
+        self.program_data = program_data
+
+        # School/division name -> programs
+        self.school_programs: dict[str, dict[str, str]] = {
+            school: program_data.get(school_value, {})
+            for school, school_value in dept_data.items()
+        }
+        if indexes is not None:
+            self.program_index: dict[str, str] = indexes["program_index"]
+            self.value_index: dict[str, tuple[str, str]] = \
+                indexes["value_index"]
+            self._program_values: list[str] = indexes["program_values"]
+            return
+
+        # Program name -> program value
+        self.program_index: dict[str, str] = {}
+        # Program value -> (school/division name, program name)
+        self.value_index: dict[str, tuple[str, str]] = {}
+        for school, programs in self.school_programs.items():
+            for program, value in programs.items():
+                self.program_index.setdefault(program, value)
+                # Skipping placeholder values
+                if value != "NULL":
+                    self.value_index.setdefault(value, (school, program))
+
+        # Using dict to remove duplicates while keeping the order
+        values = {}
+        for programs in program_data.values():
+            for value in programs.values():
+                # Skipping placeholder values
+                if value != "NULL":
+                    values[value] = None
+        self._program_values = list(values)
+
+    @classmethod
+    def load(cls) -> "Catalog":
+        """Loads the catalog from the precomputed catalog.bin built by
+        catalog_builder, falling back to the json files if it is missing,
+        corrupted or was built from different json files.
+
+        Returns
+        -------
+        Catalog
+            The loaded catalog
+        """
+        data_path = files('nott_your_timetable.data')
+        sources = {}
+        for filename in (DEPT_FILE, PROGRAM_FILE):
+            with open(data_path.joinpath(filename), "r", encoding="utf-8")\
+                 as file:
+                sources[filename] = file.read()
+
+        try:
+            catalog = read_catalog(data_path.joinpath(CATALOG_FILE),
+                                   sources)
+            return cls(catalog["dept_data"], catalog["program_data"],
+                       catalog)
+        except (OSError, ValueError):
+            pass
+
+        dept_data: dict = json.loads(sources[DEPT_FILE])
+        program_data: dict = json.loads(sources[PROGRAM_FILE])
+
+        return cls(dept_data, program_data)
+
+    def get_programs(self, school: str) -> dict[str, str]:
+        """Gets all the programs of a school/division.
+
+        Parameters
+        ----------
+        school: str
+            The name of the school/division
+
+        Returns
+        -------
+        dict[str, str]
+            The value of every program by name
+        """
+        programs = self.school_programs.get(school)
+        if programs is None:
+            raise ValueError("Invalid School Name")
+
+        return programs
+
+    def get_program_value(self, school: str, program: str) -> str:
+        """Gets the value of the program.
+
+        Parameters
+        ----------
+        school: str
+            The school of the program.
+        program: str
+            The program to find the value of.
+
+        Returns
+        -------
+        str
+            The value of the program
+        """
+        program_value = self.get_programs(school).get(program)
+        if program_value is None:
+            raise ValueError("Invalid Program")
+
+        return program_value
+
+    def find_program(self, program_value: str) -> tuple[str, str] | None:
+        """Finds the program of a program value.
+
+        Parameters
+        ----------
+        program_value: str
+            The value of the program e.g. UG/M1225/M6UBSECFF/F/01
+
+        Returns
+        -------
+        tuple[str, str]
+            The school/division name and the program name
+        None
+            If the program value is not found
+        """
+        return self.value_index.get(program_value)
+
+    @cached_property
+    def search_index(self) -> SearchIndex:
+        """The search index of all the programs, built on first use."""
+        return SearchIndex(
+            (school, program, value)
+            for school, programs in self.school_programs.items()
+            for program, value in programs.items()
+            # Skipping placeholder values
+            if value != "NULL"
+        )
+
+    @property
+    def program_values(self) -> list[str]:
+        """The value of every program without duplicates."""
+        return list(self._program_values)
+
+
+_CATALOG: Catalog | None = None
+_CATALOG_LOCK = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Gets the catalog shared by the whole process.
+    The json files are only read the first time it is called.
+
+    Returns
+    -------
+    Catalog
+        The catalog
+    """
+    global _CATALOG  # pylint: disable=global-statement
+    if _CATALOG is None:
+        with _CATALOG_LOCK:
+            if _CATALOG is None:
+                _CATALOG = Catalog.load()
+
+    return _CATALOG
 
 
 def get_data() -> tuple[dict, dict]:
     """Gets Department and program data from json files.
+    The data is shared by the whole process and must not be modified.
 
     Returns
     -------
@@ -14,49 +200,44 @@ def get_data() -> tuple[dict, dict]:
         The data where the first one is the department data
         and the second one is the program data.
     """
-    data_path = files('nott_your_timetable.data')
-    with open(data_path.joinpath("dept.json"), "r", encoding="utf-8")\
-         as file:
-        dept_data: dict = json.load(file)
-    with open(data_path.joinpath("program.json"), "r", encoding="utf-8")\
-         as file:
-        program_data: dict = json.load(file)
-
-    return (dept_data, program_data)
+    catalog = get_catalog()
+    return (catalog.dept_data, catalog.program_data)
 
 
-def get_convinience_weeks() -> dict[str, str]:
+def get_convinience_weeks() -> dict[str, RangeSet]:
     """Gets All the Convience Weeks ranges.
 
     Returns
     -------
-    dict[str, str]
+    dict[str, RangeSet]
         The Convinience Weeks and it's ranges
     """
+    autumn = RangeSet.from_range(4, 15)
+    spring = RangeSet.from_range(22, 33)
     output = {
-        "All Year": "1-52",
-        "Autumn": "4-15",
-        "Spring": "22-33",
-        "Summer": "38-49",
-        "Full Year": "4-15, 22-33",
-        "This Week": str(find_current_week_nott())
+        "All Year": ALL_WEEKS,
+        "Autumn": autumn,
+        "Spring": spring,
+        "Summer": RangeSet.from_range(38, 49),
+        "Full Year": autumn | spring,
+        "This Week": RangeSet.from_values([find_current_week_nott()])
     }
 
     return output
 
 
-def get_convinience_days() -> dict[str, str]:
+def get_convinience_days() -> dict[str, RangeSet]:
     """Gets All the Convience Days ranges.
 
     Returns
     -------
-    dict[str, str]
+    dict[str, RangeSet]
         The Convinience Days and it's ranges
     """
     output = {
-        "Weekdays": "1-5",
-        "All Week": "1-7",
-        "Weekends": "6-7"
+        "Weekdays": RangeSet.from_range(1, 5),
+        "All Week": ALL_DAYS,
+        "Weekends": RangeSet.from_range(6, 7)
     }
 
     return output
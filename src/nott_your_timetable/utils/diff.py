@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Functions to export only the changes since a previous export."""
+import csv
+import json
+import datetime
+from typing import Any, NamedTuple, TextIO
+from .exporters import ICAL_HEADER, EventUIDs, ICalWriter,\
+    get_event_times, get_event_uid, serialize_ical_event
+
+
+class PreviousEvent(NamedTuple):
+    """An event of a previous export.
+
+    Parameters
+    ----------
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+    sequence: int
+        The SEQUENCE of the event, 0 if it was never changed
+    """
+    row: tuple
+    sequence: int = 0
+
+
+def read_previous(path: str) -> dict[str, PreviousEvent]:
+    """Reads the events of a previous ics or csv export.
+
+    Parameters
+    ----------
+    path: str
+        The previous export, the format is found using the file extension
+
+    Returns
+    -------
+    dict[str, PreviousEvent]
+        The events by unique UID, see EventUIDs
+
+    Raises
+    ------
+    ValueError
+        If the file can't be read
+    """
+    if path.lower().endswith(".csv"):
+        return read_previous_csv(path)
+    return read_previous_ical(path)
+
+
+def read_previous_csv(path: str) -> dict[str, PreviousEvent]:
+    """Reads the events of a previous csv export.
+
+    Parameters
+    ----------
+    path: str
+        The previous csv export
+
+    Returns
+    -------
+    dict[str, PreviousEvent]
+        The events by unique UID, see EventUIDs
+    """
+    def parse(value: str, parser: Any) -> Any:
+        # Empty values are written for None
+        return parser(value) if value != "" else None
+
+    events = []
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        for values in csv.DictReader(file):
+            try:
+                row = (
+                    values["Subject"],
+                    parse(values["Start Date"], datetime.date.fromisoformat),
+                    parse(values["Start Time"], datetime.time.fromisoformat),
+                    parse(values["End Date"], datetime.date.fromisoformat),
+                    parse(values["End Time"], datetime.time.fromisoformat),
+                    parse(values["All Day Event"], bool),
+                    parse(values["Description"], str),
+                    values["Location"]
+                )
+            except KeyError as err:
+                raise ValueError(f"Missing csv column {err}") from err
+            events.append((get_event_uid(row), PreviousEvent(row)))
+
+    return get_unique_events(events)
+
+
+def read_previous_ical(path: str) -> dict[str, PreviousEvent]:
+    """Reads the events of a previous ics export.
+
+    Parameters
+    ----------
+    path: str
+        The previous ics export
+
+    Returns
+    -------
+    dict[str, PreviousEvent]
+        The events by unique UID, see EventUIDs
+    """
+    # pylint: disable=import-outside-toplevel
+    from icalendar import Calendar as iCalendar
+
+    with open(path, "rb") as file:
+        calendar = iCalendar.from_ical(file.read())
+
+    events = []
+    for event in calendar.walk("VEVENT"):
+        if "RRULE" in event or "RDATE" in event:
+            raise ValueError("Calendars with recurring events are not "
+                             "supported")
+        # Skipping events that are already cancelled
+        if str(event.get("STATUS", "")).upper() == "CANCELLED":
+            continue
+
+        events.append((str(event["UID"]), PreviousEvent(
+            event_to_row(event), int(event.get("SEQUENCE", 0))
+        )))
+
+    # Older exports repeat the UID of parallel events
+    return get_unique_events(events)
+
+
+def get_unique_events(
+        events: list[tuple[str, PreviousEvent]]) -> dict[str, PreviousEvent]:
+    """Gives the events sharing a UID the same UIDs as EventUIDs.
+
+    Parameters
+    ----------
+    events: list[tuple[str, PreviousEvent]]
+        The UID and the event of every event in the previous export
+
+    Returns
+    -------
+    dict[str, PreviousEvent]
+        The events by unique UID
+    """
+    groups: dict[str, list[PreviousEvent]] = {}
+    for uid, event in events:
+        groups.setdefault(uid, []).append(event)
+
+    uids = EventUIDs()
+    unique_events = {}
+    for uid, group in groups.items():
+        unique_uids = uids.get_uids(uid, [event.row for event in group])
+        unique_events.update(zip(unique_uids, group))
+
+    return unique_events
+
+
+def event_to_row(event: Any) -> tuple:
+    """Gets the values of an iCalendar event.
+
+    Parameters
+    ----------
+    event: icalendar.Event
+        The event component
+
+    Returns
+    -------
+    tuple
+        The values of the event in the order of SCHEDULE_KEYS
+    """
+    start = event.decoded("DTSTART")
+    end = event.decoded("DTEND")
+    location = event.get("LOCATION")
+    if location is not None:
+        location = str(location)
+
+    if isinstance(start, datetime.datetime):
+        return (str(event.get("SUMMARY", "")), start.date(), start.time(),
+                None, end.time(), None, None, location)
+    return (str(event.get("SUMMARY", "")), start, None, end, None, True,
+            None, location)
+
+
+def get_signature(row: tuple) -> tuple:
+    """Gets the values of an event that are compared to find changes.
+
+    Parameters
+    ----------
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+
+    Returns
+    -------
+    tuple
+        The subject, start, end and location of the event
+    """
+    # Empty locations are written as None in some formats
+    return (row[0], *get_event_times(row), row[-1] or None)
+
+
+def summarize_event(uid: str, row: tuple) -> dict[str, Any]:
+    """Gets the summary of an event for the change summary.
+
+    Parameters
+    ----------
+    uid: str
+        The UID of the event
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+
+    Returns
+    -------
+    dict[str, Any]
+        The UID, subject, start, end and location of the event
+    """
+    start, end = get_event_times(row)
+    return {
+        "uid": uid,
+        "subject": row[0],
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "location": row[-1]
+    }
+
+
+class DiffICalWriter(ICalWriter):
+    """Writes only the events that changed since a previous export in the
+    iCalendar format.
+
+    Events are matched by their unique UID, see EventUIDs. New events are
+    written as they are, changed events are written with a higher SEQUENCE
+    and events that are no longer in the schedule are written with
+    STATUS:CANCELLED.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write into
+    previous: dict[str, PreviousEvent]
+        The events of the previous export by UID, see read_previous
+    """
+    def __init__(self, file: TextIO, previous: dict[str, PreviousEvent]):
+        super().__init__(file)
+        self.previous = previous
+        self.seen: set[str] = set()
+        self.changes: dict[str, list[dict[str, Any]]] = {
+            "added": [],
+            "changed": [],
+            "cancelled": []
+        }
+
+    def write_header(self) -> None:
+        """Writes the start of the calendar component."""
+        self.file.write(ICAL_HEADER)
+        self.file.write("METHOD:PUBLISH\r\n")
+
+    def write_unique_event(self, uid: str, row: tuple[Any, ...]) -> None:
+        """Writes a single event if it is new or changed.
+
+        Parameters
+        ----------
+        uid: str
+            The UID of the event
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        self.seen.add(uid)
+
+        previous = self.previous.get(uid)
+        if previous is None:
+            self.changes["added"].append(summarize_event(uid, row))
+            self.file.write(serialize_ical_event(row, self.dtstamp,
+                                                 uid=uid))
+            return
+
+        if get_signature(row) == get_signature(previous.row):
+            return
+
+        change = summarize_event(uid, row)
+        change["previous"] = summarize_event(uid, previous.row)
+        self.changes["changed"].append(change)
+        self.file.write(serialize_ical_event(
+            row, self.dtstamp, [f"SEQUENCE:{previous.sequence + 1}"], uid
+        ))
+
+    def write_footer(self) -> None:
+        """Writes the cancelled events and the end of the calendar
+        component."""
+        self.flush()
+        for uid, previous in self.previous.items():
+            if uid in self.seen:
+                continue
+            self.changes["cancelled"].append(
+                summarize_event(uid, previous.row)
+            )
+            self.file.write(serialize_ical_event(
+                previous.row, self.dtstamp,
+                [f"SEQUENCE:{previous.sequence + 1}", "STATUS:CANCELLED"],
+                uid
+            ))
+
+        super().write_footer()
+
+    def write_summary(self, file: TextIO) -> None:
+        """Writes the change summary in JSON.
+
+        Parameters
+        ----------
+        file: TextIO
+            The file to write into
+        """
+        json.dump(self.changes, file, indent=2)
+        file.write("\n")
@@ -0,0 +1,788 @@
+#!/usr/bin/env python3
+"""Writers that export the events of a schedule one at a time."""
+import csv
+import json
+import datetime
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, BinaryIO, TextIO
+
+if TYPE_CHECKING:
+    from icalendar import Calendar as iCalendar
+    from icalendar import Event as iEvent
+
+# icalendar and pyarrow are slow to import, so they are only imported when
+# they are used
+PARQUET_AVAILABLE = find_spec("pyarrow") is not None
+
+SCHEDULE_KEYS = ["Subject", "Start Date", "Start Time", "End Date",
+                 "End Time", "All Day Event", "Description", "Location"]
+PRODID = "-//nott-your-timetable//Nottingham Schedule/EN"
+ICAL_HEADER = f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\n"
+ICAL_FOOTER = "END:VCALENDAR\r\n"
+# The number of rows in each parquet row group
+PARQUET_BATCH_SIZE = 64 * 1024
+# The maximum length of a content line in octets excluding the CRLF
+MAX_LINE_LENGTH = 75
+TEXT_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    ";": "\\;",
+    ",": "\\,",
+    "\n": "\\n",
+    "\r": ""
+})
+
+
+def get_event_uid(row: tuple) -> str:
+    """Gets a UID for an event.
+
+    Parameters
+    ----------
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+
+    Returns
+    -------
+    str
+        The UID of the event
+    """
+    subject, date, start, _, end, *_ = row
+    return f"{date}-{subject}-{start}-{end}"
+
+
+class EventUIDs:
+    """Gets a stable and unique UID for every event of an export.
+
+    An event uses get_event_uid unless parallel events e.g. the same class
+    in two rooms share it, then the location is added e.g. UID-LAB1. Events
+    that still share a UID get a counter e.g. UID-LAB1-2. The events are
+    held until an event with another UID is added, ScheduleData.write
+    writes the parallel events one after another.
+    """
+    def __init__(self):
+        self.uid: str | None = None
+        self.rows: list[tuple] = []
+        self.used: set[str] = set()
+
+    def add(self, row: tuple) -> list[tuple[str, tuple]]:
+        """Adds the next event.
+
+        Parameters
+        ----------
+        row: tuple
+            The values of the event in the order of SCHEDULE_KEYS
+
+        Returns
+        -------
+        list[tuple[str, tuple]]
+            The UID and values of the events that are ready to be written
+        """
+        uid = get_event_uid(row)
+        events = self.flush() if uid != self.uid else []
+        self.uid = uid
+        self.rows.append(row)
+        return events
+
+    def flush(self) -> list[tuple[str, tuple]]:
+        """Gets the UIDs of the events that are held.
+
+        Returns
+        -------
+        list[tuple[str, tuple]]
+            The UID and values of the events
+        """
+        rows = self.rows
+        self.rows = []
+        if not rows:
+            return []
+        return list(zip(self.get_uids(self.uid, rows), rows))
+
+    def get_uids(self, uid: str, rows: list[tuple]) -> list[str]:
+        """Gets the UIDs of the events sharing a UID.
+
+        Parameters
+        ----------
+        uid: str
+            The UID the events share e.g. from get_event_uid
+        rows: list[tuple]
+            The values of the events in the order of SCHEDULE_KEYS
+
+        Returns
+        -------
+        list[str]
+            The unique UID of every event
+        """
+        uids = []
+        for row in rows:
+            base = uid if len(rows) == 1 else f"{uid}-{row[-1]}"
+            unique = base
+            count = 1
+            while unique in self.used:
+                count += 1
+                unique = f"{base}-{count}"
+            self.used.add(unique)
+            uids.append(unique)
+        return uids
+
+
+def get_event_times(row: tuple) -> tuple[datetime.date, datetime.date]:
+    """Gets the start and end of an event.
+
+    Parameters
+    ----------
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+
+    Returns
+    -------
+    tuple[datetime.date, datetime.date]
+        The start and end datetimes, or dates if it is an all day event
+    """
+    _, start_date, start_time, end_date, end_time, all_day, *_ = row
+
+    # Ignoring time if it is an all day event
+    if all_day is not None:
+        return start_date, end_date
+
+    return (datetime.datetime.combine(start_date, start_time),
+            datetime.datetime.combine(start_date, end_time))
+
+
+def make_ical_event(row: tuple,
+                    dtstamp: datetime.datetime = None,
+                    uid: str = None) -> "iEvent":
+    """Creates the iCalendar event component of an event.
+
+    Parameters
+    ----------
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+    dtstamp: datetime.datetime
+        The time the event is created, defaults to now
+    uid: str
+        The UID of the event, defaults to get_event_uid
+
+    Returns
+    -------
+    icalendar.Event
+        The event component
+    """
+    # pylint: disable=import-outside-toplevel
+    from icalendar import Event as iEvent
+
+    subject, *_, location = row
+    dtstart, dtend = get_event_times(row)
+
+    event = iEvent()
+    event.add("dtstamp", datetime.datetime.now() if dtstamp is None
+              else dtstamp)
+    event.add("uid", get_event_uid(row) if uid is None else uid)
+    event.add("dtstart", dtstart)
+    event.add("dtend", dtend)
+    event.add("summary", subject)
+    if location is not None:
+        event.add("location", location)
+
+    return event
+
+
+def get_dtstamp() -> datetime.datetime:
+    """Gets the DTSTAMP shared by all the events of an export.
+
+    Returns
+    -------
+    datetime.datetime
+        The current UTC time without microseconds
+    """
+    return datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+
+def escape_text(value: Any) -> str:
+    """Escapes a value of the TEXT value type.
+    See section 3.3.11 of RFC 5545.
+
+    Parameters
+    ----------
+    value: Any
+        The value to escape
+
+    Returns
+    -------
+    str
+        The escaped value
+    """
+    return str(value).translate(TEXT_ESCAPES)
+
+
+def fold_line(line: str) -> str:
+    """Folds a content line so no line is longer than 75 octets.
+    See section 3.1 of RFC 5545.
+
+    Parameters
+    ----------
+    line: str
+        The content line without the CRLF
+
+    Returns
+    -------
+    str
+        The folded content line ending with CRLF
+    """
+    if len(line) <= MAX_LINE_LENGTH and line.isascii():
+        return line + "\r\n"
+
+    lines = []
+    start = 0
+    length = 0
+    # The first line doesn't have the leading space
+    limit = MAX_LINE_LENGTH
+    for index, char in enumerate(line):
+        # Never splitting a multi-octet character
+        char_length = len(char.encode("utf-8"))
+        if length + char_length > limit:
+            lines.append(line[start:index])
+            start = index
+            length = 0
+            limit = MAX_LINE_LENGTH - 1
+        length += char_length
+    lines.append(line[start:])
+
+    return "\r\n ".join(lines) + "\r\n"
+
+
+def format_ical_date(value: datetime.date) -> str:
+    """Formats a value of the DATE or DATE-TIME value type.
+    Naive datetimes are written as floating times.
+
+    Parameters
+    ----------
+    value: datetime.date
+        The date or datetime to format
+
+    Returns
+    -------
+    str
+        The formatted value with the VALUE parameter for dates
+    """
+    if not isinstance(value, datetime.datetime):
+        return f";VALUE=DATE:{value:%Y%m%d}"
+    if value.tzinfo is None:
+        return f":{value:%Y%m%dT%H%M%S}"
+    return f":{value.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}"
+
+
+def serialize_ical_event(row: tuple, dtstamp: datetime.datetime,
+                         properties: list[str] = None,
+                         uid: str = None) -> str:
+    """Serializes an event into a VEVENT component without icalendar.
+    The properties are in the same order as make_ical_event.
+
+    Parameters
+    ----------
+    row: tuple
+        The values of the event in the order of SCHEDULE_KEYS
+    dtstamp: datetime.datetime
+        The time the event is created
+    properties: list[str]
+        Extra content lines to add to the event e.g. RRULE
+    uid: str
+        The UID of the event, defaults to get_event_uid
+
+    Returns
+    -------
+    str
+        The VEVENT component
+    """
+    subject, *_, location = row
+    dtstart, dtend = get_event_times(row)
+
+    lines = [
+        "BEGIN:VEVENT\r\n",
+        fold_line("SUMMARY:" + escape_text(subject)),
+        "DTSTART" + format_ical_date(dtstart) + "\r\n",
+        "DTEND" + format_ical_date(dtend) + "\r\n",
+        "DTSTAMP" + format_ical_date(dtstamp) + "\r\n",
+        fold_line("UID:" + escape_text(
+            get_event_uid(row) if uid is None else uid
+        ))
+    ]
+    if location is not None:
+        lines.append(fold_line("LOCATION:" + escape_text(location)))
+    if properties is not None:
+        lines.extend(fold_line(line) for line in properties)
+    lines.append("END:VEVENT\r\n")
+
+    return "".join(lines)
+
+
+def make_ical_calendar() -> "iCalendar":
+    """Creates an empty iCalendar calendar component.
+
+    Returns
+    -------
+    icalendar.Calendar
+        The calendar component
+    """
+    # pylint: disable=import-outside-toplevel
+    from icalendar import Calendar as iCalendar
+
+    cal = iCalendar()
+    cal.add("version", "2.0")
+    cal.add("prodid", PRODID)
+
+    return cal
+
+
+class CSVWriter:
+    """Writes the events into a file as csv rows.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write into
+    """
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.writer = csv.writer(file)
+
+    def write_header(self) -> None:
+        """Writes the label row."""
+        self.writer.writerow(SCHEDULE_KEYS)
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Writes a single event.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        self.writer.writerow(row)
+
+    def write_footer(self) -> None:
+        """Finishes writing the file."""
+
+
+class JSONLWriter:
+    """Writes the events into a file in the JSON Lines format, one JSON
+    object per event. Dates and times are written in ISO 8601.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write into
+    """
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.encoder = json.JSONEncoder(
+            ensure_ascii=False, default=lambda value: value.isoformat()
+        )
+
+    def write_header(self) -> None:
+        """Starts writing the file."""
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Writes a single event.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        # Dates and times are the only values that aren't JSON types
+        self.file.write(self.encoder.encode(dict(zip(SCHEDULE_KEYS, row))))
+        self.file.write("\n")
+
+    def write_footer(self) -> None:
+        """Finishes writing the file."""
+
+
+class ParquetWriter:
+    """Writes the events into a file in the Apache Parquet format.
+    Dates and times are stored as date32 and time32 columns.
+    pyarrow must be installed to use it.
+
+    Parameters
+    ----------
+    file: BinaryIO
+        The binary file to write into
+    """
+    binary = True
+
+    def __init__(self, file: BinaryIO):
+        # pylint: disable=import-outside-toplevel
+        try:
+            import pyarrow
+            from pyarrow import parquet
+        except ModuleNotFoundError as err:
+            raise ModuleNotFoundError("pyarrow is not installed") from err
+
+        self.pyarrow = pyarrow
+        self.parquet = parquet
+        self.file = file
+        self.schema = pyarrow.schema([
+            ("Subject", pyarrow.string()),
+            ("Start Date", pyarrow.date32()),
+            ("Start Time", pyarrow.time32("s")),
+            ("End Date", pyarrow.date32()),
+            ("End Time", pyarrow.time32("s")),
+            ("All Day Event", pyarrow.bool_()),
+            ("Description", pyarrow.string()),
+            ("Location", pyarrow.string())
+        ])
+        self.columns: list[list] = [[] for _ in SCHEDULE_KEYS]
+        self.writer = None
+
+    def write_header(self) -> None:
+        """Starts writing the file."""
+        self.writer = self.parquet.ParquetWriter(self.file, self.schema)
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Writes a single event.
+        The events are written in batches of PARQUET_BATCH_SIZE.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        for column, value in zip(self.columns, row):
+            column.append(value)
+
+        if len(self.columns[0]) >= PARQUET_BATCH_SIZE:
+            self.flush()
+
+    def write_footer(self) -> None:
+        """Writes the remaining events and finishes writing the file."""
+        self.flush()
+        self.writer.close()
+
+    def flush(self) -> None:
+        """Writes the batched events as a row group."""
+        if not self.columns[0]:
+            return
+
+        self.writer.write_table(
+            self.pyarrow.Table.from_arrays(self.columns, schema=self.schema)
+        )
+        self.columns = [[] for _ in SCHEDULE_KEYS]
+
+
+class ICalWriter:
+    """Writes the events into a file in the iCalendar format one VEVENT at a
+    time. The events are serialized directly without the icalendar object
+    model, every event shares the same DTSTAMP and has a unique UID, see
+    EventUIDs.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write into
+    """
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.dtstamp = get_dtstamp()
+        self.uids = EventUIDs()
+
+    def write_header(self) -> None:
+        """Writes the start of the calendar component."""
+        self.file.write(ICAL_HEADER)
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Writes a single event.
+        Parallel events are written once all of them are added, see
+        EventUIDs.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        for uid, event in self.uids.add(row):
+            self.write_unique_event(uid, event)
+
+    def write_unique_event(self, uid: str, row: tuple[Any, ...]) -> None:
+        """Writes a single event with its unique UID.
+
+        Parameters
+        ----------
+        uid: str
+            The UID of the event
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        self.file.write(serialize_ical_event(row, self.dtstamp, uid=uid))
+
+    def flush(self) -> None:
+        """Writes the events held by EventUIDs."""
+        for uid, event in self.uids.flush():
+            self.write_unique_event(uid, event)
+
+    def write_footer(self) -> None:
+        """Writes the remaining events and the end of the calendar
+        component."""
+        self.flush()
+        self.file.write(ICAL_FOOTER)
+
+
+class IcalendarWriter(ICalWriter):
+    """Writes the events into a file in the iCalendar format using the
+    icalendar package. The output is the same as exporting the whole
+    icalendar.Calendar.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write into
+    """
+    def write_header(self) -> None:
+        """Writes the start of the calendar component."""
+        header = make_ical_calendar().to_ical().decode("utf-8")
+        # Removing the end of the calendar component
+        self.file.write(header.removesuffix(ICAL_FOOTER))
+
+    def write_unique_event(self, uid: str, row: tuple[Any, ...]) -> None:
+        """Writes a single event with its unique UID.
+
+        Parameters
+        ----------
+        uid: str
+            The UID of the event
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        event = make_ical_event(row, self.dtstamp, uid)
+        self.file.write(event.to_ical().decode("utf-8"))
+
+
+class RecurringICalWriter(ICalWriter):
+    """Writes the events into a file in the iCalendar format with every
+    weekly series of a class combined into a single recurring VEVENT.
+
+    Events with the same subject, time, location and day of week are a
+    series. A series repeats weekly from its first to its last date using
+    RRULE with COUNT, the weeks without the class are excluded with EXDATE.
+    The recurring events expand to the same events as ICalWriter.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write into
+    """
+    def __init__(self, file: TextIO):
+        super().__init__(file)
+        # The dates of every series by series key
+        self.series: dict[tuple, list[tuple[tuple, set]]] = {}
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Adds a single event to its series.
+        The series are written in write_footer.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        subject, start_date, start_time, _, end_time, all_day, _, \
+            location = row
+
+        # All day events are never combined
+        if all_day is not None:
+            self.series[("all day", len(self.series))] = \
+                [(row, {start_date})]
+            return
+
+        key = (subject, start_time, end_time, location,
+               start_date.isoweekday())
+        series_list = self.series.setdefault(key, [])
+        for _, dates in series_list:
+            # Keeping events on the same date in separate series
+            if start_date not in dates:
+                dates.add(start_date)
+                return
+        series_list.append((row, {start_date}))
+
+    def write_footer(self) -> None:
+        """Writes all the series and the end of the calendar component."""
+        # First event UID -> series, parallel series share the UID
+        series_uids: dict[str, list[tuple[tuple, set]]] = {}
+        for series_list in self.series.values():
+            for row, dates in series_list:
+                series_uids.setdefault(get_event_uid(row), []).append(
+                    (row, dates)
+                )
+        self.series.clear()
+
+        for uid, series_list in series_uids.items():
+            uids = self.uids.get_uids(uid, [row for row, _ in series_list])
+            for unique, (row, dates) in zip(uids, series_list):
+                self.file.write(serialize_ical_event(
+                    row, self.dtstamp, self.get_recurrence(row, dates),
+                    unique
+                ))
+
+        super().write_footer()
+
+    @staticmethod
+    def get_recurrence(row: tuple[Any, ...], dates: set) -> list[str]:
+        """Gets the recurrence properties of a series.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the first event of the series
+        dates: set[datetime.date]
+            The dates of all the events of the series
+
+        Returns
+        -------
+        list[str]
+            The RRULE and EXDATE content lines, empty if there is only a
+            single event
+        """
+        if len(dates) == 1:
+            return []
+
+        first = min(dates)
+        weeks = (max(dates) - first).days // 7 + 1
+        properties = [f"RRULE:FREQ=WEEKLY;COUNT={weeks}"]
+
+        start_time = row[2]
+        excluded = []
+        for index in range(weeks):
+            date = first + datetime.timedelta(weeks=index)
+            if date not in dates:
+                excluded.append(format_ical_date(
+                    datetime.datetime.combine(date, start_time)
+                ).removeprefix(":"))
+        if excluded:
+            properties.append("EXDATE:" + ",".join(excluded))
+
+        return properties
+
+
+class MultiWriter:
+    """Writes the events into many writers at once so the events are only
+    traversed once.
+
+    Parameters
+    ----------
+    writers: list
+        The writers to write into e.g. CSVWriter, ICalWriter
+    """
+    def __init__(self, writers: list):
+        self.writers = writers
+        self.write_events = [writer.write_event for writer in writers]
+
+    def write_header(self) -> None:
+        """Starts writing all the files."""
+        for writer in self.writers:
+            writer.write_header()
+
+    def write_event(self, row: tuple[Any, ...]) -> None:
+        """Writes a single event into all the writers.
+
+        Parameters
+        ----------
+        row: tuple[Any, ...]
+            The values of the event in the order of SCHEDULE_KEYS
+        """
+        for write_event in self.write_events:
+            write_event(row)
+
+    def write_footer(self) -> None:
+        """Finishes writing all the files."""
+        for writer in self.writers:
+            writer.write_footer()
+
+
+EXPORT_WRITERS = {
+    "csv": CSVWriter,
+    "ics": ICalWriter,
+    "jsonl": JSONLWriter,
+    "parquet": ParquetWriter
+}
+ICS_WRITERS = {
+    "native": ICalWriter,
+    "icalendar": IcalendarWriter
+}
+
+
+def get_export_formats() -> list[str]:
+    """Gets all the export formats that can be used.
+
+    Returns
+    -------
+    list[str]
+        The export formats, parquet is only included if pyarrow is installed
+    """
+    return [export_format for export_format in EXPORT_WRITERS
+            if export_format != "parquet" or PARQUET_AVAILABLE]
+
+
+def get_outputs(output: str | None,
+                export_formats: list[str]) -> dict[str, str | None]:
+    """Gets the output filename of every export format.
+
+    Parameters
+    ----------
+    output: str | None
+        The output filename without the extension.
+        If None or "-" is provided with a single format, it will be
+        written to stdout. If None is provided with many formats, output
+        is used.
+    export_formats: list[str]
+        The formats to export in
+
+    Returns
+    -------
+    dict[str, str | None]
+        The output filenames by format
+
+    Raises
+    ------
+    ValueError
+        If many formats are written to stdout
+    """
+    if output is None or output == "-":
+        if len(export_formats) == 1:
+            return {export_formats[0]: output}
+        if output == "-":
+            raise ValueError("Only a single format can be written to stdout")
+        output = "output"
+
+    return {export_format: f"{output}.{export_format}"
+            for export_format in export_formats}
+
+
+def get_export_writer(export_format: str, ics_writer: str = "native",
+                      recurring: bool = False) -> type | None:
+    """Gets the writer class of an export format.
+
+    Parameters
+    ----------
+    export_format: str
+        The format to export in e.g. csv, ics
+    ics_writer: str
+        The iCalendar serializer to use, it can be [native, icalendar]
+    recurring: bool
+        Combines weekly classes into recurring events.
+        Only the native iCalendar serializer supports it.
+        Ignored for other formats.
+
+    Returns
+    -------
+    type
+        The writer class
+    None
+        If the format or the iCalendar serializer is invalid or the format
+        is not available
+    """
+    if export_format not in get_export_formats():
+        return None
+    if export_format == "ics":
+        if not recurring:
+            return ICS_WRITERS.get(ics_writer)
+        if ics_writer == "native":
+            return RecurringICalWriter
+        return None
+    return EXPORT_WRITERS.get(export_format)
@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""The backends that parse the tables of a timetable page."""
+import os
+import re
+from html import unescape
+from xml.etree import ElementTree as ET
+from typing import Any
+from .enums import DayOfWeekISO
+
+try:
+    from lxml import etree as lxml_etree
+except ModuleNotFoundError:
+    lxml_etree = None  # pylint: disable=invalid-name
+
+
+class _ParsingFinished(Exception):
+    """Raised to stop ScheduleParser once all the tables are found."""
+
+
+# Tokens of a HTML document, the groups are text, "/" of an end tag, the
+# name of a tag and the content of a comment. Declarations and "<" that
+# doesn't start a tag don't match any group.
+HTML_TOKEN_RE = re.compile(r"""
+    ([^<]+)
+  | <(/?)([a-zA-Z][^\t\n\r\f\ />\x00]*)(?:"[^"]*"|'[^']*'|[^'">])*>
+  | <!--(.*?)--!?\s*>
+  | <[!?][^>]*>
+  | <
+""", re.S | re.X)
+# "<" that starts a tag, comment or declaration which isn't complete yet
+INCOMPLETE_TOKEN_RE = re.compile(r"<(?:/?[a-zA-Z]|[!?]|/?\Z)")
+# Rows of a table only containing td cells with text, these tables are
+# parsed without going through every token
+TAG_ATTRS = r"""(?:[^'"/>]|"[^"]*"|'[^']*')*"""
+TABLE_CELL = rf"<td(?=[\s>]){TAG_ATTRS}>([^<]*)</td\s*>"
+TABLE_ROW = rf"<tr(?=[\s>]){TAG_ATTRS}>" \
+    rf"((?:\s*{TABLE_CELL.replace('([^<]*)', '[^<]*')})*)\s*</tr\s*>"
+TABLE_ROWS_RE = re.compile(rf"(?:\s*{TABLE_ROW})*\s*", re.I)
+TABLE_ROW_RE = re.compile(TABLE_ROW, re.I)
+TABLE_CELL_RE = re.compile(TABLE_CELL, re.I)
+TABLE_END_RE = re.compile(r"</table[\s/>]", re.I)
+# Elements containing text which isn't parsed as HTML
+CDATA_TAGS = {
+    "script": re.compile(r"</script[\s/>]", re.I),
+    "style": re.compile(r"</style[\s/>]", re.I)
+}
+
+
+class ScheduleParser:
+    """HTML Parser used to parse all the tables
+
+    The document is split into tags and text with a single regular
+    expression and the rows and cells of the tables are built as the tags
+    are received. Tables only containing rows of text cells are parsed at
+    once, see match_table_rows. Only ``td`` cells directly inside of a
+    ``tr`` row are kept and the text of a cell is the text before any other
+    tag inside of it.
+
+    Parameters
+    ----------
+    days: list[int] = [1, 2, 3, 4, 5, 6, 7]
+        A list of days of the week to look for
+    stop_early: bool = False
+        Stops parsing the rest of the input once the tables of all the days
+        are found
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, days: list[int] = None, stop_early: bool = False):
+        if days is None:
+            days = list(range(1, 8))
+
+        # Declaring needed variables
+        self.stop_early: bool = stop_early
+        self.finished: bool = False
+        self.day_found: bool = False
+        self.table_found: bool = False
+        self.tables: dict[str, list[list[str | None]] | None] = {}
+        self.current_day: str = ""
+        self.tables_completed: int = 0
+
+        # Current row and cell of the table
+        self._row: list[str | None] | None = None
+        self._cell: list[str] | None = None
+        self._cell_has_child: bool = False
+        # Text seen since the last tag
+        self._text: list[str] = []
+        # Data which isn't parsed yet as it might be an incomplete token
+        self._rawdata: str = ""
+        # The end tag of the script or style element the parser is in
+        self._cdata_end: re.Pattern | None = None
+        # Whether the parser is at the start of the content of a table
+        self._table_start: bool = False
+
+        # Populating tables
+        for day in sorted(days):
+            self.tables[DayOfWeekISO(day).name] = None
+        self._remaining: set[str] = set(self.tables)
+
+    def feed(self, data: str) -> None:
+        """Feeds data to the parser.
+        The data is ignored if the parser has finished.
+
+        Parameters
+        ----------
+        data: str
+            The data to parse
+        """
+        if self.finished:
+            return
+
+        self._rawdata += data
+        try:
+            self.__goahead(False)
+        except _ParsingFinished:
+            # Discarding the rest of the input
+            self._rawdata = ""
+
+    def close(self) -> None:
+        """Handles any buffered data."""
+        if self.finished:
+            return
+
+        try:
+            self.__goahead(True)
+        except _ParsingFinished:
+            pass
+        self._rawdata = ""
+
+    def handle_data(self, data):
+        """Handles data received (text inside tags)."""
+        if not self.day_found:
+            self._text.append(data)
+        elif self._cell is not None and not self._cell_has_child:
+            self._cell.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        """Handles start tags received."""
+        # pylint: disable=unused-argument
+        self.__find_day()
+        if not self.day_found:
+            return
+        if not self.table_found:
+            if tag == "table":
+                self.table_found = True
+                self.tables[self.current_day] = []
+            return
+
+        if tag == "tr":
+            self.__end_row()
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self.__end_cell()
+            self._cell = []
+            self._cell_has_child = False
+        elif self._cell is not None:
+            self._cell_has_child = True
+
+    def handle_endtag(self, tag):
+        """Handles end tags received."""
+        self.__find_day()
+        if not self.day_found or not self.table_found:
+            return
+
+        match tag:
+            case "td":
+                self.__end_cell()
+            case "tr":
+                self.__end_row()
+            case "table":
+                self.__end_row()
+                self.table_found = False
+                self.day_found = False
+                self.tables_completed += 1
+
+                self._remaining.discard(self.current_day)
+                if self.stop_early and not self._remaining:
+                    self.finished = True
+                    raise _ParsingFinished()
+
+    def handle_comment(self, data):
+        """Handles comments received."""
+        # pylint: disable=unused-argument
+        self.__find_day()
+
+    def get_tables(self, indexs: list[str] = None) -> dict[str, dict | None]:
+        """Gets the data of the tables of all the days.
+
+        Parameters
+        ----------
+        indexs: list[str]
+            The Index to use for the dict.
+            If None is provided, the first row of the table will be used.
+
+        Returns
+        -------
+        dict[str, dict | None]
+            The data of the table of each day, see rows_to_dict.
+        """
+        return tables_to_dicts(self.tables, indexs)
+
+    def __goahead(self, end: bool) -> None:
+        """Handles all the complete tokens of the buffered data.
+
+        Parameters
+        ----------
+        end: bool
+            Whether there isn't any more data, the rest of the data is
+            handled as text
+        """
+        rawdata = self._rawdata
+        length = len(rawdata)
+        pos = 0
+        while pos < length:
+            if self._cdata_end is not None:
+                match = self._cdata_end.search(rawdata, pos)
+                if match is None and not end:
+                    break
+                cdata_end = length if match is None else match.start()
+                if cdata_end > pos:
+                    self.handle_data(rawdata[pos:cdata_end])
+                self._cdata_end = None
+                pos = cdata_end
+            elif self._table_start:
+                # The whole table is needed to parse it at once
+                match = TABLE_END_RE.search(rawdata, pos)
+                if match is None and not end:
+                    break
+                self._table_start = False
+                rows = None if match is None else \
+                    match_table_rows(rawdata, pos, match.start())
+                if rows is not None:
+                    self.tables[self.current_day].extend(rows)
+                    pos = match.start()
+
+            for match in HTML_TOKEN_RE.finditer(rawdata, pos):
+                kind = match.lastindex
+                if kind == 1:
+                    # The text might continue in the next chunk
+                    if not end and match.end() == length:
+                        break
+                    text = match.group(1)
+                    self.handle_data(unescape(text) if "&" in text else text)
+                elif kind == 3:
+                    tag = match.group(3).lower()
+                    if match.group(2):
+                        self.handle_endtag(tag)
+                    else:
+                        table_found = self.table_found
+                        self.handle_starttag(tag, None)
+                        if self.table_found and not table_found:
+                            self._table_start = True
+                            pos = match.end()
+                            break
+                        if match.group().endswith("/>"):
+                            self.handle_endtag(tag)
+                        elif tag in CDATA_TAGS:
+                            self._cdata_end = CDATA_TAGS[tag]
+                            pos = match.end()
+                            break
+                elif kind == 4:
+                    self.handle_comment(match.group(4))
+                elif not end and match.group().startswith("<!--"):
+                    # The end of the comment might be in the next chunk
+                    break
+                elif match.end() - match.start() == 1:
+                    # "<" is text unless the rest of the token might be in
+                    # the next chunk
+                    if not end and INCOMPLETE_TOKEN_RE.match(rawdata,
+                                                             match.start()):
+                        break
+                    self.handle_data("<")
+                pos = match.end()
+            else:
+                pos = length
+
+            if self._cdata_end is None and not self._table_start:
+                break
+
+        self._rawdata = rawdata[pos:]
+
+    def __find_day(self) -> None:
+        """Finds the days in the text seen since the last tag."""
+        if not self._text:
+            return
+
+        text = "".join(self._text)
+        self._text = []
+        if not self.day_found and text in self.tables:
+            self.day_found = True
+            self.current_day = text
+
+    def __end_cell(self) -> None:
+        """Adds the current cell to the current row."""
+        if self._cell is None:
+            return
+
+        text = "".join(self._cell)
+        self._row.append(text if text.strip() != "" else None)
+        self._cell = None
+
+    def __end_row(self) -> None:
+        """Adds the current row to the current table."""
+        self.__end_cell()
+        if self._row is None:
+            return
+
+        self.tables[self.current_day].append(self._row)
+        self._row = None
+
+
+def match_table_rows(data: str, start: int,
+                     end: int) -> list[list[str | None]] | None:
+    """Parses the content of a table only containing rows of td cells with
+    text.
+
+    Parameters
+    ----------
+    data: str
+        The HTML document
+    start: int
+        The position of the start of the content of the table
+    end: int
+        The position of the end tag of the table
+
+    Returns
+    -------
+    list[list[str | None]]
+        The text of every cell of every row, None for empty cells
+    None
+        If the table contains anything else
+    """
+    if TABLE_ROWS_RE.fullmatch(data, start, end) is None:
+        return None
+
+    rows = []
+    for row in TABLE_ROW_RE.findall(data, start, end):
+        cells = []
+        for text in TABLE_CELL_RE.findall(row):
+            if "&" in text:
+                text = unescape(text)
+            cells.append(text if text.strip() != "" else None)
+        rows.append(cells)
+
+    return rows
+
+
+class LxmlScheduleParser:
+    """Accelerated version of ScheduleParser using the C HTML parser of lxml.
+
+    It has the same interface and produces the same tables as
+    ScheduleParser. lxml must be installed to use it.
+
+    Parameters
+    ----------
+    days: list[int] = [1, 2, 3, 4, 5, 6, 7]
+        A list of days of the week to look for
+    stop_early: bool = False
+        Stops parsing the rest of the input once the tables of all the days
+        are found
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, days: list[int] = None, stop_early: bool = False):
+        if lxml_etree is None:
+            raise ModuleNotFoundError("lxml is not installed")
+
+        if days is None:
+            days = list(range(1, 8))
+
+        # Declaring needed variables
+        self.stop_early: bool = stop_early
+        self.finished: bool = False
+        self.tables: dict[str, list[list[str | None]] | None] = {}
+        self.current_day: str | None = None
+        self.tables_completed: int = 0
+
+        # Current table and row
+        self._table: list[list[str | None]] | None = None
+        self._row: list[str | None] | None = None
+        # The last text seen, it is checked once the next tag is seen as
+        # it might not have been fully parsed yet
+        self._pending: tuple[Any, bool] | None = None
+        self._parser = lxml_etree.HTMLPullParser(
+            events=("start", "end", "comment", "pi")
+        )
+
+        # Populating tables
+        for day in sorted(days):
+            self.tables[DayOfWeekISO(day).name] = None
+        self._remaining: set[str] = set(self.tables)
+
+    def feed(self, data: str) -> None:
+        """Feeds data to the parser.
+        The data is ignored if the parser has finished.
+
+        Parameters
+        ----------
+        data: str
+            The data to parse
+        """
+        if self.finished:
+            return
+
+        self._parser.feed(data)
+        self.__handle_events()
+
+    def close(self) -> None:
+        """Handles any buffered data."""
+        if self.finished:
+            return
+
+        self._parser.close()
+        self.__handle_events()
+
+    def get_tables(self, indexs: list[str] = None) -> dict[str, dict | None]:
+        """Gets the data of the tables of all the days.
+
+        Parameters
+        ----------
+        indexs: list[str]
+            The Index to use for the dict.
+            If None is provided, the first row of the table will be used.
+
+        Returns
+        -------
+        dict[str, dict | None]
+            The data of the table of each day, see rows_to_dict.
+        """
+        return tables_to_dicts(self.tables, indexs)
+
+    def __handle_events(self) -> None:
+        """Handles all the events parsed so far."""
+        for event, element in self._parser.read_events():
+            self.__check_pending()
+
+            if event in ("comment", "pi"):
+                self._pending = (element, True)
+            elif event == "start":
+                self._pending = (element, False)
+                self.__handle_start(element.tag)
+            else:
+                self._pending = (element, True)
+                self.__handle_end(element)
+
+            if self.finished:
+                return
+
+    def __check_pending(self) -> None:
+        """Finds the days in the last text seen."""
+        if self._pending is None or self.current_day is not None:
+            return
+
+        element, is_tail = self._pending
+        text = element.tail if is_tail else element.text
+        if text in self.tables:
+            self.current_day = text
+        self._pending = None
+
+    def __handle_start(self, tag: str) -> None:
+        """Handles start tags received."""
+        if self.current_day is None:
+            return
+        if self._table is None:
+            if tag == "table":
+                self._table = []
+                self.tables[self.current_day] = self._table
+            return
+
+        if tag == "tr":
+            self._row = []
+
+    def __handle_end(self, element) -> None:
+        """Handles end tags received."""
+        if self._table is None:
+            return
+
+        match element.tag:
+            case "td" if self._row is not None:
+                text = element.text
+                self._row.append(
+                    text if text is not None and text.strip() != "" else None
+                )
+            case "tr" if self._row is not None:
+                self._table.append(self._row)
+                self._row = None
+                element.clear(keep_tail=True)
+            case "table":
+                element.clear(keep_tail=True)
+                self._table = None
+                self._row = None
+                self.tables_completed += 1
+
+                self._remaining.discard(self.current_day)
+                self.current_day = None
+                if self.stop_early and not self._remaining:
+                    self.finished = True
+
+
+PARSER_BACKENDS = {
+    "python": ScheduleParser,
+    "lxml": LxmlScheduleParser
+}
+PARSER_BACKEND_ENV = "NOTT_PARSER_BACKEND"
+
+
+def get_parser_backend(backend: str = None) -> type:
+    """Gets the parser class of a backend.
+
+    Parameters
+    ----------
+    backend: str
+        The backend to use, it can be [auto, python, lxml].
+        If None is provided, the NOTT_PARSER_BACKEND environment variable
+        will be used. auto uses lxml if it is installed.
+
+    Returns
+    -------
+    type
+        The parser class
+    """
+    if backend is None:
+        backend = os.environ.get(PARSER_BACKEND_ENV, "auto")
+    if backend == "auto":
+        backend = "python" if lxml_etree is None else "lxml"
+
+    parser_class = PARSER_BACKENDS.get(backend)
+    if parser_class is None:
+        raise ValueError(f"Invalid parser backend {backend}")
+    if parser_class is LxmlScheduleParser and lxml_etree is None:
+        raise ValueError("lxml is not installed")
+
+    return parser_class
+
+
+def tables_to_dicts(tables: dict[str, list[list[str | None]] | None],
+                    indexs: list[str] = None) -> dict[str, dict | None]:
+    """Converts the rows of the tables of each day into python dicts.
+
+    Parameters
+    ----------
+    tables: dict[str, list[list[str | None]] | None]
+        The rows of the table of each day, None if it is not found
+    indexs: list[str]
+        The Index to use for the dict.
+        If None is provided, the first row of the table will be used.
+
+    Returns
+    -------
+    dict[str, dict | None]
+        The data of the table of each day, see rows_to_dict.
+    """
+    output = {}
+    for day, rows in tables.items():
+        if rows is None:
+            raise ValueError(f"No table found for {day}")
+        output[day] = rows_to_dict(rows, indexs, verbose=False)
+
+    return output
+
+
+def rows_to_dict(rows: list[list[str | None]], indexs: list[str] = None,
+                 verbose: bool = True) -> dict[str, list[str]] | None:
+    """Converts the rows of a table into a python dict
+    Parameters
+    ----------
+    rows: list[list[str | None]]
+        The text of every cell of every row of the table.
+    indexs: list[str]
+        The Index to use for the dict.
+        If None is provided, the first row of the table will be used.
+    verbose: bool
+        Determine to print information messages
+
+    Returns
+    -------
+    dict[str, list[str]]
+        The data of the table.
+    None
+        If there isn't any data
+    """
+    # Setting Up function to print verbose statments
+    def print_verbose(verbosity: bool, print_index: int):
+        if not verbosity:
+            return
+
+        match print_index:
+            case 0:
+                print("No Data in table")
+            case 1:
+                print("No Indexs Provided, Using first row as index")
+            case 2:
+                print("Not Enough Data at Row")
+
+    # Returning None if there isn't any data in table
+    if len(rows) == 0:
+        print_verbose(verbose, 0)
+        return None
+
+    # Setting indexes/label used for the csv
+    if indexs is None:
+        print_verbose(verbose, 1)
+        indexs = list(rows[0])
+        rows = rows[1:]
+
+    # Setting up output dict
+    output = {}
+    for i in indexs:
+        output[i] = []
+
+    # Getting data from table
+    for columns in rows:
+        # Looping or indexs
+        for i, label in enumerate(indexs):
+            try:
+                output[label].append(columns[i])
+            except IndexError:
+                print_verbose(verbose, 2)
+
+    return output
+
+
+def table_to_dict(table: str | ET.Element, indexs: list[str] = None,
+                  verbose: bool = True) -> dict[str, list[str]] | None:
+    """Converts a HTML table into a python dict
+    Parameters
+    ----------
+    table: str | xml.etree.ElementTree
+        The HTML table to use.
+        It can be in the form of a string, ElementTree from xml module.
+    indexs: list[str]
+        The Index to use for the dict.
+        If None is provided, the first row of the table will be used.
+    verbose: bool
+        Determine to print information messages
+
+    Returns
+    -------
+    dict[str, list[str]]
+        The data of the table.
+    None
+        If there isn't any data
+
+    TODO
+    ----
+    Handle Uneven Spaces
+    """
+    # Getting Element Tree
+    if isinstance(table, ET.Element):
+        data: ET.Element = table
+    else:
+        data: ET.Element = ET.fromstring(table)
+
+    rows = [[col.text for col in row.findall("td")]
+            for row in data.findall("tr")]
+
+    return rows_to_dict(rows, indexs, verbose)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Functions to export the jobs listed in a manifest file.
+
+A manifest is a csv, json or toml file of jobs. Every job has a school,
+program and output with optional weeks, days and format e.g.
+
+.. code-block:: toml
+
+    [[jobs]]
+    school = "E & EE"
+    program = "BEng Hons Electl & Electnc Eng/F/02 - H603 ..."
+    weeks = "4-15"
+    format = "ics,csv"
+    output = "timetables/eee-autumn"
+
+A csv manifest has a column for every key and a json manifest is a list of
+jobs or an object with a jobs list.
+"""
+import os
+import csv
+import json
+from collections.abc import Callable
+from typing import Any, NamedTuple, TextIO
+from xml.etree import ElementTree as ET
+import requests
+from .bulk import DEFAULT_WORKERS, map_programs, print_results
+from .cache import ResponseCache
+from .data import get_catalog
+from .enums import DayOfWeekISO
+from .exporters import get_export_formats, get_outputs
+from .range_handlers import ALL_DAYS, ALL_WEEKS, RangeSet
+
+try:
+    import tomllib
+except ModuleNotFoundError:
+    try:
+        import tomli as tomllib
+    except ModuleNotFoundError:
+        tomllib = None  # pylint: disable=invalid-name
+
+JOB_KEYS = ["name", "school", "program", "weeks", "days", "format",
+            "output"]
+
+
+class ManifestJob(NamedTuple):
+    """A single export of a manifest.
+
+    Parameters
+    ----------
+    name: str
+        The name of the job used when reporting the result
+    school: str
+        The name of the school/division of the program
+    program: str
+        The name of the program
+    weeks: RangeSet
+        The weeks to export
+    days: RangeSet
+        The days of week to export
+    formats: list[str]
+        The formats to export in
+    output: str
+        The output filename without the extension
+    """
+    name: str
+    school: str
+    program: str
+    weeks: RangeSet
+    days: RangeSet
+    formats: list[str]
+    output: str
+
+
+class ManifestResult(NamedTuple):
+    """The outcome of a single job of a manifest.
+
+    Parameters
+    ----------
+    name: str
+        The name of the job
+    output: str
+        The output filenames separated by commas
+    error: str | None
+        The error message, None if the export is successful
+    """
+    name: str
+    output: str
+    error: str | None = None
+
+    @property
+    def successful(self) -> bool:
+        """Whether the job is exported successfully."""
+        return self.error is None
+
+    @property
+    def exit_code(self) -> int:
+        """The exit code of the job, 0 if successful and 1 otherwise."""
+        return 0 if self.successful else 1
+
+
+def read_manifest(path: str) -> list[dict[str, Any]]:
+    """Reads the jobs of a manifest.
+    The format is found using the file extension.
+
+    Parameters
+    ----------
+    path: str
+        The manifest file
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The entry of every job, see parse_job
+
+    Raises
+    ------
+    ValueError
+        If the manifest can't be read
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as file:
+            # Empty cells use the default value
+            return [{key: value for key, value in row.items()
+                     if key is not None and value not in (None, "")}
+                    for row in csv.DictReader(file)]
+
+    if extension == ".toml":
+        if tomllib is None:
+            raise ValueError("toml manifests require Python 3.11 or tomli")
+        with open(path, "rb") as file:
+            try:
+                manifest = tomllib.load(file)
+            except tomllib.TOMLDecodeError as err:
+                raise ValueError(f"Invalid toml: {err}") from err
+    elif extension == ".json":
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    else:
+        raise ValueError("The manifest must be a csv, json or toml file")
+
+    jobs = manifest.get("jobs") if isinstance(manifest, dict) else manifest
+    if not isinstance(jobs, list) or \
+            not all(isinstance(job, dict) for job in jobs):
+        raise ValueError("The manifest must contain a list of jobs")
+
+    return jobs
+
+
+def parse_job(entry: dict[str, Any], index: int) -> ManifestJob:
+    """Parses the entry of a job.
+
+    Parameters
+    ----------
+    entry: dict[str, Any]
+        The values of the job, see JOB_KEYS. weeks and days are a range
+        e.g. "4-15", a number or a list of numbers and default to the whole
+        year and week. format is a list or a comma separated string of
+        formats and defaults to ics.
+    index: int
+        The position of the job in the manifest from 1
+
+    Returns
+    -------
+    ManifestJob
+        The job
+
+    Raises
+    ------
+    ValueError
+        If the entry is invalid
+    """
+    unknown = [str(key) for key in entry if key not in JOB_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown keys {', '.join(unknown)}")
+    missing = [key for key in ("school", "program", "output")
+               if not entry.get(key)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+
+    def parse_range(value: Any, names: type = None) -> RangeSet:
+        # bool is a subclass of int
+        if isinstance(value, list) and \
+                all(isinstance(item, (int, str)) and
+                    not isinstance(item, bool) for item in value):
+            return RangeSet.from_values(int(item) for item in value)
+        if isinstance(value, (int, str)) and not isinstance(value, bool):
+            return RangeSet.parse(str(value), names)
+        raise ValueError("Invalid Range, Please Check Inserted Value")
+
+    weeks = parse_range(entry.get("weeks", "1-52"))
+    days = parse_range(entry.get("days", "1-7"), DayOfWeekISO)
+    if not weeks or not days or not weeks.issubset(ALL_WEEKS) or \
+            not days.issubset(ALL_DAYS):
+        raise ValueError("Invalid Range, Please Check Inserted Value")
+
+    formats = entry.get("format", "ics")
+    if isinstance(formats, str):
+        formats = [export_format.strip().lower()
+                   for export_format in formats.split(",")
+                   if export_format.strip()]
+    elif not isinstance(formats, list):
+        raise ValueError(f"Invalid format {formats}")
+    invalid = [str(export_format) for export_format in formats
+               if export_format not in get_export_formats()]
+    if not formats or invalid:
+        raise ValueError(f"Invalid format {', '.join(invalid)}".rstrip())
+
+    output = str(entry["output"])
+    if output == "-":
+        raise ValueError("Jobs can't be written to stdout")
+
+    return ManifestJob(str(entry.get("name", f"Job {index}")),
+                       str(entry["school"]), str(entry["program"]), weeks,
+                       days, formats, output)
+
+
+def export_manifest(entries: list[dict[str, Any]],
+                    max_workers: int = DEFAULT_WORKERS,
+                    session: requests.Session = None,
+                    cache: ResponseCache = None,
+                    refresh: bool = False,
+                    backend: str = None,
+                    ics_writer: str = "native",
+                    recurring: bool = False,
+                    academic_year: int = None) -> list[ManifestResult]:
+    """Exports all the jobs of a manifest.
+
+    Every program is only fetched and parsed once with all the days and
+    weeks of its jobs, then every job exports the events on its own days
+    and weeks. The programs are fetched in worker threads and an error in
+    one job doesn't stop the others from being exported.
+
+    Parameters
+    ----------
+    entries: list[dict[str, Any]]
+        The entry of every job, see read_manifest
+    max_workers: int
+        The maximum number of concurrent requests
+    session: requests.Session
+        The session used to make the requests.
+        If None is provided, a pooled session will be created.
+    cache: ResponseCache
+        The cache shared by all the requests.
+        If None is provided, the responses will not be cached.
+    refresh: bool
+        Ignores the cached responses and fetch them again
+    backend: str
+        The parser backend to use, see get_parser_backend
+    ics_writer: str
+        The iCalendar serializer to use, it can be [native, icalendar]
+    recurring: bool
+        Combines weekly classes into recurring events (ics only)
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    list[ManifestResult]
+        The result of every job in the given order
+    """
+    if max_workers < 1:
+        raise ValueError("There must be at least 1 worker")
+
+    catalog = get_catalog()
+    results: list[ManifestResult | None] = [None] * len(entries)
+    jobs: list[ManifestJob | None] = [None] * len(entries)
+    # Program value -> indexes of the jobs of the program
+    programs: dict[str, list[int]] = {}
+    for index, entry in enumerate(entries):
+        name = str(entry.get("name", f"Job {index + 1}"))
+        output = str(entry.get("output", ""))
+        try:
+            jobs[index] = parse_job(entry, index + 1)
+            program_value = catalog.get_program_value(jobs[index].school,
+                                                      jobs[index].program)
+        except (TypeError, ValueError) as err:
+            results[index] = ManifestResult(name, output, str(err))
+            continue
+        programs.setdefault(program_value, []).append(index)
+
+    def export_program(request: Callable, program_value: str) -> None:
+        indexes = programs[program_value]
+        days = RangeSet()
+        weeks = RangeSet()
+        for index in indexes:
+            days |= jobs[index].days
+            weeks |= jobs[index].weeks
+
+        try:
+            schedule_data = request(program_value, days, weeks)
+        except (requests.RequestException, ET.ParseError, ValueError,
+                KeyError, OSError) as err:
+            for index in indexes:
+                results[index] = ManifestResult(
+                    jobs[index].name, jobs[index].output,
+                    f"{type(err).__name__}: {err}"
+                )
+            return
+
+        for index in indexes:
+            job = jobs[index]
+            outputs = get_outputs(job.output, job.formats)
+            output = ", ".join(outputs.values())
+            try:
+                selected = schedule_data.select(job.days, job.weeks,
+                                                academic_year)
+                error = None
+                if selected.export_all(outputs, ics_writer, recurring) != 0:
+                    error = "Invalid Format"
+            except (ValueError, KeyError, OSError) as err:
+                error = f"{type(err).__name__}: {err}"
+            results[index] = ManifestResult(job.name, output, error)
+
+    map_programs(export_program, programs, max_workers, session,
+                 cache=cache, refresh=refresh, backend=backend,
+                 academic_year=academic_year)
+
+    return results
+
+
+def print_manifest_summary(results: list[ManifestResult],
+                           file: TextIO = None) -> None:
+    """Prints the exit code of every job of a manifest.
+
+    Parameters
+    ----------
+    results: list[ManifestResult]
+        The results of the manifest
+    file: TextIO
+        The file to print to, defaults to stderr
+    """
+    def get_message(result: ManifestResult) -> str:
+        message = f"{result.name}: exit {result.exit_code}"
+        if not result.successful:
+            message += f" ({result.error})"
+        return message
+
+    print_results(results, map(get_message, results), "jobs", file)
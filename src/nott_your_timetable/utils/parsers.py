@@ -1,22 +1,27 @@
 #!/usr/bin/env python3
 """Functions and Classes used by nott-your-timetable."""
-import html
 import datetime
 import csv
 import sys
-import io
-from xml.etree import ElementTree as ET
-from html.parser import HTMLParser
+from array import array
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from itertools import islice, zip_longest
 from collections import defaultdict
-from collections.abc import Iterable
-from typing import Any, NoReturn
-import requests
-from icalendar import Calendar as iCalendar
-from icalendar import Event as iEvent
-from .data import get_data
-from .enums import DayOfWeekISO, DayOfWeek
-from .weeks import find_week1
-from .range_handlers import handle_ranges
+from collections.abc import Iterable, Iterator, MutableSequence
+from typing import TYPE_CHECKING, Any, BinaryIO, NamedTuple, NoReturn,\
+    TextIO
+from .data import get_catalog
+from .enums import DayOfWeek
+from .weeks import get_academic_calendar
+from .range_handlers import RangeSet, handle_ranges_cached
+from .diff import DiffICalWriter, read_previous
+from .exporters import SCHEDULE_KEYS, MultiWriter, get_export_writer,\
+    get_dtstamp, make_ical_calendar, make_ical_event
+
+if TYPE_CHECKING:
+    from icalendar import Calendar as iCalendar
 
 
 # Other Utils
@@ -35,177 +40,96 @@ def get_program_value(school: str, program: str) -> str:
     str
         The value of the program
     """
-    dept_data, program_data = get_data()
-
-    school_value = dept_data.get(school)
-    if school_value is None:
-        raise ValueError("Invalid School Name")
-
-    program_value = program_data[school_value].get(program)
-    if program_value is None:
-        raise ValueError("Invalid Program")
-
-    return program_value
+    return get_catalog().get_program_value(school, program)
 
 
 # Utils for parsing data
-class ScheduleParser(HTMLParser):
-    """HTML Parser used to parse all the tables
+@lru_cache(maxsize=256)
+def parse_time(value: str) -> datetime.time:
+    """Converts a time in the format of HH:MM into a time object.
 
     Parameters
     ----------
-    days: list[int] = [1, 2, 3, 4, 5, 6, 7]
-        A list of days of the week to look for
+    value: str
+        The time to convert e.g. 09:00
+
+    Returns
+    -------
+    datetime.time
+        The time object
     """
-    def __init__(self, days: list[int] = None):
-        super().__init__()
-
-        if days is None:
-            days = list(range(1, 8))
-
-        # Declaring needed variables
-        self.day_found: bool = False
-        self.table_found: bool = False
-        self.table_ended: bool = False
-        self.tables: dict[str, str] = {}
-        self.current_day: str = ""
-
-        # Populating tables
-        days.sort()
-        for day in days:
-            self.tables[DayOfWeekISO(day).name] = ""
-
-    def handle_data(self, data):
-        """Handles data received (text inside tags)."""
-        if not self.day_found:
-            # Finding the days
-            if data in self.tables:
-                self.day_found = True
-                self.current_day = data
-        else:
-            if data.strip() != "" and self.table_found:
-                data = html.escape(data)
-                self.tables[self.current_day] += data
-
-    def handle_starttag(self, tag, attrs):
-        """Handles start tags received."""
-        # pylint: disable=unused-argument
-        if not self.day_found:
-            return
-        if (tag == "table" or self.table_found):
-            self.table_found = True
-            self.tables[self.current_day] += f"<{tag}>"
+    hour, minute = value.split(":")
+    return datetime.time(hour=int(hour), minute=int(minute))
 
-    def handle_endtag(self, tag):
-        """Handles end tags received."""
-        if not self.day_found:
-            return
-        if self.table_found:
-            self.tables[self.current_day] += f"</{tag}>"
-            if tag == "table":
-                self.table_found = False
-                self.day_found = False
 
+class Event(NamedTuple):
+    """A single occurrence of a class in the timetable.
 
-def table_to_dict(table: str | ET.Element, indexs: list[str] = None,
-                  verbose: bool = True) -> dict[str, list[str]] | None:
-    """Converts a HTML table into a python dict
     Parameters
     ----------
-    table: str | xml.etree.ElementTree
-        The HTML table to use.
-        It can be in the form of a string, ElementTree from xml module.
-    indexs: list[str]
-        The Index to use for the dict.
-        If None is provided, the first row of the table will be used.
-    verbose: bool
-        Determine to print information messages
+    module: str
+        The module of the class
+    date: datetime.date
+        The date of the class
+    start: datetime.time
+        The start time of the class
+    end: datetime.time
+        The end time of the class
+    room: str
+        The room of the class
+    """
+    module: str
+    date: datetime.date
+    start: datetime.time
+    end: datetime.time
+    room: str
+
+
+def iter_events(data: dict, weeks: Iterable[int],
+                academic_year: int = None) -> Iterator[Event]:
+    """Yields every occurrence of the classes in the tables one at a time.
+    The events are in the same order as parse_data.
+
+    Parameter
+    ---------
+    data: dict
+        The data of the table of each day, see ScheduleParser.get_tables
+    weeks: Iterable[int]
+        The weeks to parse
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
 
     Returns
     -------
-    dict[str, list[str]]
-        The data of the table.
-    None
-        If there isn't any data
-
-    TODO
-    ----
-    Handle Uneven Spaces
+    Iterator[Event]
+        The events
     """
-    # Setting Up function to print verbose statments
-    def print_verbose(verbosity: bool, print_index: int):
-        if not verbosity:
-            return
+    for module, dates, start, end, room in _iter_rows(data, weeks,
+                                                      academic_year):
+        for date in dates:
+            yield Event(module, date, start, end, room)
 
-        match print_index:
-            case 0:
-                print("No Data in table")
-            case 1:
-                print("No Indexs Provided, Using first row as index")
-            case 2:
-                print("Not Enough Data at Row")
-
-    # Getting Element Tree
-    if isinstance(table, ET.Element):
-        data: ET.Element = table
-    else:
-        data: ET.Element = ET.fromstring(table)
-
-    # Returning None if there isn't any data in table
-    if data.find("tr") is None:
-        print_verbose(verbose, 0)
-        return None
-
-    # Setting indexes/label used for the csv
-    indexed = False
-    if indexs is None:
-        print_verbose(verbose, 1)
-
-        indexs = []
-        for col in data.findall("tr")[0].findall("td"):
-            indexs.append(col.text)
-        indexed = True
-
-    # Setting up output dict
-    output = {}
-    for i in indexs:
-        output[i] = []
-
-    # Getting data from table
-    skipped = False
-    for row in data.findall("tr"):
-        # Skipping first row if used for indexing
-        if indexed and not skipped:
-            skipped = True
-            continue
-        # Looping or indexs
-        columns = row.findall("td")
-        for i, label in enumerate(indexs):
-            try:
-                output[label].append(columns[i].text)
-            except IndexError:
-                print_verbose(verbose, 2)
-
-    return output
 
-
-def parse_data(data: dict, weeks: list) -> dict:
+def parse_data(data: dict, weeks: Iterable[int],
+               academic_year: int = None) -> dict:
     """Combines all the parts of the tables into it's own list.
 
     Parameter
     ---------
     data: dict
         The data
-    weeks: list
+    weeks: Iterable[int]
         The weeks to parse
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
 
     Return
     ------
     dict
         The parsed data
     """
-    start_day = find_week1()
-
     output_data = {
         "Module": [],
         "Start": [],
@@ -214,64 +138,372 @@ def parse_data(data: dict, weeks: list) -> dict:
         "Room": []
     }
 
+    for module, dates, start, end, room in _iter_rows(data, weeks,
+                                                      academic_year):
+        # Appending Data of all the weeks
+        count = len(dates)
+        output_data["Module"].extend([module] * count)
+        output_data["Date"].extend(dates)
+        output_data["Start"].extend([start] * count)
+        output_data["End"].extend([end] * count)
+        output_data["Room"].extend([room] * count)
+
+    # Returing Data
+    return output_data
+
+
+def _iter_rows(data: dict, weeks: Iterable[int],
+               academic_year: int = None) -> Iterator[tuple]:
+    """Yields every row of the tables with the dates of the weeks parsed.
+
+    Parameter
+    ---------
+    data: dict
+        The data of the table of each day
+    weeks: Iterable[int]
+        The weeks to parse
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    Iterator[tuple]
+        The module, dates, start time, end time and room of every row
+    """
+    calendar = get_academic_calendar(academic_year)
+    weeks = RangeSet.from_values(weeks)
+    # The weeks of the module that are parsed
+    module_weeks_cache: dict[str, RangeSet] = {}
+
     # Looping Over all they day of the week
     for day, day_data in data.items():
-        date_with_day = start_day +\
-            datetime.timedelta(days=DayOfWeek[day].value)
+        weekday = DayOfWeek[day].value
         # Skipping if there is no classes
         if day_data is None:
             continue
+        # The dates of the weeks of the module on this day
+        dates_cache: dict[str, tuple[datetime.date, ...]] = {}
 
         # Looping over all the modules in they day
-        for i in range(len(day_data['Module'])):
-            module_weeks = day_data['Weeks'][i]
-            module = day_data['Module'][i]
-
-            # Getting Start Time
-            start = day_data['Start'][i].split(":")
-            start = datetime.time(hour=int(start[0]), minute=int(start[1]))
-            # Getting End Time
-            end = day_data['End'][i].split(":")
-            end = datetime.time(hour=int(end[0]), minute=int(end[1]))
-
-            room = day_data["Room"][i]
-
-            # Looping through all the weeks
-            for week in handle_ranges(module_weeks):
-                if week not in weeks:
-                    continue
-                date = date_with_day + datetime.timedelta(weeks=week-1)
-
-                # Appending Data
-                output_data["Module"].append(module)
-                output_data["Date"].append(date)
-                output_data["Start"].append(start)
-                output_data["End"].append(end)
-                output_data["Room"].append(room)
+        for module, module_weeks, start, end, room in zip(
+                day_data['Module'], day_data['Weeks'], day_data['Start'],
+                day_data['End'], day_data["Room"]
+        ):
+            dates = dates_cache.get(module_weeks)
+            if dates is None:
+                # Getting the weeks to parse
+                parsed_weeks = module_weeks_cache.get(module_weeks)
+                if parsed_weeks is None:
+                    parsed_weeks = handle_ranges_cached(module_weeks) & weeks
+                    module_weeks_cache[module_weeks] = parsed_weeks
 
-    # Returing Data
-    return output_data
+                dates = tuple(calendar.get_date(week, weekday)
+                              for week in parsed_weeks)
+                dates_cache[module_weeks] = dates
+
+            yield (module, dates, parse_time(start), parse_time(end), room)
 
 
 # Utils for exporting
+class ScheduleColumn(MutableSequence):
+    """The values of a key of every event of a schedule.
+
+    The values of a timetable mostly repeat every week, so every distinct
+    value is only stored once and the column is an array of the index of
+    the value of every event. It can be used like a list, but equal values
+    e.g. 1 and 1.0 are only stored once as the first one added.
+
+    Parameters
+    ----------
+    values: Iterable
+        The values of the column
+    """
+    __slots__ = ("_codes", "_values", "_index")
+
+    def __init__(self, values: Iterable = ()):
+        self._codes: array = array("I")
+        # The distinct values and the index of every hashable value
+        self._values: list = []
+        self._index: dict[Any, int] = {}
+        if isinstance(values, ScheduleColumn):
+            self._codes.extend(values._codes)
+            self._values.extend(values._values)
+            self._index.update(values._index)
+        else:
+            self.extend(values)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self._values[code] for code in self._codes[index]]
+        return self._values[self._codes[index]]
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        if isinstance(index, slice):
+            self._codes[index] = array("I", map(self._encode, value))
+        else:
+            self._codes[index] = self._encode(value)
+
+    def __delitem__(self, index: int | slice) -> None:
+        del self._codes[index]
+
+    def __iter__(self) -> Iterator:
+        return map(self._values.__getitem__, self._codes)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ScheduleColumn, list, tuple)):
+            return len(self) == len(other) and \
+                all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.tolist()!r})"
+
+    def insert(self, index: int, value: Any) -> None:
+        """Inserts a value before the index.
+
+        Parameters
+        ----------
+        index: int
+            The index to insert at
+        value: Any
+            The value to insert
+        """
+        self._codes.insert(index, self._encode(value))
+
+    def append(self, value: Any) -> None:
+        """Adds a value to the end of the column.
+
+        Parameters
+        ----------
+        value: Any
+            The value to add
+        """
+        self._codes.append(self._encode(value))
+
+    def extend(self, values: Iterable) -> None:
+        """Adds the values to the end of the column.
+
+        Parameters
+        ----------
+        values: Iterable
+            The values to add
+        """
+        values = list(values)
+        try:
+            # Only the distinct values are looked up one by one
+            for value in dict.fromkeys(values):
+                if value not in self._index:
+                    self._index[value] = len(self._values)
+                    self._values.append(value)
+        except TypeError:
+            # Some values are unhashable
+            self._codes.extend(array("I", map(self._encode, values)))
+        else:
+            self._codes.extend(array("I", map(self._index.__getitem__,
+                                              values)))
+
+    def tolist(self) -> list:
+        """Gets all the values.
+
+        Returns
+        -------
+        list
+            The values
+        """
+        return list(map(self._values.__getitem__, self._codes))
+
+    def take(self, indexes: list[int]) -> "ScheduleColumn":
+        """Gets the values at some indexes.
+
+        Parameters
+        ----------
+        indexes: list[int]
+            The indexes of the values in the new order
+
+        Returns
+        -------
+        ScheduleColumn
+            A new column with the values
+        """
+        column = type(self)(self)
+        column.reorder(indexes)
+        return column
+
+    def reorder(self, indexes: list[int]) -> None:
+        """Reorders the values.
+
+        Parameters
+        ----------
+        indexes: list[int]
+            The current indexes of the values in the new order
+        """
+        if len(indexes) < 2:
+            self._codes = array("I", [self._codes[i] for i in indexes])
+        else:
+            self._codes = array("I", itemgetter(*indexes)(self._codes))
+
+    def get_sort_keys(self, count: int = None,
+                      missing: Any = "") -> tuple[list[int], int]:
+        """Gets an integer that sorts the same way as the value of every
+        event. Equal values have the same integer.
+
+        Parameters
+        ----------
+        count: int
+            The number of events, events after the end of the column have
+            the missing value
+        missing: Any
+            The value of the events after the end of the column
+
+        Returns
+        -------
+        tuple[list[int], int]
+            The integer of every event and the number of integers used
+        """
+        values = self._values
+        padding = 0 if count is None else max(count - len(self), 0)
+        if padding > 0:
+            values = values + [missing]
+
+        # Only the distinct values are sorted
+        ranks = [0] * len(values)
+        rank = -1
+        previous = None
+        for code in sorted(range(len(values)), key=values.__getitem__):
+            if rank < 0 or values[code] != previous:
+                rank += 1
+                previous = values[code]
+            ranks[code] = rank
+
+        keys = list(map(ranks.__getitem__, self._codes))
+        keys.extend([ranks[-1]] * padding)
+        return keys, rank + 1
+
+    def _encode(self, value: Any) -> int:
+        """Gets the index of the value in the distinct values.
+
+        Parameters
+        ----------
+        value: Any
+            The value
+
+        Returns
+        -------
+        int
+            The index of the value, it is added if it isn't found
+        """
+        try:
+            code = self._index.setdefault(value, len(self._values))
+        except TypeError:
+            # Unhashable values are always added
+            code = len(self._values)
+
+        if code == len(self._values):
+            self._values.append(value)
+        return code
+
+
 class ScheduleData(defaultdict):
-    """Object that holds all the data of a Schedule."""
+    """Object that holds all the data of a Schedule.
+
+    The values of every key are stored in a ScheduleColumn.
+    """
     def __init__(self):
-        super().__init__(list)
-        key_list = ["Subject", "Start Date", "Start Time", "End Date",
-                    "End Time", "All Day Event", "Description", "Location"]
+        super().__init__(ScheduleColumn)
 
         # Storing Variables
-        for key in key_list:
-            super().__setitem__(key, [])
+        for key in SCHEDULE_KEYS:
+            super().__setitem__(key, ScheduleColumn())
 
         # Setting up some needed variables
-        self.__current_index = 0
-        self._sorting_keys = [
-            self["Start Date"].copy(),
-            self["Start Time"].copy(),
-            self["Subject"].copy()
-        ]
+        self._sorting_keys = ["Start Date", "Start Time", "Subject"]
+        # The keys the values are currently sorted by, None if the values
+        # changed since the last sort
+        self._sorted_by: tuple[str, ...] | None = None
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> "ScheduleData":
+        """Creates a ScheduleData object from events.
+
+        Parameters
+        ----------
+        events: Iterable[Event]
+            The events of the schedule, see iter_events
+
+        Returns
+        -------
+        ScheduleData
+            The data object
+        """
+        subjects = []
+        start_dates = []
+        start_times = []
+        end_times = []
+        locations = []
+        for event in events:
+            subjects.append(event.module)
+            start_dates.append(event.date)
+            start_times.append(event.start)
+            end_times.append(event.end)
+            locations.append(event.room)
+
+        # The columns are encoded at once
+        schedule_data = cls()
+        schedule_data["Subject"].extend(subjects)
+        schedule_data["Start Date"].extend(start_dates)
+        schedule_data["Start Time"].extend(start_times)
+        schedule_data["End Time"].extend(end_times)
+        schedule_data["Location"].extend(locations)
+
+        return schedule_data
+
+    def select(self, days: Iterable[int], weeks: Iterable[int],
+               academic_year: int = None) -> "ScheduleData":
+        """Gets the events on some of the days and weeks.
+
+        Parameters
+        ----------
+        days: Iterable[int]
+            The days of week to keep where Monday is 1
+        weeks: Iterable[int]
+            The weeks to keep
+        academic_year: int
+            The academic year of the events, see make_request
+
+        Returns
+        -------
+        ScheduleData
+            A new data object with only the selected events
+        """
+        calendar = get_academic_calendar(academic_year)
+        days = RangeSet.from_values(days)
+        weeks = RangeSet.from_values(weeks)
+
+        # The same dates are repeated by every class on the day
+        selected_dates: dict[datetime.date, bool] = {}
+        indexes = []
+        for index, date in enumerate(self["Start Date"]):
+            selected = selected_dates.get(date)
+            if selected is None:
+                week, weekday = calendar.get_week(date)
+                selected = weekday + 1 in days and week in weeks
+                selected_dates[date] = selected
+            if selected:
+                indexes.append(index)
+
+        schedule_data = type(self)()
+        for key in SCHEDULE_KEYS:
+            values = self[key]
+            if values:
+                schedule_data.set(key, values.take(indexes))
+
+        return schedule_data
 
     def export_csv(self, output: str = "output.csv") -> list[list]:
         """Exports the timetable in a csv format.
@@ -289,37 +521,18 @@ class ScheduleData(defaultdict):
         # Sorting Values
         self._sort_values()
 
-        output_value = []
-
-        csv_output = io.StringIO()
-        writer = csv.writer(csv_output)
         # Adding Label Row
-        output_value.append([
-            "Subject", "Start Date", "Start Time", "End Date", "End Time",
-            "All Day Event", "Description", "Location"
-        ])
-
+        output_value = [list(SCHEDULE_KEYS)]
         # Looping over all values
-        for i in range(len(self["Subject"])):
-            output_value.append([
-                self._get_value("Subject", i),
-                self._get_value("Start Date", i),
-                self._get_value("Start Time", i),
-                self._get_value("End Date", i),
-                self._get_value("End Time", i),
-                self._get_value("All Day Event", i),
-                self._get_value("Description", i),
-                self._get_value("Location", i)
-            ])
+        output_value.extend(list(row) for row in self._iter_rows())
 
         # Writting Values
-        writer.writerows(output_value)
-
-        self._write_file(csv_output.getvalue(), output)
+        with self._open_output(output) as file:
+            csv.writer(file).writerows(output_value)
 
         return output_value
 
-    def export_ical(self, output: str = "output.ics") -> iCalendar:
+    def export_ical(self, output: str = "output.ics") -> "iCalendar":
         """Exports the timetable in a iCalander format.
         The format is compatible with
         RCF 5545 see link below for more information:
@@ -334,36 +547,12 @@ class ScheduleData(defaultdict):
         self._sort_values()
 
         # Creating Calendar Component
-        cal = iCalendar()
-        cal.add("version", "2.0")
-        cal.add("prodid", "-//nott-your-timetable//Nottingham Schedule/EN")
+        cal = make_ical_calendar()
 
         # Creating all the Event Components
-        for i in range(len(self["Subject"])):
-            event = iEvent()
-
-            # Ignoing time if is is all day event
-            if self._get_value("All Day Event", i) is not None:
-                dtstart = self._get_value("Start Date", i)
-                dtend = self._get_value("End Date", i)
-            else:
-                dtstart = datetime.datetime.combine(
-                    self._get_value("Start Date", i),
-                    self._get_value("Start Time", i)
-                )
-                dtend = datetime.datetime.combine(
-                    self._get_value("Start Date", i),
-                    self._get_value("End Time", i)
-                )
-
-            event.add("dtstamp", datetime.datetime.now())
-            event.add("uid", self.__get_uid(i))
-            event.add("dtstart", dtstart)
-            event.add("dtend", dtend)
-            event.add("summary", self._get_value("Subject", i))
-            event.add("location", self._get_value("Location", i))
-
-            cal.add_component(event)
+        dtstamp = get_dtstamp()
+        for row in self._iter_rows():
+            cal.add_component(make_ical_event(row, dtstamp))
 
         self._write_file(cal.to_ical().decode("utf-8"), output)
 
@@ -381,16 +570,24 @@ class ScheduleData(defaultdict):
         self._sort_values()
         self._write_file("WIP", output)
 
-    def export(self, export_format: str, output: str) -> int:
+    def export(self, export_format: str, output: str,
+               ics_writer: str = "native", recurring: bool = False) -> int:
         """Exports the data to a given format.
+        The events are written into the output one at a time.
 
         Parameters
         ----------
         export_format: str
             The format to export in.
-            It can be [ics, vcard (WIP), csv]
+            It can be [ics, csv, jsonl, parquet]
         output: str
             Output filename
+            If None or "-" is provided, it will be written to stdout
+        ics_writer: str
+            The iCalendar serializer to use.
+            It can be [native, icalendar]
+        recurring: bool
+            Combines weekly classes into recurring events (ics only)
 
         Returns
         -------
@@ -398,77 +595,161 @@ class ScheduleData(defaultdict):
             0 if successful
             1 if unsuccessful (e.g. invalid format)
         """
-        # Sorting Values
-        self._sort_values()
+        return self.export_all({export_format: output}, ics_writer,
+                               recurring)
 
-        match export_format:
-            case "csv":
-                self.export_csv(output)
-            case "ics":
-                self.export_ical(output)
-            case _:
+    def export_all(self, outputs: dict[str, str], ics_writer: str = "native",
+                   recurring: bool = False) -> int:
+        """Exports the data to many formats at once.
+        The events are only sorted and traversed once for all the formats.
+
+        Parameters
+        ----------
+        outputs: dict[str, str]
+            The output filenames by format, see get_outputs.
+            If None or "-" is provided, it will be written to stdout
+        ics_writer: str
+            The iCalendar serializer to use.
+            It can be [native, icalendar]
+        recurring: bool
+            Combines weekly classes into recurring events (ics only)
+
+        Returns
+        -------
+        int
+            0 if successful
+            1 if unsuccessful (e.g. invalid format)
+        """
+        writer_classes = []
+        for export_format in outputs:
+            writer_class = get_export_writer(export_format, ics_writer,
+                                             recurring)
+            if writer_class is None:
                 # Probably not gonna happen but added for redundancy
                 print("Invalid Format", file=sys.stderr)
                 return 1
+            writer_classes.append(writer_class)
+
+        with ExitStack() as stack:
+            writers = []
+            for writer_class, output in zip(writer_classes, outputs.values()):
+                binary = getattr(writer_class, "binary", False)
+                file = stack.enter_context(self._open_output(output, binary))
+                writers.append(writer_class(file))
+
+            self.write(writers[0] if len(writers) == 1
+                       else MultiWriter(writers))
 
         return 0
 
-    def _write_file(self, data: str, output: str = None) -> None:
-        """Writes the data into a file.
+    def export_diff(self, previous: str, output: str,
+                    summary: str = None) -> dict[str, list]:
+        """Exports only the events that changed since a previous export
+        in the ics format. See DiffICalWriter for more information.
 
         Parameters
         ----------
-        data: str
-            The data to write
-        output: str | None
-            The output filename
-            If None is provided, it will be written to stdout
+        previous: str
+            The filename of the previous ics or csv export
+        output: str
+            Output filename
+            If None or "-" is provided, it will be written to stdout
+        summary: str | None
+            The filename to write the JSON change summary into
+
+        Returns
+        -------
+        dict[str, list]
+            The added, changed and cancelled events
         """
-        if output is None:
-            print(data)
-        else:
-            with open(output, "w", encoding="utf-8") as file:
-                file.write(data)
-                print(f"Data Exported to {output}")
+        previous_events = read_previous(previous)
+        with self._open_output(output) as file:
+            writer = DiffICalWriter(file, previous_events)
+            self.write(writer)
+
+        if summary is not None:
+            with open(summary, "w", encoding="utf-8") as file:
+                writer.write_summary(file)
 
-    def __get_sort_values(self, index: Any) -> list:
-        """Returns the key such that the lists would be sorted based on
-        Start Date -> Start Time (if used) -> Subject.
+        return writer.changes
+
+    def write(self, writer: Any) -> None:
+        """Writes all the events in sorted order using a writer.
 
         Parameters
         ----------
-        index: Any
-            Not used but added because it is required
+        writer: Any
+            The writer to write with e.g. CSVWriter, ICalWriter
+        """
+        # Sorting Values
+        self._sort_values()
+
+        writer.write_header()
+        for row in self._iter_rows():
+            writer.write_event(row)
+        writer.write_footer()
+
+    def _iter_rows(self) -> Iterator[tuple]:
+        """Yields the values of every event.
+        Missing values are None.
 
         Returns
         -------
-        list
-            A list to be sorted by
+        Iterator[tuple]
+            The values of the events in the order of SCHEDULE_KEYS
         """
-        index: int = self.__current_index
-        data = []
-        for i in self._sorting_keys:
-            try:
-                data.append(i[index])
-            except IndexError:
-                data.append("")
-        self.__current_index += 1
-        return data
-
-    def __get_uid(self, index: int) -> str:
-        """Gets a UID forr an event.
+        columns = [self[key].tolist() for key in SCHEDULE_KEYS]
+        return islice(zip_longest(*columns), len(self["Subject"]))
+
+    @contextmanager
+    def _open_output(self, output: str = None,
+                     binary: bool = False) -> Iterator[TextIO | BinaryIO]:
+        """Opens the output to write into.
 
         Parameters
         ----------
-        index: int
-            The index of the event
+        output: str | None
+            The output filename
+            If None or "-" is provided, it will be written to stdout
+        binary: bool
+            Opens the output in binary mode
+
+        Returns
+        -------
+        Iterator[TextIO | BinaryIO]
+            The file to write into
         """
-        date = self._get_value("Start Date", index)
-        subject = self._get_value("Subject", index)
-        start = self._get_value("Start Time", index)
-        end = self._get_value("End Time", index)
+        if output is None or output == "-":
+            if binary:
+                yield sys.stdout.buffer
+                sys.stdout.buffer.flush()
+                return
+            yield sys.stdout
+            # Same as the output of print
+            sys.stdout.write("\n")
+            return
+
+        if binary:
+            with open(output, "wb") as file:
+                yield file
+        else:
+            with open(output, "w", encoding="utf-8") as file:
+                yield file
+        print(f"Data Exported to {output}")
+
+    def _write_file(self, data: str, output: str = None) -> None:
+        """Writes the data into a file.
 
-        return f"{date}-{subject}-{start}-{end}"
+        Parameters
+        ----------
+        data: str
+            The data to write
+        output: str | None
+            The output filename
+            If None or "-" is provided, it will be written to stdout
+        """
+        with self._open_output(output) as file:
+            file.write(data)
 
     def add(self, key: str, value: Any) -> None:
         """Adds the value to the specific key.
@@ -484,6 +765,7 @@ class ScheduleData(defaultdict):
             raise ValueError(f"{key} is not a valid key.")
 
         self[key].append(value)
+        self._mark_dirty()
 
     def set(self, key: str, value: Iterable) -> None:
         """Replace the value of the specific key to the given value.
@@ -501,7 +783,8 @@ class ScheduleData(defaultdict):
         if not isinstance(value, Iterable):
             raise ValueError("Value is not an iterable")
 
-        super().__setitem__(key, list(value))
+        super().__setitem__(key, ScheduleColumn(value))
+        self._mark_dirty()
 
     def __setitem__(self, key: Any, value: Any) -> NoReturn:
         """Raises TypeError when doing self[key] = value.
@@ -512,26 +795,81 @@ class ScheduleData(defaultdict):
     def _sort_values(self, sorting_keys: list[Any] = None) -> None:
         """Sort all the value
 
+        A single sorting order is found and applied to every column. The
+        values are only sorted again when they changed or they were sorted
+        by other keys since the last sort. The sort is stable, so ties keep
+        their current order.
+
         Parameters
         ----------
         sorting_keys: list[Any]
             The keys to sort by
             Defaults is "Start Date" -> "Start Time" -> "Subject"
         """
-        # Sorting Keys
-        # Making a copy of need values
-        self._sorting_keys = []
         if sorting_keys is None:
-            self._sorting_keys.append(self["Start Date"].copy())
-            self._sorting_keys.append(self["Start Time"].copy())
-            self._sorting_keys.append(self["Subject"].copy())
-        else:
-            for item in sorting_keys:
-                self._sorting_keys.append(self[item].copy())
-        # Looping over all values
+            sorting_keys = ["Start Date", "Start Time", "Subject"]
+        self._sorting_keys = list(sorting_keys)
+
+        keys = tuple(sorting_keys)
+        if self._sorted_by == keys:
+            return
+
+        self.__apply_order(self._get_sort_order(keys))
+        # Sorting again changes the values when some values are missing
+        lengths = {len(items) for items in self.values()} - {0}
+        self._sorted_by = keys if len(lengths) <= 1 else None
+
+    def _mark_dirty(self) -> None:
+        """Marks the values as changed, they will be sorted again."""
+        self._sorted_by = None
+
+    def __apply_order(self, order: list[int]) -> None:
+        """Reorders all the columns.
+
+        Parameters
+        ----------
+        order: list[int]
+            The current indexes of the values in the new order
+        """
         for items in self.values():
-            self.__current_index = 0
-            items.sort(key=self.__get_sort_values)
+            if len(items) == len(order):
+                items.reorder(order)
+            elif len(items) > 0:
+                # Columns with missing values keep the order of the values
+                # they have
+                size = len(items)
+                items.reorder([i for i in order if i < size])
+
+    def _get_sort_order(self, sorting_keys: list[Any]) -> list[int]:
+        """Gets the indexes of the events in sorted order.
+
+        The values of every key are replaced by integers with the same
+        order, so the events are sorted once by a single integer.
+
+        Parameters
+        ----------
+        sorting_keys: list[Any]
+            The keys to sort by
+
+        Returns
+        -------
+        list[int]
+            The indexes of the events sorted by the keys
+        """
+        count = max((len(items) for items in self.values()), default=0)
+        combined = None
+        for key in sorting_keys:
+            keys, size = self[key].get_sort_keys(count)
+            if combined is None:
+                combined = keys
+            else:
+                combined = [value * size + key_value
+                            for value, key_value in zip(combined, keys)]
+        if combined is None:
+            return list(range(count))
+
+        # The sort is stable so ties keep their current order
+        return sorted(range(count), key=combined.__getitem__)
 
     def _get_value(self, key: str, index: int) -> Any:
         """Gets the event data of the key at the index.
@@ -550,70 +888,3 @@ class ScheduleData(defaultdict):
             return None
         except TypeError as err:
             raise ValueError("Invalid Key") from err
-
-
-# Requester
-def make_request(program_value: str, days: list[int],
-                 weeks: list[int]) -> ScheduleData:
-    """Make the http request to retrieve data.
-
-    Prameters
-    ---------
-    program_value: str
-        The program value of the program to request
-    days: list[int]
-        A list of day of week to request
-    weeks: list[int]
-        A list of weeks to request
-
-    Returns
-    -------
-    ScheduleData
-        The data fetch
-    """
-    link = f"http://timetablingunmc.nottingham.ac.uk:8006/reporting/\
-TextSpreadsheet;programme+of+study;id;{program_value}%0D%0A?\
-days=1-7&weeks=1-52&periods=3-20&template=SWSCUST+programme+of+study+TextSpreadsheet&\
-height=100&week=100"
-
-    response: requests.Response = requests.get(link, timeout=10)
-    text = response.text
-
-    return parse_response(text, days, weeks)
-
-
-def parse_response(response: str, days: list[int],
-                   weeks: list[int]) -> ScheduleData:
-    """Parses the HTML response into a ScheduleData Object.
-
-    Parameters
-    ----------
-    response: str
-        The Response of the HTTP request
-    days: list[int]
-        A list of day of week to request
-    weeks: list[int]
-        A list of weeks to request
-
-    Returns
-    -------
-    ScheduleData
-        The data object
-    """
-    parser = ScheduleParser(days)
-    parser.feed(response)
-    parser.close()
-
-    data = parser.tables.copy()
-    for key, value in parser.tables.items():
-        data[key] = table_to_dict(value, verbose=False)
-
-    parsed_data = parse_data(data, weeks)
-    schedule_data = ScheduleData()
-    schedule_data.set("Subject", parsed_data["Module"])
-    schedule_data.set("Start Date", parsed_data["Date"])
-    schedule_data.set("Start Time", parsed_data["Start"])
-    schedule_data.set("End Time", parsed_data["End"])
-    schedule_data.set("Location", parsed_data["Room"])
-
-    return schedule_data
@@ -1,7 +1,244 @@
 #!/usr/bin/env python3
 """Functions that handles ranges encoded in strings e.g. 1, 2, 5-10"""
-from string import whitespace
+from collections.abc import Iterable, Iterator
+from enum import Enum
+from functools import lru_cache
 from .enums import DayOfWeekISO
+from .weeks import DAYS_IN_WEEK, WEEKS_IN_YEAR
+
+RANGE_ERROR = "Invalid Range, Please Check Inserted Value"
+
+
+class RangeSet:
+    """An immutable set of non-negative integers e.g. weeks or days.
+
+    The values are stored as a bitset where bit n is set if n is in the set,
+    so the set operations never create a list of every value.
+
+    Parameters
+    ----------
+    mask: int
+        The bitset of the values
+    """
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0):
+        if mask < 0:
+            raise ValueError(RANGE_ERROR)
+        self.mask = mask
+
+    @classmethod
+    def from_range(cls, start: int, end: int) -> "RangeSet":
+        """Creates a set of all the integers between two values.
+
+        Parameters
+        ----------
+        start: int
+            The first value
+        end: int
+            The last value, it can be less than start
+
+        Returns
+        -------
+        RangeSet
+            The integers from start to end inclusive
+        """
+        if start > end:
+            start, end = end, start
+        if start < 0:
+            raise ValueError(RANGE_ERROR)
+
+        return cls(((1 << (end - start + 1)) - 1) << start)
+
+    @classmethod
+    def from_values(cls, values: Iterable[int]) -> "RangeSet":
+        """Creates a set of integers.
+
+        Parameters
+        ----------
+        values: Iterable[int]
+            The integers, it is returned as it is if it is a RangeSet
+
+        Returns
+        -------
+        RangeSet
+            The integers
+        """
+        if isinstance(values, RangeSet):
+            return values
+
+        mask = 0
+        for value in values:
+            if value < 0:
+                raise ValueError(RANGE_ERROR)
+            mask |= 1 << value
+
+        return cls(mask)
+
+    @classmethod
+    def parse(cls, value: str, names: type[Enum] = None) -> "RangeSet":
+        """Parses integers splitted by ','.
+        A range of value can be added by using '-'.
+
+        Parameters
+        ----------
+        value: str
+            The range expression e.g. 1, 2, 5-10
+        names: type[Enum]
+            The enum used to convert names into integers e.g. DayOfWeekISO
+            for Mon-Fri
+
+        Returns
+        -------
+        RangeSet
+            The integers
+
+        Raises
+        ------
+        ValueError
+            If the range expression is invalid
+        """
+        members = {} if names is None else names.__members__
+        mask = 0
+        # Removing white spaces
+        for part in "".join(value.split()).split(","):
+            start, separator, end = part.partition("-")
+            try:
+                start = members[start].value if start in members \
+                    else int(start)
+                if not separator:
+                    end = start
+                else:
+                    end = members[end].value if end in members else int(end)
+            except ValueError as err:
+                raise ValueError(RANGE_ERROR) from err
+            if start > end:
+                start, end = end, start
+            if start < 0:
+                raise ValueError(RANGE_ERROR)
+            mask |= ((1 << (end - start + 1)) - 1) << start
+
+        return cls(mask)
+
+    def union(self, other: "RangeSet") -> "RangeSet":
+        """Gets the values in either set."""
+        return RangeSet(self.mask | other.mask)
+
+    def intersection(self, other: "RangeSet") -> "RangeSet":
+        """Gets the values in both sets."""
+        return RangeSet(self.mask & other.mask)
+
+    def difference(self, other: "RangeSet") -> "RangeSet":
+        """Gets the values that are not in the other set."""
+        return RangeSet(self.mask & ~other.mask)
+
+    def issubset(self, other: "RangeSet") -> bool:
+        """Checks if every value is in the other set."""
+        return self.mask & ~other.mask == 0
+
+    def __or__(self, other: object) -> "RangeSet":
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other: object) -> "RangeSet":
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self, other: object) -> "RangeSet":
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self.difference(other)
+
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self.issubset(other)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self.mask == other.mask
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __contains__(self, value: object) -> bool:
+        return isinstance(value, int) and value >= 0 and \
+            self.mask >> value & 1 == 1
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __iter__(self) -> Iterator[int]:
+        mask = self.mask
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    @property
+    def first(self) -> int:
+        """The smallest value."""
+        if not self.mask:
+            raise ValueError("Empty Range")
+        return (self.mask & -self.mask).bit_length() - 1
+
+    @property
+    def last(self) -> int:
+        """The largest value."""
+        if not self.mask:
+            raise ValueError("Empty Range")
+        return self.mask.bit_length() - 1
+
+    def intervals(self) -> Iterator[tuple[int, int]]:
+        """Yields every run of consecutive values.
+
+        Returns
+        -------
+        Iterator[tuple[int, int]]
+            The first and last value of every run from the smallest
+        """
+        mask = self.mask
+        while mask:
+            start = (mask & -mask).bit_length() - 1
+            # Adding 1 clears the run of set bits
+            run = mask >> start
+            length = (run ^ (run + 1)).bit_length() - 1
+            yield start, start + length - 1
+            mask ^= ((1 << length) - 1) << start
+
+    def format(self, separator: str = ",") -> str:
+        """Gets the shortest range expression of the set.
+
+        Parameters
+        ----------
+        separator: str
+            The string used to seperate each range
+
+        Returns
+        -------
+        str
+            The range expression e.g. 1-3,5 for [1, 2, 3, 5]
+        """
+        return separator.join(
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in self.intervals()
+        )
+
+    def __str__(self) -> str:
+        return self.format()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}.parse({self.format()!r})"
+
+
+ALL_DAYS = RangeSet.from_range(1, DAYS_IN_WEEK)
+ALL_WEEKS = RangeSet.from_range(1, WEEKS_IN_YEAR)
 
 
 def handle_ranges(value: str) -> list[int]:
@@ -16,47 +253,36 @@ def handle_ranges(value: str) -> list[int]:
     Returns
     -------
     list[int]
-        The list of integers
+        The sorted list of integers without duplicates
     """
-    # Removing white spaces
-    for space in whitespace:
-        value = value.replace(space, '')
-
-    # Splitting all commas
-    splitted = value.split(',')
-
-    output = []
-    for i in splitted:
-        # Adding all values encoded in -
-        if '-' in i:
-            range_split = i.split('-')
-            try:
-                range_split[0] = int(range_split[0])
-                range_split[1] = int(range_split[1])
-                range_split.sort()
-                for j in range(range_split[0], range_split[1] + 1):
-                    output.append(j)
-            except ValueError as err:
-                raise ValueError("Invalid Range, Please Check Inserted Value")\
-                    from err
-        # Adding normal values
-        else:
-            try:
-                output.append(int(i))
-            except ValueError as err:
-                raise ValueError("Invalid Range, Please Check Inserted Value")\
-                    from err
+    return list(RangeSet.parse(value))
+
+
+@lru_cache(maxsize=1024)
+def handle_ranges_cached(value: str) -> RangeSet:
+    """Memoised version of RangeSet.parse.
+    The same ranges are repeated across the rows of a timetable.
+
+    Parameters
+    ----------
+    value: str
+        The integers to convert
 
-    # Sorting Output
-    output.sort()
-    return output
+    Returns
+    -------
+    RangeSet
+        The integers
+    """
+    return RangeSet.parse(value)
 
 
 def handle_ranges_days(value: str) -> list[int]:
     """Converts integers splitted by ',' into a list.
     A range of value can be added by using '-'.
     This is simillar to handle_ranges but adds supports for
-    text like Mon-Fri
+    text like Mon-Fri. A day can be a number from 1 (Monday) to 7 (Sunday),
+    its full or short name and ranges can mix both e.g. Monday, 1-Fri or
+    Mon,Wed.
 
     Parameters
     ----------
@@ -66,41 +292,25 @@ def handle_ranges_days(value: str) -> list[int]:
     Returns
     -------
     list[int]
-        The list of integers
+        The sorted list of integers without duplicates
     """
-    # Removing white spaces
-    for space in whitespace:
-        value = value.replace(space, '')
-
-    # Splitting all commas
-    splitted = value.split(',')
-
-    output = []
-    for i in splitted:
-        # Adding all values encoded in -
-        if '-' in i:
-            range_split = i.split('-')
-            try:
-                try:
-                    range_split[0] = DayOfWeekISO[range_split[0]].value
-                    range_split[1] = DayOfWeekISO[range_split[1]].value
-                except KeyError:
-                    range_split[0] = int(range_split[0])
-                    range_split[1] = int(range_split[1])
-                range_split.sort()
-                for j in range(range_split[0], range_split[1] + 1):
-                    output.append(j)
-            except ValueError as err:
-                raise ValueError("Invalid Range, Please Check Inserted Value")\
-                    from err
-        # Adding normal values
-        else:
-            try:
-                output.append(int(i))
-            except ValueError as err:
-                raise ValueError("Invalid Range, Please Check Inserted Value")\
-                    from err
+    return list(RangeSet.parse(value, DayOfWeekISO))
 
-    # Sorting Output
-    output.sort()
-    return output
+
+def compress_ranges(values: Iterable[int], separator: str = ",") -> str:
+    """Converts integers into the shortest range expression.
+    This is the reverse of handle_ranges.
+
+    Parameters
+    ----------
+    values: Iterable[int]
+        The integers to convert
+    separator: str
+        The string used to seperate each range
+
+    Returns
+    -------
+    str
+        The range expression e.g. 1-3,5 for [1, 2, 3, 5]
+    """
+    return RangeSet.from_values(values).format(separator)
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Functions that fetch and parse the timetable of a program."""
+import time
+import codecs
+from contextlib import nullcontext
+from xml.etree import ElementTree as ET
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+import requests
+from .range_handlers import compress_ranges
+from .cache import ResponseCache
+from .html_parsers import get_parser_backend
+from .parsers import ScheduleData, iter_events
+
+
+class StreamStats:
+    """Measurements of a streamed request.
+
+    Attributes
+    ----------
+    total_bytes: int
+        The number of bytes received
+    time_to_first_table: float | None
+        The number of seconds until the first table is parsed
+    elapsed: float | None
+        The number of seconds until the whole response is parsed
+    """
+    def __init__(self):
+        self.total_bytes: int = 0
+        self.time_to_first_table: float | None = None
+        self.elapsed: float | None = None
+        self._start: float = time.perf_counter()
+
+    def start(self) -> None:
+        """Resets the measurements and start the timer."""
+        self.total_bytes = 0
+        self.time_to_first_table = None
+        self.elapsed = None
+        self._start = time.perf_counter()
+
+    def get_elapsed(self) -> float:
+        """Gets the number of seconds since the timer started."""
+        return time.perf_counter() - self._start
+
+
+REPORTING_URL = "http://timetablingunmc.nottingham.ac.uk:8006/reporting/\
+TextSpreadsheet;programme+of+study;id;{}%0D%0A"
+CHUNK_SIZE = 64 * 1024
+
+
+def build_query(days: Iterable[int] = None,
+                weeks: Iterable[int] = None) -> str:
+    """Builds the query string of a request.
+
+    Parameters
+    ----------
+    days: Iterable[int]
+        A list of day of week to request, defaults to the whole week
+    weeks: Iterable[int]
+        A list of weeks to request, defaults to the whole year
+
+    Returns
+    -------
+    str
+        The query string
+    """
+    days_range = "1-7" if days is None else compress_ranges(days, ";")
+    weeks_range = "1-52" if weeks is None else compress_ranges(weeks, ";")
+
+    return f"days={days_range}&weeks={weeks_range}&periods=3-20&\
+template=SWSCUST+programme+of+study+TextSpreadsheet&height=100&week=100"
+
+
+def make_request(program_value: str, days: Iterable[int],
+                 weeks: Iterable[int],
+                 session: requests.Session = None,
+                 cache: ResponseCache = None,
+                 refresh: bool = False,
+                 stats: StreamStats = None,
+                 backend: str = None,
+                 academic_year: int = None) -> ScheduleData:
+    """Make the http request to retrieve data.
+
+    Without a cache, only the requested days and weeks are requested from
+    the server. The whole timetable will be requested if the narrowed
+    response can't be parsed. With a cache, the whole timetable is always
+    requested, so it can be reused for any other days and weeks.
+
+    Prameters
+    ---------
+    program_value: str
+        The program value of the program to request
+    days: Iterable[int]
+        A list of day of week to request
+    weeks: Iterable[int]
+        A list of weeks to request
+    session: requests.Session
+        The session used to make the request.
+        If None is provided, a new connection will be made.
+    cache: ResponseCache
+        The cache to get the response from and store the response in.
+        If None is provided, the response will not be cached.
+    refresh: bool
+        Ignores the cached response and fetch it again
+    stats: StreamStats
+        The measurements of the download to record into.
+        It is not used when the cached response is used.
+    backend: str
+        The parser backend to use, see get_parser_backend
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    ScheduleData
+        The data fetch
+    """
+    queries = [build_query()]
+    if cache is not None:
+        # Using cached response if available, the whole timetable contains
+        # every day and week
+        text = None if refresh else cache.get(program_value, queries[0])
+        if text is not None:
+            try:
+                return parse_response(text, days, weeks, backend,
+                                      academic_year)
+            except (ET.ParseError, KeyError, IndexError, ValueError):
+                # The response doesn't contain the expected tables
+                pass
+    elif build_query(days, weeks) != queries[0]:
+        queries.insert(0, build_query(days, weeks))
+
+    requester = requests if session is None else session
+    if len(queries) > 1:
+        try:
+            return fetch_response(requester, program_value, queries[0],
+                                  days, weeks, cache, stats, backend,
+                                  academic_year)
+        except (ET.ParseError, KeyError, IndexError, ValueError):
+            # Falling back to the whole timetable
+            pass
+
+    return fetch_response(requester, program_value, queries[-1], days, weeks,
+                          cache, stats, backend, academic_year)
+
+
+def fetch_response(requester: requests.Session, program_value: str,
+                   query: str, days: Iterable[int], weeks: Iterable[int],
+                   cache: ResponseCache = None,
+                   stats: StreamStats = None,
+                   backend: str = None,
+                   academic_year: int = None) -> ScheduleData:
+    """Fetch and parse a single query.
+    The response is parsed while it is being downloaded and it is only
+    cached when it is parsed successfully. The download stops once all the
+    tables are found unless the response is being cached.
+
+    Prameters
+    ---------
+    requester: requests.Session
+        The session or the requests module used to make the request
+    program_value: str
+        The program value of the program to request
+    query: str
+        The query string of the request
+    days: Iterable[int]
+        A list of day of week to request
+    weeks: Iterable[int]
+        A list of weeks to request
+    cache: ResponseCache
+        The cache to store the response in
+    stats: StreamStats
+        The measurements to record into
+    backend: str
+        The parser backend to use, see get_parser_backend
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    ScheduleData
+        The data fetch
+    """
+    link = f"{REPORTING_URL.format(program_value)}?{query}"
+    if stats is not None:
+        stats.start()
+
+    with requester.get(link, timeout=10, stream=True) as response:
+        if cache is not None and response.ok:
+            writer = cache.writer(program_value, query)
+        else:
+            writer = nullcontext()
+
+        with writer as cache_file:
+            chunks = iter_response(response, stats)
+            if cache_file is not None:
+                chunks = write_through(chunks, cache_file)
+            # The whole response is needed to cache it
+            return parse_stream(chunks, days, weeks, stats,
+                                stop_early=cache_file is None,
+                                backend=backend,
+                                academic_year=academic_year)
+
+
+def iter_response(response: requests.Response,
+                  stats: StreamStats = None) -> Iterator[str]:
+    """Decodes the body of a streamed response chunk by chunk.
+
+    Parameters
+    ----------
+    response: requests.Response
+        The streamed response
+    stats: StreamStats
+        The measurements to record the number of bytes received into
+
+    Returns
+    -------
+    Iterator[str]
+        The decoded chunks
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(
+        errors="replace"
+    )
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if stats is not None:
+            stats.total_bytes += len(chunk)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def write_through(chunks: Iterable[str], file: TextIO) -> Iterator[str]:
+    """Writes each chunk into a file while passing it along.
+
+    Parameters
+    ----------
+    chunks: Iterable[str]
+        The chunks to write
+    file: TextIO
+        The file to write into
+
+    Returns
+    -------
+    Iterator[str]
+        The same chunks
+    """
+    for chunk in chunks:
+        file.write(chunk)
+        yield chunk
+
+
+def parse_response(response: str, days: Iterable[int],
+                   weeks: Iterable[int], backend: str = None,
+                   academic_year: int = None) -> ScheduleData:
+    """Parses the HTML response into a ScheduleData Object.
+
+    Parameters
+    ----------
+    response: str
+        The Response of the HTTP request
+    days: Iterable[int]
+        A list of day of week to request
+    weeks: Iterable[int]
+        A list of weeks to request
+    backend: str
+        The parser backend to use, see get_parser_backend
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    ScheduleData
+        The data object
+    """
+    return parse_stream([response], days, weeks, backend=backend,
+                        academic_year=academic_year)
+
+
+def parse_stream(chunks: Iterable[str], days: Iterable[int],
+                 weeks: Iterable[int],
+                 stats: StreamStats = None,
+                 stop_early: bool = True,
+                 backend: str = None,
+                 academic_year: int = None) -> ScheduleData:
+    """Parses the HTML response into a ScheduleData Object as each chunk of
+    the response arrives.
+
+    With stop_early, no more chunks are consumed once the tables of all the
+    requested days are found.
+
+    Parameters
+    ----------
+    chunks: Iterable[str]
+        The chunks of the response of the HTTP request
+    days: Iterable[int]
+        A list of day of week to request
+    weeks: Iterable[int]
+        A list of weeks to request
+    stats: StreamStats
+        The measurements to record into
+    stop_early: bool
+        Stops consuming the chunks once all the tables are found
+    backend: str
+        The parser backend to use, see get_parser_backend
+    academic_year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024,
+        defaults to the current academic year
+
+    Returns
+    -------
+    ScheduleData
+        The data object
+    """
+    parser = get_parser_backend(backend)(days, stop_early)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if stats is not None and stats.time_to_first_table is None\
+           and parser.tables_completed > 0:
+            stats.time_to_first_table = stats.get_elapsed()
+        if parser.finished:
+            break
+    parser.close()
+
+    schedule_data = ScheduleData.from_events(
+        iter_events(parser.get_tables(), weeks, academic_year)
+    )
+
+    if stats is not None:
+        stats.elapsed = stats.get_elapsed()
+
+    return schedule_data
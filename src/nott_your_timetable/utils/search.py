@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Fuzzy and prefix search over the program names."""
+import re
+import heapq
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from itertools import chain
+from typing import NamedTuple
+
+DEFAULT_LIMIT = 10
+# The minimum fraction of the query trigrams a fuzzy match must have
+MIN_SIMILARITY = 0.3
+
+
+class SearchResult(NamedTuple):
+    """A program matching a search query.
+
+    Parameters
+    ----------
+    school: str
+        The name of the school/division of the program
+    program: str
+        The name of the program
+    value: str
+        The value of the program
+    score: float
+        How well the program matches the query, higher is better
+    """
+    school: str
+    program: str
+    value: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    """Normalizes text for searching.
+
+    Parameters
+    ----------
+    text: str
+        The text to normalize
+
+    Returns
+    -------
+    str
+        The lowercase text with every word separated by a single space
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def get_trigrams(text: str) -> set[str]:
+    """Gets the trigrams of the words in normalized text.
+    Every word is padded so the first letter of a word is a trigram.
+
+    Parameters
+    ----------
+    text: str
+        The normalized text
+
+    Returns
+    -------
+    set[str]
+        The trigrams
+    """
+    trigrams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        trigrams.update(padded[index:index + 3]
+                        for index in range(len(padded) - 2))
+
+    return trigrams
+
+
+class SearchIndex:
+    """A trigram index of program names.
+
+    Programs are ranked by the fraction of the query trigrams in their
+    name, so misspelled queries still match. Names containing the query or
+    where every query word is the prefix of a word rank higher.
+
+    Parameters
+    ----------
+    entries: Iterable[tuple[str, str, str]]
+        The school/division, name and value of every program
+    """
+    def __init__(self, entries: Iterable[tuple[str, str, str]]):
+        self.entries: list[tuple[str, str, str]] = []
+        self.names: list[str] = []
+        # Every prefix of every word of the names
+        self.prefixes: list[set[str]] = []
+        self.postings: dict[str, list[int]] = defaultdict(list)
+
+        for index, entry in enumerate(entries):
+            name = normalize(entry[1])
+            self.entries.append(entry)
+            self.names.append(name)
+            self.prefixes.append({word[:end] for word in name.split()
+                                  for end in range(1, len(word) + 1)})
+            for trigram in get_trigrams(name):
+                self.postings[trigram].append(index)
+
+    def search(self, query: str, limit: int | None = DEFAULT_LIMIT,
+               school: str = None) -> list[SearchResult]:
+        """Finds the programs that best match a query.
+
+        Parameters
+        ----------
+        query: str
+            The partial or misspelled program name
+        limit: int | None
+            The maximum number of results, None for every result
+        school: str | None
+            Only finds the programs of this school/division
+
+        Returns
+        -------
+        list[SearchResult]
+            The matching programs from the best match
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        # Counting the shared trigrams of every candidate
+        trigrams = get_trigrams(query)
+        counts = Counter(chain.from_iterable(
+            self.postings.get(trigram, ()) for trigram in trigrams
+        ))
+
+        query_words = query.split()
+        min_count = MIN_SIMILARITY * len(trigrams)
+        results = []
+        for index, count in counts.items():
+            if count < min_count:
+                continue
+            entry = self.entries[index]
+            if school is not None and entry[0] != school:
+                continue
+
+            score = count / len(trigrams)
+            if query in self.names[index]:
+                score += 1
+            if self.prefixes[index].issuperset(query_words):
+                score += 0.5
+            results.append(SearchResult(*entry, score))
+
+        # Best score first, then the shortest name
+        def key(result: SearchResult) -> tuple:
+            return (-result.score, len(result.program), result.program)
+
+        if limit is None:
+            return sorted(results, key=key)
+        return heapq.nsmallest(limit, results, key=key)
@@ -2,8 +2,13 @@
 """Functions to do calendar related calculations."""
 from calendar import Calendar
 import datetime
+from functools import lru_cache
 from .enums import DayOfWeek
 
+ACADEMIC_YEAR_MONTH = 9
+WEEKS_IN_YEAR = 52
+DAYS_IN_WEEK = 7
+
 
 def find_first_day(day: int | str, year: int, month: int,
                    iso: bool = False) -> int:
@@ -48,33 +53,177 @@ def find_first_day(day: int | str, year: int, month: int,
     return day_number
 
 
-def find_week1() -> datetime.date:
+class AcademicCalendar:
+    """The weeks of an academic year.
+
+    Week 1 is the week of the first Monday of September. The date of every
+    day of every week is computed once, so converting between dates and
+    week numbers doesn't need any calendar calculations.
+
+    Parameters
+    ----------
+    year: int
+        The year the academic year starts in e.g. 2023 for 2023/2024
+    """
+    def __init__(self, year: int):
+        self.year = year
+        self.week1 = datetime.date(
+            year, ACADEMIC_YEAR_MONTH,
+            find_first_day(0, year, ACADEMIC_YEAR_MONTH)
+        )
+        self._week1_ordinal = self.week1.toordinal()
+        # Week number - 1 -> dates of the week from Monday
+        self._dates: tuple[tuple[datetime.date, ...], ...] = tuple(
+            tuple(self.week1 + datetime.timedelta(weeks=week, days=day)
+                  for day in range(DAYS_IN_WEEK))
+            for week in range(WEEKS_IN_YEAR)
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.year})"
+
+    @property
+    def mondays(self) -> tuple[datetime.date, ...]:
+        """The Monday of every week from week 1."""
+        return tuple(dates[0] for dates in self._dates)
+
+    def get_date(self, week: int, weekday: int = 0) -> datetime.date:
+        """Gets the date of a day in a week.
+
+        Parameters
+        ----------
+        week: int
+            The week number from 1 to 52
+        weekday: int
+            The day of week where Monday is 0, see DayOfWeek
+
+        Returns
+        -------
+        datetime.date
+            The date
+
+        Raises
+        ------
+        ValueError
+            If the week or the day of week is out of range
+        """
+        if not 1 <= week <= WEEKS_IN_YEAR or \
+                not 0 <= weekday < DAYS_IN_WEEK:
+            raise ValueError("Invalid Week or Day of Week")
+
+        return self._dates[week - 1][weekday]
+
+    def get_week(self, date: datetime.date) -> tuple[int, int]:
+        """Gets the week of a date.
+        Dates outside of the academic year have a week below 1 or above 52.
+
+        Parameters
+        ----------
+        date: datetime.date
+            The date
+
+        Returns
+        -------
+        tuple[int, int]
+            The week number and the day of week where Monday is 0
+        """
+        week, weekday = divmod(date.toordinal() - self._week1_ordinal,
+                               DAYS_IN_WEEK)
+        return week + 1, weekday
+
+
+def get_academic_year(date: datetime.date = None) -> int:
+    """Gets the academic year of a date.
+
+    Parameters
+    ----------
+    date: datetime.date
+        The date, defaults to today
+
+    Returns
+    -------
+    int
+        The year the academic year starts in
+    """
+    if date is None:
+        date = datetime.date.today()
+    if date.month < ACADEMIC_YEAR_MONTH:
+        return date.year - 1
+    return date.year
+
+
+@lru_cache(maxsize=None)
+def _get_academic_calendar(year: int) -> AcademicCalendar:
+    """Gets the shared calendar of an academic year."""
+    return AcademicCalendar(year)
+
+
+def get_academic_calendar(year: int = None) -> AcademicCalendar:
+    """Gets the calendar of an academic year.
+    The calendar of every year is only built once.
+
+    Parameters
+    ----------
+    year: int
+        The year the academic year starts in, defaults to the current
+        academic year
+
+    Returns
+    -------
+    AcademicCalendar
+        The calendar
+    """
+    if year is None:
+        year = get_academic_year()
+    return _get_academic_calendar(year)
+
+
+def find_week1(year: int = None) -> datetime.date:
     """Finds week 1 of the academic year.
 
+    Parameters
+    ----------
+    year: int
+        The year the academic year starts in, defaults to the current
+        academic year
+
     Returns
     -------
     datetime.date
         The date of the first week of september.
     """
-    today: datetime.date = datetime.date.today()
-    if today.month < 9:
-        year: int = today.year - 1
-        day: int = find_first_day(0, year, 9)
-    else:
-        year: int = today.year
-        day: int = find_first_day(0, year, 9)
+    return get_academic_calendar(year).week1
 
-    week1: datetime.date = datetime.date(year, 9, day)
-    return week1
 
-
-def find_current_week_nott() -> int:
+def find_current_week_nott(today: datetime.date = None,
+                           year: int = None) -> int:
     """Finds the week number.
 
+    Parameters
+    ----------
+    today: datetime.date
+        The date to find the week number of, defaults to today
+    year: int
+        The year the academic year starts in, defaults to the academic year
+        of today
+
     Returns
     -------
     int
         The current week number.
+
+    Raises
+    ------
+    ValueError
+        If today is not in the academic year
     """
-    diff = datetime.date.today() - find_week1()
-    return int(diff.days / 7) + 1
+    if today is None:
+        today = datetime.date.today()
+    if year is None:
+        year = get_academic_year(today)
+    elif year != get_academic_year(today):
+        raise ValueError(f"{today} is not in the academic year "
+                         f"{year}/{year + 1}")
+    week, _ = get_academic_calendar(year).get_week(today)
+    # The days before the first Monday of September are in week 1
+    return max(week, 1)
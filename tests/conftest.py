@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Fixtures shared by the tests."""
+import datetime
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+import pytest
+import requests
+from nott_your_timetable.utils.parsers import ScheduleData
+
+DATA_DIR = Path(__file__).parent / "data"
+DAY = datetime.date(2023, 9, 4)
+
+
+class FakeSession:
+    """A session that answers every request with a saved timetable page.
+
+    Parameters
+    ----------
+    page: str
+        The page to answer with
+    failing: tuple[str, ...]
+        The program values whose requests fail with a ConnectionError
+    """
+    def __init__(self, page: str, failing: tuple[str, ...] = ()):
+        self.page = page.encode("utf-8")
+        self.failing = failing
+        self.urls: list[str] = []
+        self.closed = False
+
+    def get(self, url: str, **_: Any) -> requests.Response:
+        """Answers a request with the page."""
+        self.urls.append(url)
+        if any(f";{value}%0D%0A" in url for value in self.failing):
+            raise requests.ConnectionError(f"Failed to connect to {url}")
+
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        # pylint: disable=protected-access
+        response._content = self.page
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        """Closes the session."""
+        self.closed = True
+
+
+@pytest.fixture(name="timetable_page", scope="session")
+def fixture_timetable_page() -> str:
+    """A TextSpreadsheet page with regular and irregular tables."""
+    return (DATA_DIR / "timetable.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture(name="fake_session")
+def fixture_fake_session(timetable_page: str) -> FakeSession:
+    """A session answering with the timetable page, requests of the BAD
+    program fail."""
+    return FakeSession(timetable_page, ("BAD",))
+
+
+def create_schedule_data(events: Iterable[tuple] = (),
+                         locations: Iterable[str] = ()) -> ScheduleData:
+    """Creates the timetable of a program.
+
+    Parameters
+    ----------
+    events: Iterable[tuple]
+        The events in SCHEDULE_KEYS order
+    locations: Iterable[str]
+        The locations of the parallel sessions of a lab, which are added
+        before the events
+
+    Returns
+    -------
+    ScheduleData
+        The timetable with the events
+    """
+    events = [("EEEE2044 Lab", DAY, datetime.time(9), None,
+               datetime.time(11), None, None, location)
+              for location in locations] + list(events)
+
+    schedule_data = ScheduleData()
+    for key, values in zip(schedule_data, zip(*events)):
+        schedule_data.set(key, values)
+    return schedule_data
+
+
+@pytest.fixture(name="make_schedule_data")
+def fixture_make_schedule_data() -> Callable[..., ScheduleData]:
+    """A factory of timetables with the given events and parallel
+    sessions."""
+    return create_schedule_data
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Tests that a bulk export exports every program on its own."""
+import io
+import threading
+from pathlib import Path
+import pytest
+from nott_your_timetable.utils import bulk
+from nott_your_timetable.utils.bulk import export_bulk, map_programs,\
+    print_summary, program_filename
+
+DAYS = [1, 2, 3, 4, 5]
+WEEKS = [4, 5, 6]
+
+
+@pytest.mark.parametrize("program_value, filename", [
+    ("UG/M1225/M6UBSECFF/F/01", "UG_M1225_M6UBSECFF_F_01.ics"),
+    ("PG/..//a b/", "PG_.._a_b.ics"),
+    ("ÉÉ/1", "ÉÉ_1.ics"),
+])
+def test_program_filename(program_value: str, filename: str):
+    """Program values are turned into safe filenames."""
+    assert program_filename(program_value, "ics") == filename
+
+
+def test_export_bulk(tmp_path: Path, fake_session):
+    """A failing program doesn't stop the others from being exported."""
+    results = export_bulk(["UG/A/1", "BAD", "UG/B/1"], DAYS, WEEKS,
+                          ["csv", "jsonl"], str(tmp_path), 2, fake_session,
+                          academic_year=2023)
+
+    assert [result.successful for result in results] == [True, False, True]
+    assert results[1].error.startswith("ConnectionError: ")
+    assert results[0].output == \
+        f"{tmp_path / 'UG_A_1.csv'}, {tmp_path / 'UG_A_1.jsonl'}"
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+        ["UG_A_1.csv", "UG_A_1.jsonl", "UG_B_1.csv", "UG_B_1.jsonl"]
+    assert (tmp_path / "UG_A_1.csv").read_bytes() == \
+        (tmp_path / "UG_B_1.csv").read_bytes()
+    assert len(fake_session.urls) == 3
+    assert not fake_session.closed
+
+    file = io.StringIO()
+    print_summary(results, file)
+    assert file.getvalue().splitlines() == [
+        f"Failed to export BAD: {results[1].error}",
+        "Exported 2/3 programs (1 failed)"
+    ]
+
+
+def test_export_bulk_workers(tmp_path: Path):
+    """There must be at least one worker."""
+    with pytest.raises(ValueError):
+        export_bulk(["UG/A/1"], DAYS, WEEKS, "csv", str(tmp_path), 0)
+
+
+def test_map_programs(fake_session):
+    """The programs run in worker threads sharing the session and
+    options."""
+    threads = set()
+
+    def get_subjects(request, program_value: str) -> tuple:
+        threads.add(threading.get_ident())
+        schedule_data = request(program_value, DAYS, WEEKS)
+        return program_value, len(schedule_data["Subject"])
+
+    results = map_programs(get_subjects, [f"UG/{index}" for index in
+                                          range(8)],
+                           4, fake_session, academic_year=2023)
+
+    assert [value for value, _ in results] == \
+        [f"UG/{index}" for index in range(8)]
+    assert len({count for _, count in results}) == 1
+    assert results[0][1] > 0
+    assert threading.get_ident() not in threads
+    assert len(fake_session.urls) == 8
+
+
+def test_map_programs_session(monkeypatch: pytest.MonkeyPatch,
+                              fake_session):
+    """A session is created for the workers and closed afterwards."""
+    monkeypatch.setattr(bulk, "create_session", lambda _: fake_session)
+
+    def fail(request, program_value: str) -> None:
+        raise KeyError(program_value)
+
+    with pytest.raises(KeyError):
+        map_programs(fail, ["UG/A/1"], 2)
+    assert fake_session.closed
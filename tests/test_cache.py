@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Tests the expiry, eviction and locking of the response cache."""
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from collections.abc import Iterator
+import pytest
+from nott_your_timetable.utils.cache import ResponseCache
+
+QUERY = "days=1-7&weeks=1-52"
+
+
+@pytest.fixture(name="cache")
+def fixture_cache(tmp_path: Path) -> ResponseCache:
+    """An empty cache in a temporary directory."""
+    return ResponseCache(str(tmp_path / "cache"), ttl=60, max_size=1024)
+
+
+def get_path(cache: ResponseCache, program_value: str) -> str:
+    """Gets the path of the entry of a program."""
+    # pylint: disable=protected-access
+    return cache._get_path(cache.make_key(program_value, QUERY))
+
+
+def test_get_set(cache: ResponseCache):
+    """Entries are keyed by program value and query."""
+    assert cache.get("UG/A", QUERY) is None
+    cache.set("UG/A", QUERY, "<html>Ω</html>")
+
+    assert cache.get("UG/A", QUERY) == "<html>Ω</html>"
+    assert cache.get("UG/A", "days=1") is None
+    assert cache.get("UG/B", QUERY) is None
+
+    cache.clear()
+    assert cache.get("UG/A", QUERY) is None
+
+
+def test_ttl(cache: ResponseCache):
+    """Expired entries are misses and removed by the next write."""
+    cache.set("UG/A", QUERY, "a")
+    path = get_path(cache, "UG/A")
+    expired = time.time() - 120
+    os.utime(path, (expired, expired))
+
+    assert cache.get("UG/A", QUERY) is None
+    cache.set("UG/B", QUERY, "b")
+    assert not os.path.exists(path)
+
+
+def test_lru_eviction(cache: ResponseCache):
+    """The least recently used entries are evicted first."""
+    data = "x" * 400
+    now = time.time()
+    cache.set("UG/A", QUERY, data)
+    cache.set("UG/B", QUERY, data)
+    os.utime(get_path(cache, "UG/A"), (now - 20, now))
+    os.utime(get_path(cache, "UG/B"), (now - 10, now))
+    # Reading A makes B the least recently used entry
+    assert cache.get("UG/A", QUERY) == data
+
+    cache.set("UG/C", QUERY, data)
+    assert cache.get("UG/B", QUERY) is None
+    assert cache.get("UG/A", QUERY) == data
+    assert cache.get("UG/C", QUERY) == data
+
+
+def test_failed_writer(cache: ResponseCache):
+    """A response is only stored if it is written without an error."""
+    cache.set("UG/A", QUERY, "old")
+    with pytest.raises(RuntimeError):
+        with cache.writer("UG/A", QUERY) as file:
+            file.write("partial")
+            raise RuntimeError("Download failed")
+
+    assert cache.get("UG/A", QUERY) == "old"
+    assert not [name for name in os.listdir(cache.directory)
+                if name.endswith(".tmp")]
+
+
+def test_lock_error(cache: ResponseCache, monkeypatch: pytest.MonkeyPatch):
+    """A cache that can't be locked e.g. a read-only directory misses."""
+    cache.set("UG/A", QUERY, "a")
+
+    @contextmanager
+    def lock(exclusive: bool) -> Iterator[None]:
+        raise PermissionError(f"Can't lock the cache {exclusive}")
+        yield  # pylint: disable=unreachable
+
+    monkeypatch.setattr(cache, "_lock", lock)
+    assert cache.get("UG/A", QUERY) is None
+
+
+@pytest.mark.skipif(sys.platform == "win32",
+                    reason="Windows only supports exclusive locks")
+def test_locking(cache: ResponseCache):
+    """Readers wait for the exclusive lock of a writer."""
+    # pylint: disable=protected-access
+    cache.set("UG/A", QUERY, "a")
+    results = []
+    reader = threading.Thread(
+        target=lambda: results.append(cache.get("UG/A", QUERY))
+    )
+
+    with cache._lock(exclusive=True):
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive()
+    reader.join(5)
+
+    assert results == ["a"]
+
+    # Shared locks don't wait for each other
+    with cache._lock(exclusive=False):
+        assert cache.get("UG/A", QUERY) == "a"
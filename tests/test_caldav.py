@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Tests that the CalDAV sync uploads every event once."""
+from collections.abc import Callable
+from typing import Any
+from xml.sax.saxutils import escape
+import requests
+from nott_your_timetable.utils.caldav import sync_caldav
+from nott_your_timetable.utils.parsers import ScheduleData
+
+URL = "https://caldav.example.com/calendars/user/timetable/"
+
+
+class FakeCalDAVSession:
+    """A calendar collection in memory with the requests used by
+    CalDAVWriter."""
+    def __init__(self):
+        # url -> (etag, calendar data)
+        self.resources: dict[str, tuple[str, str]] = {}
+        self.versions = 0
+
+    def request(self, method: str, url: str, **_: Any) -> requests.Response:
+        """Answers the REPORT request with every resource."""
+        assert method == "REPORT" and url == URL
+        responses = "".join(
+            f"<d:response><d:href>{href}</d:href><d:propstat><d:prop>"
+            f"<d:getetag>{etag}</d:getetag><c:calendar-data>{escape(data)}"
+            "</c:calendar-data></d:prop></d:propstat></d:response>"
+            for href, (etag, data) in self.resources.items()
+        )
+        return self.respond(
+            207, '<d:multistatus xmlns:d="DAV:" '
+            f'xmlns:c="urn:ietf:params:xml:ns:caldav">{responses}'
+            "</d:multistatus>"
+        )
+
+    def put(self, url: str, data: bytes, headers: dict[str, str],
+            **_: Any) -> requests.Response:
+        """Creates or replaces a resource."""
+        current = self.resources.get(url)
+        if headers.get("If-None-Match") == "*" and current is not None or \
+                "If-Match" in headers and \
+                (current is None or current[0] != headers["If-Match"]):
+            return self.respond(412)
+        self.versions += 1
+        self.resources[url] = (f'"{self.versions}"', data.decode("utf-8"))
+        return self.respond(201)
+
+    def delete(self, url: str, **_: Any) -> requests.Response:
+        """Deletes a resource."""
+        del self.resources[url]
+        return self.respond(204)
+
+    @staticmethod
+    def respond(status_code: int, content: str = "") -> requests.Response:
+        """Creates a response."""
+        response = requests.Response()
+        response.status_code = status_code
+        # pylint: disable=protected-access
+        response._content = content.encode("utf-8")
+        return response
+
+
+def get_locations(session: FakeCalDAVSession) -> list[str]:
+    """Gets the location of every resource in the collection."""
+    return sorted(line.removeprefix("LOCATION:")
+                  for _, data in session.resources.values()
+                  for line in data.split("\r\n")
+                  if line.startswith("LOCATION:"))
+
+
+def count(changes: dict[str, list[str]]) -> dict[str, int]:
+    """Counts the events of every kind of change."""
+    return {change: len(uids) for change, uids in changes.items()}
+
+
+def test_parallel_events(make_schedule_data: Callable[..., ScheduleData]):
+    """Parallel events are separate resources named by their location."""
+    session = FakeCalDAVSession()
+
+    schedule_data = make_schedule_data(locations=["LAB1", "LAB2", "LAB3"])
+    changes = sync_caldav(schedule_data, URL, session)
+    assert count(changes) == {"added": 3, "changed": 0, "deleted": 0,
+                              "unchanged": 0, "failed": 0}
+    assert len(session.resources) == 3
+
+    changes = sync_caldav(make_schedule_data(locations=["LAB1", "LAB4"]), URL,
+                          session)
+    assert count(changes) == {"added": 1, "changed": 0, "deleted": 2,
+                              "unchanged": 1, "failed": 0}
+    assert get_locations(session) == ["LAB1", "LAB4"]
+
+
+def test_parallel_removed(make_schedule_data: Callable[..., ScheduleData]):
+    """Removing the first parallel event only deletes its resource."""
+    session = FakeCalDAVSession()
+    schedule_data = make_schedule_data(locations=["LAB1", "LAB2", "LAB3"])
+    sync_caldav(schedule_data, URL, session)
+    etags = {etag for etag, _ in session.resources.values()}
+
+    schedule_data = make_schedule_data(locations=["LAB2", "LAB3"])
+    changes = sync_caldav(schedule_data, URL, session)
+    assert count(changes) == {"added": 0, "changed": 0, "deleted": 1,
+                              "unchanged": 2, "failed": 0}
+    assert changes["deleted"][0].endswith("-LAB1")
+    assert get_locations(session) == ["LAB2", "LAB3"]
+    assert {etag for etag, _ in session.resources.values()} < etags
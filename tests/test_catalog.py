@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Tests that the catalog is only loaded from catalog.bin when it is up to
+date."""
+import json
+import shutil
+from pathlib import Path
+import pytest
+from nott_your_timetable.utils import data
+from nott_your_timetable.utils.catalog_builder import CATALOG_FILE,\
+    DATA_DIR, DEPT_FILE, PROGRAM_FILE, check_catalog
+
+
+@pytest.fixture(name="data_dir")
+def fixture_data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A copy of the installed data the catalog is loaded from."""
+    for filename in (DEPT_FILE, PROGRAM_FILE, CATALOG_FILE):
+        shutil.copy(Path(DATA_DIR) / filename, tmp_path / filename)
+    monkeypatch.setattr(data, "files", lambda _: tmp_path)
+    return tmp_path
+
+
+def test_catalog(data_dir: Path):
+    """The installed catalog.bin matches the json files."""
+    assert not check_catalog(str(data_dir))
+    catalog = data.Catalog.load()
+    assert catalog.dept_data == json.loads(
+        (data_dir / DEPT_FILE).read_text(encoding="utf-8")
+    )
+
+
+def test_stale_catalog(data_dir: Path):
+    """The json files are used when they changed after catalog.bin was
+    built."""
+    path = data_dir / DEPT_FILE
+    dept_data = json.loads(path.read_text(encoding="utf-8"))
+    program_data = json.loads(
+        (data_dir / PROGRAM_FILE).read_text(encoding="utf-8")
+    )
+    school, value = next((school, value) for school, value
+                         in dept_data.items() if program_data.get(value))
+    del dept_data[school]
+    dept_data["Renamed School"] = value
+    path.write_text(json.dumps(dept_data), encoding="utf-8")
+
+    assert check_catalog(str(data_dir)) == [
+        f"{DEPT_FILE}: checksum does not match {CATALOG_FILE}",
+        f"{DEPT_FILE}: content does not match {CATALOG_FILE}"
+    ]
+    catalog = data.Catalog.load()
+    assert catalog.dept_data == dept_data
+    assert catalog.get_programs("Renamed School")
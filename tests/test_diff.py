@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Tests that the diff export only contains the changed events."""
+import datetime
+import io
+from collections.abc import Callable
+from pathlib import Path
+import pytest
+from nott_your_timetable.utils.diff import DiffICalWriter, read_previous
+from nott_your_timetable.utils.exporters import CSVWriter, ICalWriter
+from nott_your_timetable.utils.parsers import ScheduleData
+
+LECTURE = ("EEEE2033 Lecture", datetime.date(2023, 9, 4), datetime.time(14),
+           None, datetime.time(15), None, None, "BB16")
+
+
+
+def export(schedule_data: ScheduleData, path: Path) -> None:
+    """Exports the events in the format of the file extension."""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = CSVWriter(file) if path.suffix == ".csv" else \
+            ICalWriter(file)
+        schedule_data.write(writer)
+
+
+def diff(schedule_data: ScheduleData, path: Path) -> DiffICalWriter:
+    """Exports the changes since the export at path."""
+    writer = DiffICalWriter(io.StringIO(newline=""), read_previous(str(path)))
+    schedule_data.write(writer)
+    return writer
+
+
+@pytest.mark.parametrize("extension", [".ics", ".csv"])
+def test_self_diff(tmp_path: Path, extension: str,
+                   make_schedule_data: Callable[..., ScheduleData]):
+    """Diffing an export against itself finds no changes."""
+    schedule_data = make_schedule_data([LECTURE], ["LAB1", "LAB2", "LAB3"])
+    path = tmp_path / f"previous{extension}"
+    export(schedule_data, path)
+
+    assert len(read_previous(str(path))) == 4
+    writer = diff(schedule_data, path)
+    assert writer.changes == {"added": [], "changed": [], "cancelled": []}
+    assert "BEGIN:VEVENT" not in writer.file.getvalue()
+
+
+def get_locations(changes: list[dict]) -> list[str]:
+    """Gets the location of every change."""
+    return [change["location"] for change in changes]
+
+
+def test_parallel_changes(tmp_path: Path,
+                          make_schedule_data: Callable[..., ScheduleData]):
+    """Parallel events are matched by their location."""
+    path = tmp_path / "previous.ics"
+    export(make_schedule_data([LECTURE], ["LAB1", "LAB2"]), path)
+
+    writer = diff(make_schedule_data([LECTURE], ["LAB1", "LAB4", "LAB3"]),
+                  path)
+    assert get_locations(writer.changes["added"]) == ["LAB4", "LAB3"]
+    assert get_locations(writer.changes["cancelled"]) == ["LAB2"]
+    assert not writer.changes["changed"]
+
+
+def test_parallel_removed(tmp_path: Path,
+                          make_schedule_data: Callable[..., ScheduleData]):
+    """Removing the first parallel event only cancels it."""
+    path = tmp_path / "previous.ics"
+    export(make_schedule_data([LECTURE], ["LAB1", "LAB2", "LAB3"]), path)
+
+    writer = diff(make_schedule_data([LECTURE], ["LAB2", "LAB3"]), path)
+    assert writer.changes["cancelled"][0]["uid"].endswith("-LAB1")
+    assert get_locations(writer.changes["cancelled"]) == ["LAB1"]
+    assert not writer.changes["added"]
+    assert not writer.changes["changed"]
+
+
+def test_repeated_uids(tmp_path: Path,
+                       make_schedule_data: Callable[..., ScheduleData]):
+    """Exports with a repeated UID for parallel events can be diffed."""
+    schedule_data = make_schedule_data([LECTURE], ["LAB1", "LAB2"])
+    path = tmp_path / "previous.ics"
+    export(schedule_data, path)
+    calendar = path.read_bytes()
+    for location in (b"LAB1", b"LAB2"):
+        assert calendar.count(b"-11:00:00-" + location + b"\r\n") == 1
+        calendar = calendar.replace(b"-11:00:00-" + location + b"\r\n",
+                                    b"-11:00:00\r\n")
+    path.write_bytes(calendar)
+
+    assert diff(schedule_data, path).changes == \
+        {"added": [], "changed": [], "cancelled": []}
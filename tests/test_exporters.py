@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Tests that the export formats contain the same events."""
+import csv
+import datetime
+import io
+import json
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+import pytest
+from dateutil.rrule import rrulestr
+from icalendar import Calendar
+from nott_your_timetable.utils import exporters
+from nott_your_timetable.utils.exporters import MAX_LINE_LENGTH,\
+    CSVWriter, ICalWriter, IcalendarWriter, JSONLWriter, ParquetWriter,\
+    RecurringICalWriter, fold_line
+from nott_your_timetable.utils.parsers import ScheduleData
+
+DTSTAMP = datetime.datetime(2023, 9, 1, 12, 30, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture(name="schedule_data")
+def fixture_schedule_data(make_schedule_data: Callable[..., ScheduleData]) \
+        -> ScheduleData:
+    """Events with values that need to be escaped and folded."""
+    day = datetime.date(2023, 9, 4)
+    events = [
+        ("EEEE2033 Signals, Systems; and \\Control\\", day,
+         datetime.time(9), None, datetime.time(11), None, None, "BB16"),
+        ("EEEE2044 " + "Very Long Module Name " * 6, day,
+         datetime.time(9), None, datetime.time(10), None, None,
+         "Room with a comma, semicolon; and\nnewline"),
+        ("Ingeniería Eléctrica 电子工程 — Café " * 3, day,
+         datetime.time(14, 30), None, datetime.time(16), None, None,
+         "Bâtiment Ω"),
+        ("EEEE2033 Signals, Systems; and \\Control\\",
+         day + datetime.timedelta(days=7), datetime.time(9), None,
+         datetime.time(11), None, None, None),
+        ("Reading Week", day + datetime.timedelta(days=14),
+         datetime.time(0), day + datetime.timedelta(days=15),
+         datetime.time(0), True, None, None),
+    ]
+    return make_schedule_data(events)
+
+
+def export_ics(schedule_data: ScheduleData, writer_class: type) -> str:
+    """Exports the events with an iCalendar writer.
+
+    Parameters
+    ----------
+    schedule_data: ScheduleData
+        The events to export
+    writer_class: type
+        The iCalendar writer
+
+    Returns
+    -------
+    str
+        The exported calendar
+    """
+    file = io.StringIO(newline="")
+    writer = writer_class(file)
+    writer.dtstamp = DTSTAMP
+    schedule_data.write(writer)
+    return file.getvalue()
+
+
+def read_events(calendar: str) -> list[dict]:
+    """Parses the events of a calendar with icalendar.
+
+    Parameters
+    ----------
+    calendar: str
+        The calendar to parse
+
+    Returns
+    -------
+    list[dict]
+        The properties of every event
+    """
+    events = []
+    for component in Calendar.from_ical(calendar).walk("VEVENT"):
+        event = {}
+        for name, _ in component.property_items(recursive=False):
+            if name in ("BEGIN", "END"):
+                continue
+            value = component.decoded(name)
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            event[name] = getattr(value, "dt", value)
+        events.append(event)
+    return events
+
+
+def test_ics_conformance(schedule_data: ScheduleData):
+    """Both iCalendar writers produce the same events."""
+    native = export_ics(schedule_data, ICalWriter)
+    icalendar = export_ics(schedule_data, IcalendarWriter)
+    native_events = read_events(native)
+
+    assert native_events == read_events(icalendar)
+    assert len(native_events) == 5
+    assert native_events[0]["SUMMARY"] == \
+        "EEEE2033 Signals, Systems; and \\Control\\"
+    assert native_events[1]["LOCATION"] == \
+        "Room with a comma, semicolon; and\nnewline"
+    assert native_events[2]["SUMMARY"] == \
+        "Ingeniería Eléctrica 电子工程 — Café " * 3
+    assert native_events[2]["LOCATION"] == "Bâtiment Ω"
+    assert "LOCATION" not in native_events[3]
+    assert native_events[4]["DTSTART"] == datetime.date(2023, 9, 18)
+    assert all(event["DTSTAMP"] == DTSTAMP for event in native_events)
+
+
+def test_ics_lines(schedule_data: ScheduleData):
+    """The native writer uses CRLF and folds long lines."""
+    native = export_ics(schedule_data, ICalWriter)
+
+    assert native.endswith("END:VCALENDAR\r\n")
+    assert "\n" not in native.replace("\r\n", "")
+    lines = native.split("\r\n")
+    assert all(len(line.encode("utf-8")) <= MAX_LINE_LENGTH
+               for line in lines)
+    assert any(line.startswith(" ") for line in lines)
+    assert "SUMMARY:EEEE2033 Signals\\, Systems\\; and \\\\Control\\\\" \
+        in lines
+    assert "LOCATION:Room with a comma\\, semicolon\\; and\\nnewline" \
+        in lines
+
+
+def expand_events(calendar: str) -> Counter:
+    """Expands the RRULE and EXDATE of the events of a calendar with
+    dateutil.
+
+    Parameters
+    ----------
+    calendar: str
+        The calendar to expand
+
+    Returns
+    -------
+    Counter
+        The number of occurrences of every (summary, start, end, location)
+    """
+    events = Counter()
+    for component in Calendar.from_ical(calendar).walk("VEVENT"):
+        start = component.decoded("DTSTART")
+        duration = component.decoded("DTEND") - start
+        starts = [start]
+        if "RRULE" in component:
+            exdates = component.get("EXDATE", [])
+            if not isinstance(exdates, list):
+                exdates = [exdates]
+            excluded = {date.dt for exdate in exdates for date in exdate.dts}
+            rule = rrulestr(component["RRULE"].to_ical().decode("utf-8"),
+                            dtstart=start)
+            starts = [date for date in rule if date not in excluded]
+        events.update((str(component["SUMMARY"]), date, date + duration,
+                       component.get("LOCATION")) for date in starts)
+    return events
+
+
+def test_recurring_events(make_schedule_data: Callable[..., ScheduleData]):
+    """The recurring events expand to the same events as ICalWriter."""
+    day = datetime.date(2023, 9, 4)
+    week = datetime.timedelta(weeks=1)
+    lecture = ("EEEE2033 Lecture", datetime.time(9), datetime.time(11),
+               "BB16")
+    events = [
+        # Weekly with a gap in week 3
+        *((lecture[0], day + week * index, lecture[1], None, lecture[2],
+           None, None, lecture[3]) for index in (0, 1, 3, 4)),
+        # The same class twice on the same date
+        (lecture[0], day + week * 4, lecture[1], None, lecture[2], None,
+         None, lecture[3]),
+        # Parallel rooms, LAB2 is not used in the second week
+        *(("EEEE2044 Lab", day + week * index + datetime.timedelta(days=2),
+           datetime.time(14), None, datetime.time(16), None, None, location)
+          for index in range(3) for location in ("LAB1", "LAB2")
+          if (index, location) != (1, "LAB2")),
+        # All day events on the same weekday are not combined
+        *(("Reading Week", day + week * index, datetime.time(0),
+           day + week * index + datetime.timedelta(days=1),
+           datetime.time(0), True, None, None) for index in (5, 6)),
+    ]
+    schedule_data = make_schedule_data(events)
+
+    native = export_ics(schedule_data, ICalWriter)
+    recurring = export_ics(schedule_data, RecurringICalWriter)
+
+    expected = expand_events(native)
+    assert sum(expected.values()) == len(events)
+    assert expand_events(recurring) == expected
+    assert recurring.count("BEGIN:VEVENT") == 6
+    assert recurring.count("RRULE:") == 3
+    assert recurring.count("EXDATE:") == 2
+    assert "DTSTART;VALUE=DATE:20231009" in recurring
+
+
+@pytest.mark.parametrize("line", [
+    "SUMMARY:" + "a" * 200,
+    "SUMMARY:" + "é" * 100,
+    "SUMMARY:" + "电" * 60 + "a",
+    "SUMMARY:short",
+])
+def test_fold_line(line: str):
+    """Folded lines are at most 75 octets and unfold to the same line."""
+    folded = fold_line(line)
+
+    assert folded.endswith("\r\n")
+    assert all(len(part.encode("utf-8")) <= MAX_LINE_LENGTH
+               for part in folded[:-2].split("\r\n"))
+    assert folded[:-2].replace("\r\n ", "") == line
+
+
+def export_csv(schedule_data: ScheduleData) -> list[dict[str, str]]:
+    """Exports the events as csv and reads them back.
+
+    Parameters
+    ----------
+    schedule_data: ScheduleData
+        The events to export
+
+    Returns
+    -------
+    list[dict[str, str]]
+        The values of every event by key
+    """
+    file = io.StringIO(newline="")
+    schedule_data.write(CSVWriter(file))
+    file.seek(0)
+    return list(csv.DictReader(file))
+
+
+def to_csv_values(event: dict[str, Any]) -> dict[str, str]:
+    """Gets the values of an event as they are written in csv.
+
+    Parameters
+    ----------
+    event: dict[str, Any]
+        The values of the event by key
+
+    Returns
+    -------
+    dict[str, str]
+        The values as strings, None is an empty string
+    """
+    return {key: "" if value is None else str(value)
+            for key, value in event.items()}
+
+
+def test_jsonl_round_trip(schedule_data: ScheduleData):
+    """The JSON Lines export contains the same events as the csv export."""
+    file = io.StringIO(newline="")
+    schedule_data.write(JSONLWriter(file))
+    events = [json.loads(line) for line in file.getvalue().splitlines()]
+
+    assert [to_csv_values(event) for event in events] == \
+        export_csv(schedule_data)
+    assert events[4]["Start Date"] == "2023-09-18"
+    assert events[4]["All Day Event"] is True
+    assert events[0]["Location"] == "BB16"
+
+
+def test_parquet_round_trip(schedule_data: ScheduleData,
+                            monkeypatch: pytest.MonkeyPatch):
+    """The parquet export contains the same events as the csv export."""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    # Writing the events in more than one row group
+    monkeypatch.setattr(exporters, "PARQUET_BATCH_SIZE", 2)
+    file = io.BytesIO()
+    schedule_data.write(ParquetWriter(file))
+    file.seek(0)
+    parquet_file = parquet.ParquetFile(file)
+    events = parquet_file.read().to_pylist()
+
+    assert parquet_file.num_row_groups == 3
+    assert [to_csv_values(event) for event in events] == \
+        export_csv(schedule_data)
+    assert events[4]["Start Date"] == datetime.date(2023, 9, 18)
+    assert events[0]["Start Time"] == datetime.time(9)
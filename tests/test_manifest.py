@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests that manifest jobs share requests and only fail themselves."""
+import csv
+import datetime
+import json
+from pathlib import Path
+from typing import Any
+import pytest
+from nott_your_timetable.utils import manifest
+from nott_your_timetable.utils.manifest import export_manifest, parse_job,\
+    read_manifest
+from nott_your_timetable.utils.requester import make_request
+from nott_your_timetable.utils.range_handlers import RangeSet
+
+JOB = {"school": "E & EE",
+       "program": "BEng Hons Electl & Electnc Eng/F/02 - H603 Electrical "
+                  "and Electronic Engineering",
+       "output": "timetable"}
+OTHER_PROGRAM = "BEng Hons Mechatronic Eng/F/01 - HNM5 Mechatronic " \
+    "Engineering"
+
+
+def test_parse_job():
+    """Ranges and formats can be strings, numbers or lists."""
+    job = parse_job({**JOB, "weeks": [1, "3"], "days": 2,
+                     "format": ["csv", "ics"]}, 1)
+
+    assert job.name == "Job 1"
+    assert job.weeks == RangeSet.from_values([1, 3])
+    assert job.days == RangeSet.from_values([2])
+    assert job.formats == ["csv", "ics"]
+
+
+@pytest.mark.parametrize("values", [
+    {"format": 5},
+    {"format": {"ics": True}},
+    {"format": ["ics", None]},
+    {"weeks": [1, None]},
+    {"weeks": [[1]]},
+    {"weeks": True},
+    {"days": {"1": 2}},
+    {"days": None},
+])
+def test_invalid_types(values: dict[str, Any]):
+    """Values of the wrong type are invalid."""
+    with pytest.raises(ValueError):
+        parse_job({**JOB, **values}, 1)
+
+
+def test_invalid_job():
+    """An invalid job is reported without stopping the others."""
+    results = export_manifest([{**JOB, "name": "weeks", "weeks": [1, None]},
+                               {**JOB, "name": "format", "format": 5}])
+
+    assert [(result.name, result.exit_code) for result in results] == \
+        [("weeks", 1), ("format", 1)]
+    assert results[0].error.startswith("Invalid Range")
+
+
+def test_shared_request(tmp_path: Path, fake_session):
+    """Jobs of the same program share a single request."""
+    results = export_manifest([
+        {**JOB, "name": "monday", "days": "1", "weeks": "4-6",
+         "format": "csv", "output": str(tmp_path / "monday")},
+        {**JOB, "name": "week 5", "weeks": [5], "format": "jsonl,ics",
+         "output": str(tmp_path / "week5")},
+        {**JOB, "name": "other", "program": OTHER_PROGRAM, "days": "1-5",
+         "weeks": "4", "format": "csv", "output": str(tmp_path / "other")},
+    ], 2, fake_session, academic_year=2023)
+
+    assert [result.exit_code for result in results] == [0, 0, 0]
+    assert len(fake_session.urls) == 2
+    # The shared request contains the days and weeks of both jobs
+    assert sum("days=1-7&weeks=4-6&" in url
+               for url in fake_session.urls) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+        ["monday.csv", "other.csv", "week5.ics", "week5.jsonl"]
+
+    with open(tmp_path / "monday.csv", "r", encoding="utf-8",
+              newline="") as file:
+        dates = {datetime.date.fromisoformat(row["Start Date"])
+                 for row in csv.DictReader(file)}
+    assert dates and all(date.isoweekday() == 1 for date in dates)
+
+    # Every job exports the same events as requesting it on its own
+    expected = make_request("UG/M1024/M6UEEENG/F/02", range(1, 8), [5],
+                            fake_session, academic_year=2023)
+    expected.export("jsonl", str(tmp_path / "expected.jsonl"))
+    assert (tmp_path / "week5.jsonl").read_bytes() == \
+        (tmp_path / "expected.jsonl").read_bytes()
+
+
+@pytest.mark.parametrize("extension", [".csv", ".json", ".toml"])
+def test_read_manifest(tmp_path: Path, extension: str):
+    """The jobs are the same in every manifest format."""
+    if extension == ".toml" and manifest.tomllib is None:
+        pytest.skip("toml manifests require Python 3.11 or tomli")
+    jobs = [{**JOB, "name": "autumn", "weeks": "4-15", "days": "1-5",
+             "format": "ics,csv"},
+            {**JOB, "output": "spring"}]
+    path = tmp_path / f"manifest{extension}"
+    if extension == ".csv":
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, manifest.JOB_KEYS)
+            writer.writeheader()
+            writer.writerows(jobs)
+    elif extension == ".json":
+        path.write_text(json.dumps({"jobs": jobs}), encoding="utf-8")
+    else:
+        path.write_text("".join(
+            "[[jobs]]\n" + "".join(f"{key} = {json.dumps(value)}\n"
+                                   for key, value in job.items())
+            for job in jobs
+        ), encoding="utf-8")
+
+    parsed = [parse_job(entry, index + 1)
+              for index, entry in enumerate(read_manifest(str(path)))]
+    assert parsed == [parse_job(job, index + 1)
+                      for index, job in enumerate(jobs)]
+    assert parsed[1].name == "Job 2"
+    assert parsed[0].formats == ["ics", "csv"]
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Tests that the parser backends produce the same timetable."""
+import csv
+from html.parser import HTMLParser
+from pathlib import Path
+import pytest
+from nott_your_timetable.utils.enums import DayOfWeekISO
+from nott_your_timetable.utils.html_parsers import PARSER_BACKENDS,\
+    ScheduleParser, get_parser_backend
+from nott_your_timetable.utils.parsers import parse_data
+from nott_your_timetable.utils.requester import CHUNK_SIZE, parse_stream
+from nott_your_timetable.utils.range_handlers import handle_ranges
+
+DATA_DIR = Path(__file__).parent / "data"
+CHUNK_SIZES = [1, 7, 64, 1024, CHUNK_SIZE]
+DAYS = [None, [1], [2, 4], [7, 3, 5]]
+TABLE_HEAD = "<tr><td>Module</td><td>Room</td></tr>"
+# Pages with markup that isn't in timetable.html
+EDGE_CASES = {
+    "comments": "<p>Monday</p><!-- <table><tr><td>x</td></tr></table> -->"
+                f"<table>{TABLE_HEAD}<!--a--><tr><td>A<!-- b -->B</td>"
+                "<td>R</td></tr><!----></table><p>Tues<!-- -->day</p>"
+                f"<table>{TABLE_HEAD}</table>",
+    "declarations": "<!DOCTYPE html><?xml version='1.0'?><p>Monday</p>"
+                    f"<![CDATA[x]]><table>{TABLE_HEAD}<!ELEMENT td>"
+                    "<tr><td>A</td><td>R</td></tr></table>",
+    "entities": "<p>Mon&#100;ay</p><table><tr><td>&lt;td&gt;</td>"
+                "<td>&amp;amp; &#x41;&nbsp;&unknown; &copy</td></tr></table>"
+                "<p>Tuesday&nbsp;</p><table><tr><td>B</td></tr></table>",
+    "stray <": "<p>Monday</p><table><tr><td>a < b <</td><td>1<2</td></tr>"
+               "<tr><td><</td><td>< /td></td></tr></table>",
+    "omitted end tags": "<p>Monday</p><table><tr><td>A<td>R<tr><td>B"
+                        "<td><td>C</table><p>Friday</p><table><td>x</td>"
+                        "<tr><td>D</tr></table>",
+    "nested tags": "<p>Monday</p><table><tr><td><b>A</b> text</td>"
+                   "<td>R<br/>S</td><td><span>x</span></td></tr><tr>"
+                   "<th>H</th><td>T<img src='x'></td></tr></table>",
+    "nested tables": "<p>Monday</p><table><tr><td>A</td><td><table><tr>"
+                     "<td>inner</td></tr></table>B</td></tr><tr><td>C</td>"
+                     "</tr></table><p>Tuesday</p><table><tr><td>D</td></tr>"
+                     "</table>",
+    "attributes": "<p class='a>b'>Monday</p><TABLE CLASS=\"x>\" id=t>"
+                  "<TR class='r'><TD title='</td>'>A</TD><td\ta=1>B</td >"
+                  "</tr ></table\n>",
+    "cdata elements": "<script>var a = '<p>Monday</p><table>';</script>"
+                      "<style>td:before { content: '</td>'; }</style>"
+                      "<p>Monday</p><table><tr><td>A<script>x</script>"
+                      "</td><td><style>s</style>B</td></tr></table>",
+    "whitespace": "<p> Monday</p><p>Monday</p><table>\n  <tr>\n  <td> </td>"
+                  "\n<td>\n A \n</td>\n</tr>\n</table>",
+    "repeated days": "<p>Monday</p><table><tr><td>A</td></tr></table>"
+                     "<p>Monday</p><table><tr><td>B</td></tr></table>",
+    "unfinished": "<p>Sunday</p><table><tr><td>A</td></tr></table>"
+                  "<p>Monday</p><table><tr><td>B</td><td>C",
+}
+
+
+class ReferenceParser(HTMLParser):
+    """The tables of a page found with html.parser.
+
+    ScheduleParser was built on HTMLParser before it had its own tokenizer,
+    its tables are expected to be the same for any page.
+
+    Parameters
+    ----------
+    days: list[int]
+        The days of week to look for
+    stop_early: bool
+        Stops parsing once the tables of all the days are found
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, days: list[int] = None, stop_early: bool = False):
+        super().__init__()
+        self.stop_early = stop_early
+        self.finished = False
+        self.tables: dict[str, list[list[str | None]] | None] = {
+            DayOfWeekISO(day).name: None
+            for day in sorted(range(1, 8) if days is None else days)
+        }
+        self.remaining = set(self.tables)
+        self.tables_completed = 0
+        self.day: str | None = None
+        self.table_found = False
+        self.text: list[str] = []
+        self.row: list[str | None] | None = None
+        self.cell: list[str] | None = None
+        self.cell_has_child = False
+
+    def feed(self, data: str) -> None:
+        """Feeds data to the parser until it is finished."""
+        if not self.finished:
+            super().feed(data)
+
+    def close(self) -> None:
+        """Handles any buffered data."""
+        if not self.finished:
+            super().close()
+
+    def handle_data(self, data: str) -> None:
+        """Keeps the text of the cells and the text before a table."""
+        if self.finished:
+            return
+        if self.day is None:
+            self.text.append(data)
+        elif self.cell is not None and not self.cell_has_child:
+            self.cell.append(data)
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        """Starts the tables, rows and cells."""
+        # pylint: disable=unused-argument
+        self.find_day()
+        if self.finished or self.day is None:
+            return
+        if not self.table_found:
+            if tag == "table":
+                self.table_found = True
+                self.tables[self.day] = []
+        elif tag == "tr":
+            self.end_row()
+            self.row = []
+        elif tag == "td" and self.row is not None:
+            self.end_cell()
+            self.cell = []
+            self.cell_has_child = False
+        elif self.cell is not None:
+            self.cell_has_child = True
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        """Handles a self closing tag as a start and an end tag."""
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        """Ends the tables, rows and cells."""
+        self.find_day()
+        if self.finished or self.day is None or not self.table_found:
+            return
+        if tag == "td":
+            self.end_cell()
+        elif tag == "tr":
+            self.end_row()
+        elif tag == "table":
+            self.end_row()
+            self.table_found = False
+            self.remaining.discard(self.day)
+            self.day = None
+            self.tables_completed += 1
+            self.finished = self.stop_early and not self.remaining
+
+    def handle_comment(self, data: str) -> None:
+        """Comments end the text before a table."""
+        self.find_day()
+
+    def find_day(self) -> None:
+        """Finds the day in the text since the last tag."""
+        text = "".join(self.text)
+        self.text = []
+        if self.day is None and text in self.tables:
+            self.day = text
+
+    def end_cell(self) -> None:
+        """Adds the current cell to the current row."""
+        if self.cell is not None:
+            text = "".join(self.cell)
+            self.row.append(text if text.strip() else None)
+            self.cell = None
+
+    def end_row(self) -> None:
+        """Adds the current row to the current table."""
+        self.end_cell()
+        if self.row is not None:
+            self.tables[self.day].append(self.row)
+            self.row = None
+
+
+@pytest.fixture(name="page", scope="module")
+def fixture_page() -> str:
+    """A TextSpreadsheet page with regular and irregular tables."""
+    return (DATA_DIR / "timetable.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture(name="lxml_parser", scope="module")
+def fixture_lxml_parser() -> type:
+    """The lxml backend, the tests are skipped if lxml isn't installed."""
+    pytest.importorskip("lxml")
+    return get_parser_backend("lxml")
+
+
+def parse_tables(parser_class: type, page: str, chunk_size: int,
+                 days: list[int] = None, stop_early: bool = False) -> tuple:
+    """Feeds a page to a parser in chunks.
+
+    Parameters
+    ----------
+    parser_class: type
+        The parser backend
+    page: str
+        The page to parse
+    chunk_size: int
+        The size of every chunk fed to the parser
+    days: list[int]
+        The days of week to look for
+    stop_early: bool
+        Stops parsing once the tables of all the days are found
+
+    Returns
+    -------
+    tuple
+        The rows of every table and the number of tables completed
+    """
+    parser = parser_class(None if days is None else list(days), stop_early)
+    for start in range(0, len(page), chunk_size):
+        parser.feed(page[start:start + chunk_size])
+        if parser.finished:
+            break
+    parser.close()
+
+    return parser.tables, parser.tables_completed
+
+
+def test_backends():
+    """Both backends can be selected by name."""
+    assert set(PARSER_BACKENDS) == {"python", "lxml"}
+    assert get_parser_backend("python") is ScheduleParser
+    with pytest.raises(ValueError):
+        get_parser_backend("invalid")
+
+
+def test_python_tables(page: str):
+    """The python backend finds the table of every day."""
+    tables, completed = parse_tables(ScheduleParser, page, len(page))
+
+    assert completed == 7
+    assert all(len(rows) == 13 for day, rows in tables.items()
+               if day != "Sunday")
+    assert tables["Sunday"] == [["Activity", "Module", "Type", "Start",
+                                 "End", "Weeks", "Room", "Staff"]]
+    # Entities are unescaped and empty cells are None
+    assert tables["Monday"][1][1] == "EEEE3471 Mod & Sys 0"
+    assert tables["Monday"][1][2] is None
+    assert tables["Monday"][1][7] == "Dr <X>"
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("days", DAYS)
+@pytest.mark.parametrize("stop_early", [False, True])
+def test_python_chunks(page: str, chunk_size: int, days: list[int],
+                       stop_early: bool):
+    """The python backend doesn't depend on how the page is split."""
+    expected = parse_tables(ScheduleParser, page, len(page), days)
+
+    assert parse_tables(ScheduleParser, page, chunk_size, days,
+                        stop_early) == expected
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("days", DAYS)
+@pytest.mark.parametrize("stop_early", [False, True])
+def test_reference_equivalence(page: str, chunk_size: int, days: list[int],
+                               stop_early: bool):
+    """The python backend finds the same tables as html.parser."""
+    assert parse_tables(ScheduleParser, page, chunk_size, days,
+                        stop_early) == \
+        parse_tables(ReferenceParser, page, chunk_size, days, stop_early)
+
+
+@pytest.mark.parametrize("case", EDGE_CASES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, CHUNK_SIZE])
+@pytest.mark.parametrize("days", DAYS)
+@pytest.mark.parametrize("stop_early", [False, True])
+def test_edge_cases(case: str, chunk_size: int, days: list[int],
+                    stop_early: bool):
+    """The python backend finds the same tables as html.parser however the
+    markup is split."""
+    page = EDGE_CASES[case]
+    assert parse_tables(ScheduleParser, page, chunk_size, days,
+                        stop_early) == \
+        parse_tables(ReferenceParser, page, chunk_size, days, stop_early)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("days", DAYS)
+@pytest.mark.parametrize("stop_early", [False, True])
+def test_lxml_equivalence(page: str, lxml_parser: type, chunk_size: int,
+                          days: list[int], stop_early: bool):
+    """The lxml backend produces the same tables as the python backend."""
+    expected = parse_tables(ScheduleParser, page, chunk_size, days,
+                            stop_early)
+
+    assert parse_tables(lxml_parser, page, chunk_size, days,
+                        stop_early) == expected
+
+
+@pytest.mark.parametrize("stop_early", [False, True])
+def test_lxml_schedule_data(page: str, lxml_parser: type, stop_early: bool):
+    """Both backends produce the same events."""
+    # pylint: disable=unused-argument
+    chunks = [page[start:start + 1024] for start in range(0, len(page), 1024)]
+    expected = parse_stream(chunks, [1, 2, 3, 4, 5], [4, 5, 6, 22],
+                            stop_early=stop_early, backend="python",
+                            academic_year=2023)
+    schedule_data = parse_stream(chunks, [1, 2, 3, 4, 5], [4, 5, 6, 22],
+                                 stop_early=stop_early, backend="lxml",
+                                 academic_year=2023)
+
+    assert len(schedule_data["Subject"]) > 0
+    assert dict(schedule_data) == dict(expected)
+
+
+def test_parse_data(page: str):
+    """parse_data matches the events of the page parsed by expanding the
+    weeks and times of every row, see benchmarks/parse_data.py."""
+    parser = ScheduleParser()
+    parser.feed(page)
+    parser.close()
+    data = parse_data(parser.get_tables(), handle_ranges("2-12, 20"), 2023)
+
+    with open(DATA_DIR / "timetable_parsed.csv", "r", encoding="utf-8",
+              newline="") as file:
+        expected = list(csv.reader(file))
+    assert expected[0] == list(data)
+    assert [list(map(str, row)) for row in zip(*data.values())] == \
+        expected[1:]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Tests that the range expressions are parsed and formatted back."""
+import pytest
+from nott_your_timetable.utils.enums import DayOfWeekISO
+from nott_your_timetable.utils.range_handlers import ALL_DAYS, RangeSet,\
+    compress_ranges, handle_ranges, handle_ranges_days
+
+
+@pytest.mark.parametrize(("value", "expected"), [
+    ("1", [1]),
+    ("1, 2, 5-10", [1, 2, 5, 6, 7, 8, 9, 10]),
+    (" 4 - 6 ,\t20", [4, 5, 6, 20]),
+    ("10-8", [8, 9, 10]),
+    ("0", [0]),
+])
+def test_parse(value: str, expected: list[int]):
+    """Values and ranges are parsed into a sorted set."""
+    assert list(RangeSet.parse(value)) == expected
+    assert handle_ranges(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "1,", "a", "1-", "1-2-3", "-1",
+                                   "1.5", "Mon"])
+def test_parse_invalid(value: str):
+    """Invalid range expressions are rejected."""
+    with pytest.raises(ValueError, match="Invalid Range"):
+        RangeSet.parse(value)
+
+
+def test_dedup():
+    """Overlapping and repeated values are only kept once."""
+    assert handle_ranges("1-3, 2, 3-5, 5, 1") == [1, 2, 3, 4, 5]
+    assert list(RangeSet.from_values([3, 1, 3, 2, 1])) == [1, 2, 3]
+    assert len(RangeSet.parse("4-15, 10-12, 15")) == 12
+
+
+def test_set_operations():
+    """The set operations work on the values of both sets."""
+    first = RangeSet.parse("1-5, 10")
+    second = RangeSet.parse("4-8")
+
+    assert first | second == first.union(second) == \
+        RangeSet.parse("1-8, 10")
+    assert first & second == first.intersection(second) == \
+        RangeSet.parse("4-5")
+    assert first - second == first.difference(second) == \
+        RangeSet.parse("1-3, 10")
+    assert not first & RangeSet.parse("20-30")
+    assert RangeSet.parse("2-3") <= first
+    assert not second.issubset(first)
+    assert 10 in first and 6 not in first
+    assert (first.first, first.last) == (1, 10)
+    assert RangeSet.from_range(4, 8) == second
+    assert hash(RangeSet.from_values(second)) == hash(second)
+
+
+@pytest.mark.parametrize(("values", "expected"), [
+    ([], ""),
+    ([7], "7"),
+    ([1, 2, 3, 5], "1-3,5"),
+    ([5, 3, 1, 2, 5], "1-3,5"),
+    ([1, 3, 5], "1,3,5"),
+    (range(1, 53), "1-52"),
+    ([0, 63, 64, 65], "0,63-65"),
+])
+def test_format(values: list[int], expected: str):
+    """The values are formatted into the shortest range expression."""
+    assert RangeSet.from_values(values).format() == expected
+    assert compress_ranges(values) == expected
+    # The expression parses back to the same values
+    if expected:
+        assert list(RangeSet.parse(expected)) == sorted(set(values))
+
+
+def test_format_separator():
+    """The ranges can be separated by any string."""
+    assert compress_ranges([1, 2, 4, 6, 7], ", ") == "1-2, 4, 6-7"
+    assert str(RangeSet.parse("6-7, 1")) == "1,6-7"
+    assert repr(RangeSet.parse("6-7, 1")) == "RangeSet.parse('1,6-7')"
+
+
+@pytest.mark.parametrize(("value", "expected"), [
+    ("1-7", [1, 2, 3, 4, 5, 6, 7]),
+    ("Monday", [1]),
+    ("Mon-Fri", [1, 2, 3, 4, 5]),
+    ("1-Fri", [1, 2, 3, 4, 5]),
+    ("Sat-2", [2, 3, 4, 5, 6]),
+    ("Mon,Wed", [1, 3]),
+    ("Sunday, Tue-Wed, 1", [1, 2, 3, 7]),
+])
+def test_days(value: str, expected: list[int]):
+    """Days can be numbers or their full or short names."""
+    assert handle_ranges_days(value) == expected
+    assert list(RangeSet.parse(value, DayOfWeekISO)) == expected
+    assert RangeSet.parse(value, DayOfWeekISO) <= ALL_DAYS
+
+
+@pytest.mark.parametrize("value", ["monday", "Mo", "Mon-", "Mon-Funday"])
+def test_days_invalid(value: str):
+    """Unknown day names are rejected."""
+    with pytest.raises(ValueError, match="Invalid Range"):
+        handle_ranges_days(value)
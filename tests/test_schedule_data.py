@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests the storage and sorting of ScheduleData."""
+import datetime
+import pytest
+from nott_your_timetable.utils.parsers import ScheduleColumn, ScheduleData
+
+
+def make_schedule_data(subjects: list[str],
+                       locations: list[str]) -> ScheduleData:
+    """Creates a ScheduleData with some subjects and locations."""
+    schedule_data = ScheduleData()
+    schedule_data.set("Subject", subjects)
+    schedule_data.set("Location", locations)
+    return schedule_data
+
+
+def test_sort_ties():
+    """Ties keep their current order like a fresh stable sort."""
+    schedule_data = make_schedule_data(["b", "a", "b", "a"],
+                                       ["4", "3", "1", "2"])
+    for keys in (["Subject"], ["Location"], ["Subject"]):
+        schedule_data._sort_values(keys)  # pylint: disable=protected-access
+
+    assert schedule_data["Location"] == ["2", "3", "1", "4"]
+    assert schedule_data["Subject"] == ["a", "a", "b", "b"]
+
+
+def test_sort_once(monkeypatch: pytest.MonkeyPatch):
+    """The values are only sorted again after they changed."""
+    # pylint: disable=protected-access
+    schedule_data = make_schedule_data(["b", "a"], ["1", "2"])
+    sorts = []
+    get_sort_order = schedule_data._get_sort_order
+    monkeypatch.setattr(schedule_data, "_get_sort_order",
+                        lambda keys: sorts.append(keys)
+                        or get_sort_order(keys))
+
+    schedule_data._sort_values(["Subject"])
+    schedule_data._sort_values(["Subject"])
+    assert len(sorts) == 1
+
+    schedule_data.add("Subject", "c")
+    schedule_data.add("Location", "0")
+    schedule_data._sort_values(["Subject"])
+    schedule_data._sort_values(["Location"])
+    schedule_data._sort_values(["Location"])
+    assert len(sorts) == 3
+    assert schedule_data["Subject"] == ["c", "b", "a"]
+
+
+def test_default_order():
+    """The events are sorted by date, time and then subject."""
+    day = datetime.date(2023, 9, 4)
+    schedule_data = ScheduleData()
+    schedule_data.set("Subject", ["b", "a", "c"])
+    schedule_data.set("Start Date", [day + datetime.timedelta(days=1), day,
+                                     day])
+    schedule_data.set("Start Time", [datetime.time(9)] * 3)
+    schedule_data._sort_values()  # pylint: disable=protected-access
+
+    assert schedule_data["Subject"] == ["a", "c", "b"]
+
+
+def test_set_item():
+    """Values can only be changed with set and add."""
+    schedule_data = ScheduleData()
+    with pytest.raises(TypeError):
+        schedule_data["Subject"] = []
+    with pytest.raises(ValueError):
+        schedule_data.add("Invalid", 1)
+
+
+def test_column_list():
+    """A column behaves like a list."""
+    column = ScheduleColumn(["a", "b", "a"])
+    column.append("c")
+    column.insert(0, "b")
+    column[1] = "d"
+    del column[-1]
+
+    assert column == ["b", "d", "b", "a"]
+    assert column[1:3] == ["d", "b"]
+    assert list(column) == column.tolist() == ["b", "d", "b", "a"]
+    assert column.take([3, 0]) == ["a", "b"]
+    with pytest.raises(IndexError):
+        column[10]  # pylint: disable=pointless-statement
+
+
+def test_column_unhashable():
+    """Unhashable values can be stored."""
+    column = ScheduleColumn([["a"], "b", ["a"]])
+    column.extend([{"c": 1}])
+
+    assert column == [["a"], "b", ["a"], {"c": 1}]
+
+
+def test_sort_missing_values():
+    """Events without a value are sorted as an empty string."""
+    # pylint: disable=protected-access
+    schedule_data = make_schedule_data(["b", "a", "c"], ["3", "2"])
+    schedule_data._sort_values(["Location"])
+
+    assert schedule_data["Subject"] == ["c", "a", "b"]
+    assert schedule_data["Location"] == ["2", "3"]
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Tests that the program search ranks the best matches first."""
+import pytest
+from nott_your_timetable import cli
+from nott_your_timetable.utils.data import Catalog
+from nott_your_timetable.utils.search import SearchIndex
+
+PROGRAMS = {
+    "E & EE": {
+        "BEng Electrical and Electronic Engineering": "EEE",
+        "MEng Electrical and Electronic Engineering": "MEEE",
+        "BEng Mechatronic Engineering": "MECHATRONIC",
+    },
+    "Mech Eng": {
+        "BEng Mechanical Engineering": "MECH",
+        "MEng Mechanical Engineering": "MMECH",
+    },
+    "Comp Sci": {
+        "BSc Computer Science": "CS",
+        "BSc Computer Science with Artificial Intelligence": "CSAI",
+    },
+}
+
+
+@pytest.fixture(name="catalog")
+def fixture_catalog() -> Catalog:
+    """A catalog of a few programs in three schools."""
+    return Catalog({school: school for school in PROGRAMS}, PROGRAMS)
+
+
+def search(catalog: Catalog, query: str, **options) -> list[str]:
+    """Gets the names of the programs matching a query."""
+    return [result.program
+            for result in catalog.search_index.search(query, **options)]
+
+
+def test_exact(catalog: Catalog):
+    """The program containing the query ranks first, the shortest name
+    first when the score is the same."""
+    assert search(catalog, "Computer Science", limit=2) == \
+        ["BSc Computer Science",
+         "BSc Computer Science with Artificial Intelligence"]
+    result = catalog.search_index.search("bsc computer science", 1)[0]
+    assert result == ("Comp Sci", "BSc Computer Science", "CS", 2.5)
+
+
+def test_prefix(catalog: Catalog):
+    """Every query word can be the prefix of a word of the name."""
+    assert search(catalog, "mecha eng", limit=3) == \
+        ["BEng Mechanical Engineering", "MEng Mechanical Engineering",
+         "BEng Mechatronic Engineering"]
+    assert search(catalog, "comp sci ai", limit=1) == \
+        ["BSc Computer Science with Artificial Intelligence"]
+
+
+def test_misspelled(catalog: Catalog):
+    """Misspelled queries match by their trigrams."""
+    assert search(catalog, "Elektrical Enginering", limit=2) == \
+        ["BEng Electrical and Electronic Engineering",
+         "MEng Electrical and Electronic Engineering"]
+    assert search(catalog, "Mechatornic")[0] == \
+        "BEng Mechatronic Engineering"
+    assert not search(catalog, "Zoology")
+
+
+def test_school(catalog: Catalog):
+    """Only the programs of the school are found."""
+    assert search(catalog, "Engineering", limit=None, school="Mech Eng") == \
+        ["BEng Mechanical Engineering", "MEng Mechanical Engineering"]
+    assert not search(catalog, "Computer", school="E & EE")
+
+
+@pytest.mark.parametrize("query", ["", "   ", "&-!"])
+def test_empty_query(catalog: Catalog, query: str):
+    """A query without letters or numbers matches nothing."""
+    assert not catalog.search_index.search(query, None)
+
+
+def test_limit(catalog: Catalog):
+    """Every match is returned without a limit."""
+    results = catalog.search_index.search("Engineering", None)
+
+    assert len(results) == 5
+    assert [result.score for result in results] == \
+        sorted((result.score for result in results), reverse=True)
+    assert catalog.search_index.search("Engineering", 2) == results[:2]
+    assert not catalog.search_index.search("Engineering", 0)
+
+
+def test_duplicate_names():
+    """Programs with the same name in different schools are all found in
+    the order of the index."""
+    index = SearchIndex([("A", "BSc Physics", "1"),
+                         ("B", "BSc Physics", "2")])
+    assert [result.value for result in index.search("physics")] == \
+        ["1", "2"]
+
+
+def test_interactive_pick(catalog: Catalog, monkeypatch: pytest.MonkeyPatch,
+                          capsys: pytest.CaptureFixture):
+    """A suggestion can be picked by its number."""
+    monkeypatch.setattr(cli, "get_catalog", lambda: catalog)
+    answers = iter(["Mech", "E & EE", "mecatronic", "2"])
+    monkeypatch.setattr("builtins.input", lambda _: next(answers))
+
+    assert cli.get_school_interactive() == \
+        ("E & EE", "MEng Electrical and Electronic Engineering")
+    output = capsys.readouterr().out
+    assert "Invalid School/Division Name." in output
+    assert "Invalid Program." in output
+    assert "  1. BEng Mechatronic Engineering\n" in output
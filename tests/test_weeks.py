@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Tests that dates and week numbers of an academic year convert both
+ways."""
+import datetime
+import sys
+import pytest
+from nott_your_timetable.nott_your_timetable import main_cli
+from nott_your_timetable.utils.weeks import WEEKS_IN_YEAR, AcademicCalendar,\
+    find_current_week_nott, get_academic_calendar, get_academic_year
+
+PROGRAM = "BEng Hons Electl & Electnc Eng/F/02 - H603 Electrical and " \
+    "Electronic Engineering"
+
+
+@pytest.mark.parametrize(("year", "week1"), [
+    (2023, datetime.date(2023, 9, 4)),
+    (2024, datetime.date(2024, 9, 2)),
+    (2025, datetime.date(2025, 9, 1)),
+    (2029, datetime.date(2029, 9, 3)),
+])
+def test_week1(year: int, week1: datetime.date):
+    """Week 1 is the week of the first Monday of September."""
+    calendar = AcademicCalendar(year)
+
+    assert calendar.week1 == week1
+    assert calendar.get_date(1) == week1
+    assert calendar.get_week(week1) == (1, 0)
+    assert len(calendar.mondays) == WEEKS_IN_YEAR
+    assert all(monday.isoweekday() == 1 for monday in calendar.mondays)
+
+
+def test_get_date():
+    """The date of every day of every week."""
+    calendar = AcademicCalendar(2023)
+
+    assert calendar.get_date(1, 6) == datetime.date(2023, 9, 10)
+    assert calendar.get_date(17, 2) == datetime.date(2023, 12, 27)
+    assert calendar.get_date(52, 6) == datetime.date(2024, 9, 1)
+    for week, weekday in ((0, 0), (53, 0), (1, -1), (1, 7)):
+        with pytest.raises(ValueError):
+            calendar.get_date(week, weekday)
+
+
+def test_get_week():
+    """get_week is the reverse of get_date."""
+    calendar = AcademicCalendar(2023)
+
+    for week in range(1, WEEKS_IN_YEAR + 1):
+        for weekday in range(7):
+            assert calendar.get_week(calendar.get_date(week, weekday)) == \
+                (week, weekday)
+    # Dates outside of the academic year
+    assert calendar.get_week(datetime.date(2023, 9, 3)) == (0, 6)
+    assert calendar.get_week(datetime.date(2024, 9, 2)) == (53, 0)
+
+
+def test_shared_calendar():
+    """The calendar of a year is only built once."""
+    assert get_academic_calendar(2023) is get_academic_calendar(2023)
+    assert get_academic_calendar(2024).year == 2024
+
+
+@pytest.mark.parametrize(("date", "year"), [
+    (datetime.date(2023, 9, 1), 2023),
+    (datetime.date(2023, 12, 31), 2023),
+    (datetime.date(2024, 1, 1), 2023),
+    (datetime.date(2024, 8, 31), 2023),
+])
+def test_academic_year(date: datetime.date, year: int):
+    """The academic year starts in September."""
+    assert get_academic_year(date) == year
+
+
+def test_current_week():
+    """The current week is in the academic year of today."""
+    assert find_current_week_nott(datetime.date(2023, 9, 13)) == 2
+    assert find_current_week_nott(datetime.date(2024, 2, 5), 2023) == 23
+    # The days before the first Monday of September are in week 1
+    assert find_current_week_nott(datetime.date(2023, 9, 1)) == 1
+    with pytest.raises(ValueError, match="2022/2023"):
+        find_current_week_nott(datetime.date(2024, 2, 5), 2022)
+
+
+@pytest.mark.parametrize("option", ["--this-week", "--today"])
+def test_current_week_other_year(option: str,
+                                 monkeypatch: pytest.MonkeyPatch,
+                                 capsys: pytest.CaptureFixture):
+    """This week can't be exported from another academic year."""
+    year = get_academic_year() - 3
+    monkeypatch.setattr(sys, "argv", [
+        "nott-your-timetable-cli", "-c", "E & EE", PROGRAM, option,
+        "--academic-year", str(year)
+    ])
+
+    assert main_cli() == 1
+    assert f"not in the academic year {year}/{year + 1}" in \
+        capsys.readouterr().err